@@ -1,13 +1,29 @@
-from flask import Flask, render_template, request, jsonify
-from backend.google_calendar import get_available_slots, create_event
+from flask import Flask, Response, g, render_template, request, jsonify, url_for
+from backend.booking_jobs import get_booking_queue
+from backend.config import ASYNC_BOOKINGS, SLOT_HOLD_TTL, HTTP_CACHE_MAX_AGE, HTTP_CACHE_STALE, RESPONSE_CACHE_SIZE
+from backend.google_calendar import (
+    get_available_slots, book_slot, hold_slot, release_slot, agents_enabled, get_team_available_slots,
+    book_with_agent, get_slot_offers, slot_offers_snapshot, verify_slot_token,
+)
+from backend.http_cache import ResponseCache, strong_etag
+from backend.metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, REGISTRY, render as render_metrics
+from backend.recurrence import RecurrenceConflict
+from backend.reservations import SlotConflict
+from backend.slot_tokens import InvalidSlotToken
+from backend.warmup import is_warm, start_warm_up
 from datetime import datetime, timezone, timedelta, date
 import json
+import os
+import time
+import uuid
 
 app = Flask(__name__)
+
+MAX_AVAILABILITY_DAYS = 31  # Longest range /api/availability will compute
+IST = timezone(timedelta(hours=5, minutes=30))
 # Convert datetime to IST string with AM/PM
 def format_slot(slot_start, slot_end):
-    ist = timezone(timedelta(hours=5, minutes=30))
-    return f"{slot_start.astimezone(ist).strftime('%I:%M %p')} - {slot_end.astimezone(ist).strftime('%I:%M %p')}"
+    return f"{slot_start.astimezone(IST).strftime('%I:%M %p')} - {slot_end.astimezone(IST).strftime('%I:%M %p')}"
 
 # Generate dates for the next 7 days (excluding weekends)
 def generate_available_dates():
@@ -26,33 +42,171 @@ def generate_available_dates():
 def format_date_display(date_obj):
     return date_obj.strftime("%a, %b %d")
 
+# Per-endpoint latency for /metrics
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter_ns()
+
+@app.after_request
+def record_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        HTTP_REQUEST_SECONDS.labels(request.endpoint or 'unmatched', request.method, response.status_code).observe(
+            (time.perf_counter_ns() - started) / 1e9)
+    return response
+
+# Liveness check; answers without touching Google or the database
+@app.route('/health')
+def health():
+    return jsonify({'status': 'ok', 'warm': is_warm()})
+
+# Prometheus scrape endpoint: stage latencies, external API calls/errors/retries, cache stats
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(), content_type=CONTENT_TYPE)
+
+# Conditional GETs for the polled availability endpoints
+_responses = ResponseCache(max_entries=RESPONSE_CACHE_SIZE)
+REGISTRY.register_stats("response_cache", _responses.stats)
+
+def cached_json(key, generation, build):
+    """
+    JSON response for build() versioned by `generation`.
+
+    A matching If-None-Match gets a 304 without calling build(); otherwise
+    the body is serialized once per (key, generation) and gzipped when the
+    client accepts it and it is large enough to benefit. The gzip encoding
+    has its own strong ETag, as RFC 9110 requires.
+    """
+    tag = strong_etag(key, generation)
+    gzip_tag = tag + "-gzip"
+    if request.if_none_match.contains_weak(tag) or request.if_none_match.contains_weak(gzip_tag):
+        response = Response(status=304)
+        response.set_etag(gzip_tag if request.if_none_match.contains_weak(gzip_tag) else tag)
+    else:
+        entry = _responses.get_or_build((key, generation), lambda: app.json.dumps(build()).encode("utf-8"))
+        if entry.compressible and request.accept_encodings["gzip"]:
+            response = Response(entry.gzipped(), mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            response.set_etag(gzip_tag)
+        else:
+            response = Response(entry.body, mimetype='application/json')
+            response.set_etag(tag)
+    response.headers['Cache-Control'] = (f'public, max-age={HTTP_CACHE_MAX_AGE}, '
+                                         f'stale-while-revalidate={HTTP_CACHE_STALE}')
+    response.vary.add('Accept-Encoding')
+    return response
+
 # API endpoint to get available dates
 @app.route('/api/available_dates')
 def api_available_dates():
     dates = generate_available_dates()
-    formatted_dates = [{
-        'value': date.strftime('%Y-%m-%d'),
-        'display': format_date_display(date)
-    } for date in dates]
-    
-    return jsonify(formatted_dates)
+
+    def build():
+        return [{
+            'value': date.strftime('%Y-%m-%d'),
+            'display': format_date_display(date)
+        } for date in dates]
+
+    # The list only changes when the day does
+    return cached_json('available_dates', ','.join(map(str, dates)), build)
+
+# With AGENTS_FILE a slot is available while any agent is free
+def available_slots(selected_day):
+    return get_team_available_slots(selected_day) if agents_enabled() else get_available_slots(selected_day)
 
 # API endpoint to get available slots for a specific date
 @app.route('/api/available_slots/<date_str>')
 def api_available_slots(date_str):
     try:
         selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        slots = get_available_slots(selected_date)
-        
-        if not slots:
-            return jsonify({'slots': [], 'message': 'No slots available for this date.'})
-        
-        formatted_slots = [format_slot(s, e) for s, e in slots]
-        return jsonify({'slots': formatted_slots})
-        
     except ValueError:
         return jsonify({'error': 'Invalid date format'}), 400
 
+    generation, build_offers = slot_offers_snapshot(selected_date, selected_date)
+
+    def build():
+        offers = build_offers()[selected_date]
+        if not offers:
+            return {'slots': [], 'tokens': [], 'message': 'No slots available for this date.'}
+
+        # tokens[i] is the signed offer for slots[i]; send it back as slot_token when booking
+        return {
+            'slots': [format_slot(s, e) for s, e, _ in offers],
+            'tokens': [token for _, _, token in offers]
+        }
+
+    return cached_json(f'available_slots/{selected_date}', generation, build)
+
+# API endpoint to get available slots for every day in a date range
+@app.route('/api/availability')
+def api_availability():
+    try:
+        from_str = request.args.get('from')
+        to_str = request.args.get('to')
+        start_day = datetime.strptime(from_str, '%Y-%m-%d').date() if from_str else date.today()
+        end_day = datetime.strptime(to_str, '%Y-%m-%d').date() if to_str else start_day + timedelta(days=6)
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+
+    if end_day < start_day:
+        return jsonify({'error': "'to' must not be before 'from'"}), 400
+    if (end_day - start_day).days >= MAX_AVAILABILITY_DAYS:
+        return jsonify({'error': f'Range must not exceed {MAX_AVAILABILITY_DAYS} days'}), 400
+
+    generation, build_offers = slot_offers_snapshot(start_day, end_day)
+
+    def build():
+        return {'days': [{
+            'date': day.strftime('%Y-%m-%d'),
+            'display': format_date_display(day),
+            'slots': [format_slot(s, e) for s, e, _ in offers],
+            'tokens': [token for _, _, token in offers]
+        } for day, offers in sorted(build_offers().items())]}
+
+    return cached_json(f'availability/{start_day}/{end_day}', generation, build)
+
+# Find the (start, end) of a displayed slot string on a date, or None
+# (legacy clients without slot tokens; costs an availability lookup)
+def find_slot(selected_day, time_slot):
+    for start_time, end_time in available_slots(selected_day):
+        if format_slot(start_time, end_time) == time_slot:
+            return start_time, end_time
+    return None
+
+# The (start, end) a request asks for: from its signed slot_token, else by date + displayed time
+def requested_slot(data):
+    token = data.get('slot_token')
+    if token:
+        slot = verify_slot_token(token)
+        return slot.start, slot.end
+    selected_day = datetime.strptime(data['date'], "%Y-%m-%d").date()
+    return find_slot(selected_day, data['time'])
+
+# API endpoint to hold a slot while the user confirms the booking
+@app.route('/api/hold_slot', methods=['POST'])
+def api_hold_slot():
+    data = request.get_json() or {}
+    if not data.get('slot_token') and not (data.get('date') and data.get('time')):
+        return jsonify({'error': 'Missing required fields'}), 400
+
+    try:
+        slot = requested_slot(data)
+    except InvalidSlotToken:
+        return jsonify({'error': 'This slot offer is invalid or has expired. Please pick a slot again.'}), 400
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+    except SlotConflict:
+        slot = None
+    if slot is None:
+        return jsonify({'error': 'Selected time slot is not available'}), 409
+
+    try:
+        hold_id = hold_slot(*slot, owner=data.get('email'))
+    except SlotConflict:
+        return jsonify({'error': 'Selected time slot is being booked by someone else'}), 409
+    return jsonify({'hold_id': hold_id})
+
 # API endpoint to create a booking
 @app.route('/api/create_booking', methods=['POST'])
 def api_create_booking():
@@ -64,52 +218,116 @@ def api_create_booking():
         time_slot = data.get('time')
         description = data.get('description', '')
         recurring = data.get('recurring', False)
+        hold_id = data.get('hold_id')
         
         # Validate required fields
-        if not email or not date_str or not time_slot:
+        if not email or not (data.get('slot_token') or (date_str and time_slot)):
             return jsonify({'error': 'Missing required fields'}), 400
         
-        # Convert selected date
-        selected_day = datetime.strptime(date_str, "%Y-%m-%d").date()
-        
-        # Get available slots for validation
-        slots = get_available_slots(selected_day)
-        if not slots:
-            return jsonify({'error': 'No slots available for this date'}), 400
+        # Resolve the slot from its signed token (no availability re-fetch) or, for old clients, by label
+        try:
+            slot = requested_slot(data)
+        except InvalidSlotToken:
+            return jsonify({'error': 'This slot offer is invalid or has expired. Please pick a slot again.'}), 400
+        if slot is None:
+            return jsonify({'error': 'Selected time slot is not available'}), 400
         
-        # Find the selected time slot
-        slot_index = None
-        for i, (start_time, end_time) in enumerate(slots):
-            if format_slot(start_time, end_time) == time_slot:
-                slot_index = i
-                break
+        start_time, end_time = slot
+        if date_str:
+            selected_day = datetime.strptime(date_str, "%Y-%m-%d").date()
+        else:
+            selected_day = start_time.astimezone(IST).date()
+        time_slot = time_slot or format_slot(start_time, end_time)
         
-        if slot_index is None:
-            return jsonify({'error': 'Selected time slot is not available'}), 400
+        if agents_enabled() and hold_id:
+            # Holds are taken on the primary calendar; the booking holds the assigned agent's slot itself
+            release_slot(hold_id)
+            hold_id = None
         
-        start_time, end_time = slots[slot_index]
+        if ASYNC_BOOKINGS:
+            # Reserve the slot now, insert the event and email from a background worker
+            if not agents_enabled():
+                hold_id = hold_slot(start_time, end_time, owner=email, hold_id=hold_id)
+            # The hold lives in this process, so this worker runs the job while the hold lasts
+            booking_id = get_booking_queue().enqueue({
+                'email': email,
+                'start_time': start_time.isoformat(),
+                'end_time': end_time.isoformat(),
+                'time_slot': time_slot,
+                'description': description,
+                'recurring': recurring,
+                'hold_id': hold_id,
+                # Client-side Calendar id: a retried insert cannot create (and invite to) a second event
+                'event_id': uuid.uuid4().hex,
+                'assign_agent': agents_enabled()
+            }, affinity_ttl=SLOT_HOLD_TTL if hold_id else None)
+            return jsonify({
+                'success': True,
+                'booking_id': booking_id,
+                'status': 'queued',
+                'status_url': url_for('api_booking_status', booking_id=booking_id),
+                'email': email,
+                'date': selected_day.strftime('%Y-%m-%d'),
+                'time_slot': time_slot
+            }), 202
         
-        # Create Google Calendar event
-        event_link = create_event(
-            summary="Real Estate Consultation",
-            start_time=start_time,
-            end_time=end_time,
-            client_email=email,
-            description=description,
-            recurring=recurring
-        )
+        # Create Google Calendar event under a local reservation
+        agent = None
+        if agents_enabled():
+            agent, event_link = book_with_agent(
+                summary="Real Estate Consultation",
+                start_time=start_time,
+                end_time=end_time,
+                client_email=email,
+                description=description,
+                recurring=recurring
+            )
+        else:
+            event_link = book_slot(
+                summary="Real Estate Consultation",
+                start_time=start_time,
+                end_time=end_time,
+                client_email=email,
+                description=description,
+                recurring=recurring,
+                hold_id=hold_id
+            )
         
         return jsonify({
             'success': True,
             'event_link': event_link,
+            'agent': agent.name if agent else None,
             'email': email,
             'date': selected_day.strftime('%Y-%m-%d'),
             'time_slot': time_slot
         })
         
+    except RecurrenceConflict as e:
+        return jsonify({
+            'error': 'Some weekly occurrences of this slot are already booked',
+            'conflicts': [start.isoformat() for start, _ in e.conflicts]
+        }), 409
+    except SlotConflict:
+        return jsonify({'error': 'Selected time slot was just booked by someone else'}), 409
     except Exception as e:
         return jsonify({'error': f'Booking failed: {str(e)}'}), 500
 
+# API endpoint to poll a booking queued by /api/create_booking
+@app.route('/api/booking_status/<booking_id>')
+def api_booking_status(booking_id):
+    job = get_booking_queue().status(booking_id)
+    if job is None:
+        return jsonify({'error': 'Unknown booking'}), 404
+    return jsonify({
+        'booking_id': job['id'],
+        'status': job['status'],
+        'attempts': job['attempts'],
+        'event_link': job['state'].get('event_link'),
+        'agent': job['state'].get('agent'),
+        'email_sent': job['state'].get('email_sent', False),
+        'error': job['error'] if job['status'] == 'failed' else None
+    })
+
 # Chatbot route
 @app.route("/")
 def index():
@@ -129,38 +347,69 @@ def form_booking():
         # Get form data
         email = request.form["email"]
         date_str = request.form["date"]
-        slot_index = int(request.form["slot"])
+        slot_token = request.form.get("slot_token")
         description = request.form.get("description", "")
         recurring = request.form.get("recurring") == "on"
 
         # Convert selected date
         selected_day = datetime.strptime(date_str, "%Y-%m-%d").date()
 
-        # Get available slots for the selected date
-        slots = get_available_slots(selected_day)
-        if not slots:
-            return render_template("index.html", slots=[], today=selected_day, message="No slots available for this date.")
-
-        start_time, end_time = slots[slot_index]
+        # Create Google Calendar event under a local reservation
+        try:
+            if slot_token:
+                # Signed offer from the page: no re-fetch, and immune to the slot list shifting
+                slot = verify_slot_token(slot_token)
+                start_time, end_time = slot.start, slot.end
+            else:
+                # Older pages post an index into a freshly recomputed list
+                slots = available_slots(selected_day)
+                if not slots:
+                    return render_template("index.html", slots=[], today=selected_day,
+                                           message="No slots available for this date.")
+                start_time, end_time = slots[int(request.form["slot"])]
 
-        # Create Google Calendar event
-        event_link = create_event(
-            summary="Real Estate Consultation",
-            start_time=start_time,
-            end_time=end_time,
-            client_email=email,
-            description=description,
-            recurring=recurring
-        )
+            if agents_enabled():
+                _, event_link = book_with_agent(
+                    summary="Real Estate Consultation",
+                    start_time=start_time,
+                    end_time=end_time,
+                    client_email=email,
+                    description=description,
+                    recurring=recurring
+                )
+            else:
+                event_link = book_slot(
+                    summary="Real Estate Consultation",
+                    start_time=start_time,
+                    end_time=end_time,
+                    client_email=email,
+                    description=description,
+                    recurring=recurring
+                )
+        except (SlotConflict, InvalidSlotToken) as conflict:
+            offers = get_slot_offers(selected_day)
+            if isinstance(conflict, RecurrenceConflict):
+                message = f"That slot is taken in some of the following weeks ({conflict}). Please pick another."
+            elif isinstance(conflict, InvalidSlotToken):
+                message = "That slot offer has expired. Please pick a slot again."
+            else:
+                message = "That slot was just booked by someone else. Please pick another."
+            return render_template("index.html", slots=[format_slot(s, e) for s, e, _ in offers],
+                                   slot_tokens=[token for _, _, token in offers], today=selected_day,
+                                   message=message)
 
         return render_template("success.html", link=event_link, email=email)
 
     # GET request – show booking form
     today = datetime.now().date()
-    slots_today = get_available_slots(today)
-    slots_formatted = [format_slot(s, e) for s, e in slots_today]
+    offers = get_slot_offers(today)
 
-    return render_template("index.html", slots=slots_formatted, today=today, message=None)
+    return render_template("index.html", slots=[format_slot(s, e) for s, e, _ in offers],
+                           slot_tokens=[token for _, _, token in offers], today=today, message=None)
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    # Development server only; production runs gunicorn with gunicorn.conf.py
+    if ASYNC_BOOKINGS:
+        get_booking_queue()  # Resume bookings queued before a restart
+    start_warm_up()
+    app.run(debug=os.getenv("FLASK_DEBUG", "true").lower() == "true")
\ No newline at end of file
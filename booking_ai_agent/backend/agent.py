@@ -1,9 +1,9 @@
 import os
 import datetime
-import dateparser
 from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+
+from backend.booking_parser import parse_booking
+from backend.service_manager import GoogleServiceManager
 
 # ---------------------------
 # Load environment variables
@@ -15,40 +15,50 @@ GOOGLE_CREDENTIALS_FILE = os.getenv("GOOGLE_CREDENTIALS_FILE", "credentials.json
 # Google Calendar Setup
 # ---------------------------
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
-credentials = service_account.Credentials.from_service_account_file(
-    GOOGLE_CREDENTIALS_FILE, scopes=SCOPES
-)
-service = build("calendar", "v3", credentials=credentials)
+
+
+def _load_credentials():
+    from google.oauth2 import service_account
+
+    return service_account.Credentials.from_service_account_file(
+        GOOGLE_CREDENTIALS_FILE, scopes=SCOPES
+    )
+
+
+# Built on first use, so importing this module needs neither credentials nor the Google client stack
+_calendar_services = GoogleServiceManager("calendar", "v3", load_credentials=_load_credentials)
+
+
+def get_service():
+    return _calendar_services.get_service()
+
 
 # ---------------------------
 # Add Event Function
 # ---------------------------
 def add_event(event_desc, recipient_email):
-    # Parse natural language date/time with better settings
-    event_datetime = dateparser.parse(
-        event_desc,
-        settings={
-            "PREFER_DATES_FROM": "future",
-            "RELATIVE_BASE": datetime.datetime.now(),
-            "PREFER_DAY_OF_MONTH": "first",
-        }
-    )
+    # Regex fast path first; dateparser (English only) and then the LLM only when needed
+    parsed = parse_booking(event_desc)
+    event_datetime = parsed.start
 
     if not event_datetime:
-        print("❌ Could not parse date/time from text.")
+        if parsed.day:
+            print(f"❌ Please include a time for {parsed.day:%a, %b %d} (e.g. 'at 3pm').")
+        else:
+            print("❌ Could not parse date/time from text.")
         return
 
     event = {
-        "summary": event_desc.split(" at ")[0],  # Take description before "at"
+        "summary": parsed.summary,
         "start": {"dateTime": event_datetime.isoformat(), "timeZone": "Asia/Kolkata"},
         "end": {
-            "dateTime": (event_datetime + datetime.timedelta(hours=1)).isoformat(),
+            "dateTime": (event_datetime + datetime.timedelta(minutes=parsed.duration)).isoformat(),
             "timeZone": "Asia/Kolkata",
         },
-        "attendees": [{"email": recipient_email}],
+        "attendees": [{"email": recipient_email or parsed.email}],
     }
 
-    event = service.events().insert(calendarId="primary", body=event).execute()
+    event = get_service().events().insert(calendarId="primary", body=event).execute()
     print(f"✅ Event created: {event.get('htmlLink')}")
 
 # ---------------------------
@@ -56,7 +66,7 @@ def add_event(event_desc, recipient_email):
 # ---------------------------
 def show_events():
     now = datetime.datetime.utcnow().isoformat() + "Z"
-    events_result = service.events().list(
+    events_result = get_service().events().list(
         calendarId="primary", timeMin=now, maxResults=10, singleEvents=True, orderBy="startTime"
     ).execute()
     events = events_result.get("items", [])
@@ -0,0 +1,303 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from datetime import timedelta
+
+from backend.availability import merge_intervals
+
+ROUND_ROBIN, LEAST_LOADED, PRIORITY = "round_robin", "least_loaded", "priority"
+STRATEGIES = (ROUND_ROBIN, LEAST_LOADED, PRIORITY)
+
+
+class Agent:
+    """
+    A bookable person and the calendar their appointments go to.
+
+    Args:
+        agent_id (str): Unique id
+        calendar_id (str, optional): Google Calendar id, defaults to agent_id
+        name (str, optional): Display name
+        email (str, optional): Added as an attendee of their bookings
+        priority (int): Higher values are preferred by the "priority" strategy
+        active (bool): Inactive agents are never assigned
+    """
+
+    __slots__ = ("agent_id", "calendar_id", "name", "email", "priority", "active")
+
+    def __init__(self, agent_id, calendar_id=None, name=None, email=None, priority=0, active=True):
+        self.agent_id = agent_id
+        self.calendar_id = calendar_id or agent_id
+        self.name = name or agent_id
+        self.email = email
+        self.priority = priority
+        self.active = active
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Agent({self.agent_id!r})"
+
+
+class _DayIndex:
+    """Merged, disjoint busy intervals of one agent on one day, searchable by bisect."""
+
+    __slots__ = ("starts", "ends", "minutes", "loaded_at")
+
+    def __init__(self, intervals, buffer, loaded_at):
+        merged = merge_intervals(intervals, buffer)
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+        self.minutes = sum((end - start).total_seconds() for start, end in intervals) / 60
+        self.loaded_at = loaded_at
+
+    def overlaps(self, start, end):
+        # Disjoint intervals sorted by start: only the last one starting before `end` can overlap
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.ends[i - 1] > start
+
+    def add(self, start, end, buffer):
+        start, end = start - buffer, end + buffer
+        i = bisect_left(self.starts, start)
+        # Absorb every neighbour the new interval touches
+        if i > 0 and self.ends[i - 1] >= start:
+            i -= 1
+            start = self.starts[i]
+        j = i
+        while j < len(self.starts) and self.starts[j] <= end:
+            end = max(end, self.ends[j])
+            j += 1
+        self.starts[i:j] = [start]
+        self.ends[i:j] = [end]
+
+
+class AgentRegistry:
+    """
+    In-memory registry of agents with per-agent busy-interval indexes.
+
+    Assignment decisions are made from the indexes alone: each agent keeps
+    its busy intervals per (booking-zone) day, merged and sorted, so "is this
+    agent free" is one bisect and picking among hundreds of agents takes well
+    under a millisecond. Callers load days from the calendars (see
+    google_calendar.ensure_agents_loaded) and record new bookings with
+    mark_busy; days older than `ttl` are reported as stale for reloading.
+
+    Args:
+        agents (iterable): Initial Agent objects
+        strategy (str): Default strategy: "round_robin", "least_loaded" or "priority"
+        tz (tzinfo, optional): Zone that defines calendar days and weeks
+        buffer (timedelta): Free time required around busy intervals
+        ttl (float): Seconds a loaded day stays fresh
+        clock (callable, optional): Monotonic time source, overridable in tests
+    """
+
+    def __init__(self, agents=(), strategy=ROUND_ROBIN, tz=None, buffer=timedelta(0), ttl=60,
+                 clock=time.monotonic):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown assignment strategy {strategy!r}")
+        self.strategy = strategy
+        self.tz = tz
+        self.buffer = buffer
+        self.ttl = ttl
+        self._clock = clock
+        self._agents = {}       # agent_id -> Agent, in registration order
+        self._active = []       # active agents, in registration order
+        self._by_priority = []  # active agents, highest priority first
+        self._days = {}         # agent_id -> {day: _DayIndex}
+        self._weeks = {}        # agent_id -> {monday: booked minutes}, kept in step with _days
+        self._cursor = 0        # round-robin position in the active list
+        self._lock = threading.Lock()
+        self._stats = {"assignments": 0, "no_agent": 0}
+        for agent in agents:
+            self.add_agent(agent)
+
+    # -----------------------------
+    # Agents
+    # -----------------------------
+    def add_agent(self, agent):
+        with self._lock:
+            self._agents[agent.agent_id] = agent
+            self._days.setdefault(agent.agent_id, {})
+            self._weeks.setdefault(agent.agent_id, {})
+            self._reorder()
+        return agent
+
+    def remove_agent(self, agent_id):
+        with self._lock:
+            self._agents.pop(agent_id, None)
+            self._days.pop(agent_id, None)
+            self._weeks.pop(agent_id, None)
+            self._reorder()
+
+    def _reorder(self):
+        active = [agent for agent in self._agents.values() if agent.active]
+        self._active = active
+        self._by_priority = sorted(active, key=lambda agent: -agent.priority)
+
+    def get(self, agent_id):
+        return self._agents.get(agent_id)
+
+    def agents(self, active_only=True):
+        with self._lock:
+            return list(self._active) if active_only else list(self._agents.values())
+
+    # -----------------------------
+    # Busy-interval indexes
+    # -----------------------------
+    def day_of(self, moment):
+        return moment.astimezone(self.tz).date()
+
+    @staticmethod
+    def _monday(day):
+        return day - timedelta(days=day.weekday())
+
+    def days_spanned(self, start, end):
+        day, last_day = self.day_of(start), self.day_of(end - timedelta(microseconds=1))
+        while day <= last_day:
+            yield day
+            day += timedelta(days=1)
+
+    def stale_days(self, days):
+        """Returns {agent_id: [days]} that were never loaded or are older than ttl."""
+        now = self._clock()
+        stale = {}
+        with self._lock:
+            for agent in self._active:
+                indexed = self._days[agent.agent_id]
+                missing = [day for day in days
+                           if day not in indexed or now - indexed[day].loaded_at >= self.ttl]
+                if missing:
+                    stale[agent.agent_id] = missing
+        return stale
+
+    def load(self, agent_id, day, intervals):
+        """Replaces an agent's busy intervals for one day."""
+        index = _DayIndex(intervals, self.buffer, self._clock())
+        with self._lock:
+            if agent_id in self._days:
+                previous = self._days[agent_id].get(day)
+                self._days[agent_id][day] = index
+                self._add_minutes(agent_id, day, index.minutes - (previous.minutes if previous else 0))
+
+    def _add_minutes(self, agent_id, day, minutes):
+        weeks = self._weeks[agent_id]
+        monday = self._monday(day)
+        weeks[monday] = weeks.get(monday, 0) + minutes
+
+    def mark_busy(self, agent_id, start, end):
+        """Records a new booking in the agent's index (write-through)."""
+        minutes = (end - start).total_seconds() / 60
+        with self._lock:
+            indexed = self._days.get(agent_id)
+            if indexed is None:
+                return
+            for day in self.days_spanned(start, end):
+                if day not in indexed:
+                    # Counts as stale, so the rest of the day is still loaded before it is trusted
+                    indexed[day] = _DayIndex((), self.buffer, float("-inf"))
+                indexed[day].add(start, end, self.buffer)
+            first_day = self.day_of(start)
+            indexed[first_day].minutes += minutes
+            self._add_minutes(agent_id, first_day, minutes)
+
+    def _is_free(self, agent_id, days, start, end):
+        # Caller holds self._lock. Days that were never loaded count as free; load them first.
+        indexed = self._days[agent_id]
+        for day in days:
+            index = indexed.get(day)
+            if index is not None and index.overlaps(start, end):
+                return False
+        return True
+
+    def is_free(self, agent_id, start, end):
+        days = list(self.days_spanned(start, end))
+        with self._lock:
+            return agent_id in self._days and self._is_free(agent_id, days, start, end)
+
+    def free_agents(self, start, end):
+        days = list(self.days_spanned(start, end))
+        with self._lock:
+            return [agent for agent in self._active if self._is_free(agent.agent_id, days, start, end)]
+
+    def week_days(self, moment):
+        monday = self._monday(self.day_of(moment))
+        return [monday + timedelta(days=n) for n in range(7)]
+
+    def week_load(self, agent_id, moment):
+        """Booked minutes of the agent in the (Monday-Sunday) week containing `moment`."""
+        monday = self._monday(self.day_of(moment))
+        with self._lock:
+            return self._weeks.get(agent_id, {}).get(monday, 0)
+
+    # -----------------------------
+    # Assignment
+    # -----------------------------
+    def assign(self, start, end, strategy=None, exclude=(), is_available=None):
+        """
+        Picks an agent free for [start, end).
+
+        Args:
+            start (datetime): Slot start (aware)
+            end (datetime): Slot end (aware)
+            strategy (str, optional): Overrides the registry's default strategy
+            exclude (iterable): agent_ids to skip, e.g. ones that just failed
+            is_available (callable, optional): Extra check per Agent, e.g. local holds
+
+        Returns:
+            Agent or None: None when nobody is free
+        """
+        strategy = strategy or self.strategy
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown assignment strategy {strategy!r}")
+        exclude = set(exclude)
+        days = list(self.days_spanned(start, end))
+
+        def eligible(agent):
+            return (agent.agent_id not in exclude and self._is_free(agent.agent_id, days, start, end)
+                    and (is_available is None or is_available(agent)))
+
+        with self._lock:
+            chosen = None
+            if strategy == ROUND_ROBIN:
+                active, cursor = self._active, self._cursor
+                for n in range(len(active)):
+                    position = (cursor + n) % len(active)
+                    if eligible(active[position]):
+                        chosen = active[position]
+                        self._cursor = (position + 1) % len(active)
+                        break
+            elif strategy == PRIORITY:
+                chosen = next(filter(eligible, self._by_priority), None)
+            else:
+                # One pass; the interval check only runs for agents that would beat the best so far
+                monday = self._monday(days[0])
+                best = None
+                for agent in self._active:
+                    key = (self._weeks[agent.agent_id].get(monday, 0), -agent.priority)
+                    if (best is None or key < best) and eligible(agent):
+                        chosen, best = agent, key
+
+            self._stats["assignments" if chosen is not None else "no_agent"] += 1
+            return chosen
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["agents"] = len(self._active)
+            stats["indexed_days"] = sum(len(days) for days in self._days.values())
+        return stats
+
+
+def load_agents(path):
+    """
+    Reads agents from a JSON file: a list of objects with "id" and optional
+    "calendar_id", "name", "email", "priority" and "active".
+    """
+    with open(path) as f:
+        entries = json.load(f)
+    return [
+        Agent(entry["id"], entry.get("calendar_id"), entry.get("name"), entry.get("email"),
+              int(entry.get("priority", 0)), bool(entry.get("active", True)))
+        for entry in entries
+    ]
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
+
+from backend.calendar_sync import event_interval
+from backend.metrics import EXTERNAL_CALLS, EXTERNAL_ERRORS, EXTERNAL_RETRIES, record_error
+from backend.recurrence import UnsupportedRecurrence, busy_from_events
+
+CALENDAR_API_URL = "https://www.googleapis.com"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _retry_after(headers):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date), if any."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncCalendarClient:
+    """
+    Asyncio Calendar v3 client for fetching many calendars/days concurrently.
+
+    Requests share one keep-alive httpx connection pool per event loop, and a
+    semaphore caps how many are in flight at once so a wide fan-out stays
+    within Google's per-user rate limits. 429/5xx answers and transport
+    errors are retried with backoff; Retry-After is honored up to the
+    longest backoff delay, so a caller waiting in run_sync is never parked
+    for as long as the server asks. With a series cache, recurring events
+    are listed as masters and expanded locally (see recurrence.busy_from_events).
+
+    Args:
+        get_token (callable): Returns a valid OAuth access token (may block; run in an executor)
+        base_url (str): API root, overridable for a local mock server
+        max_concurrency (int): Requests in flight at once
+        timeout (float): Per-request timeout in seconds
+        max_retries (int): Retries after the first attempt
+        backoff (float): First retry delay in seconds, doubled each retry
+        series_cache (SeriesCache, optional): Expands recurring events locally instead of singleEvents=true
+    """
+
+    def __init__(self, get_token, base_url=CALENDAR_API_URL, max_concurrency=10, timeout=30, max_retries=3,
+                 backoff=0.5, series_cache=None):
+        self.get_token = get_token
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.series_cache = series_cache
+        self._per_loop = weakref.WeakKeyDictionary()  # event loop -> (httpx.AsyncClient, asyncio.Semaphore)
+        self._per_loop_lock = threading.Lock()
+
+    def _pool(self):
+        # httpx clients and semaphores belong to the loop they were created on
+        loop = asyncio.get_running_loop()
+        with self._per_loop_lock:
+            pool = self._per_loop.get(loop)
+            if pool is None:
+                import httpx  # Deferred: ~30ms to import, and only needed by fan-out requests
+
+                self._forget_closed_loops()
+                client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=self.max_concurrency,
+                                        max_keepalive_connections=self.max_concurrency),
+                )
+                pool = self._per_loop[loop] = (client, asyncio.Semaphore(self.max_concurrency))
+        return pool
+
+    def _forget_closed_loops(self):
+        # A client whose loop has closed (asyncio.run, or the old loop after a fork) cannot be
+        # closed any more; dropping it lets its connections be collected with the loop
+        for loop in [loop for loop in self._per_loop if loop.is_closed()]:
+            del self._per_loop[loop]
+
+    async def token(self):
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_token)
+
+    def _delay(self, attempt, headers=None):
+        requested = _retry_after(headers) if headers is not None else None
+        if requested is None:
+            requested = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+        return min(requested, self.backoff * (2 ** self.max_retries))
+
+    async def _get(self, path, params, token):
+        import httpx  # Already loaded by _pool()
+
+        client, semaphore = self._pool()
+        headers = {"Authorization": f"Bearer {token}"}
+        for attempt in range(self.max_retries + 1):
+            EXTERNAL_CALLS.labels("calendar", "events.list").inc()
+            try:
+                async with semaphore:
+                    response = await client.get(self.base_url + path, params=params, headers=headers)
+            except httpx.TransportError as err:
+                if attempt == self.max_retries:
+                    record_error("calendar", err)
+                    raise
+                EXTERNAL_RETRIES.labels("calendar").inc()
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                EXTERNAL_RETRIES.labels("calendar").inc()
+                await asyncio.sleep(self._delay(attempt, response.headers))
+                continue
+            if response.is_error:
+                EXTERNAL_ERRORS.labels("calendar", response.status_code).inc()
+            response.raise_for_status()
+            return response.json()
+
+    async def list_events(self, calendar_id, time_min, time_max, token=None, single_events=True):
+        """Returns every event overlapping [time_min, time_max), following pageToken paging."""
+        token = token or await self.token()
+        path = f"/calendar/v3/calendars/{quote(calendar_id, safe='')}/events"
+        params = {"timeMin": time_min.isoformat(), "timeMax": time_max.isoformat()}
+        if single_events:
+            params.update(singleEvents="true", orderBy="startTime")
+        else:
+            params["singleEvents"] = "false"
+        events = []
+        while True:
+            result = await self._get(path, params, token)
+            events.extend(result.get("items", []))
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return events
+            params = dict(params, pageToken=page_token)
+
+    async def busy_intervals(self, calendar_id, time_min, time_max, token=None):
+        """Sorted busy (start, end) intervals, parsed like get_booked_slots does."""
+        if self.series_cache is not None:
+            events = await self.list_events(calendar_id, time_min, time_max, token, single_events=False)
+            try:
+                return busy_from_events(events, time_min, time_max, self.series_cache)
+            except UnsupportedRecurrence:
+                pass  # Let Google expand this window
+        events = await self.list_events(calendar_id, time_min, time_max, token)
+        return sorted(interval for interval in map(event_interval, events) if interval is not None)
+
+    async def busy_many(self, windows, token=None):
+        """
+        Fetches several windows concurrently.
+
+        Args:
+            windows (dict): key -> (calendar_id, time_min, time_max)
+
+        Returns:
+            dict: key -> sorted busy intervals
+        """
+        token = token or await self.token()
+        keys = list(windows)
+        results = await asyncio.gather(*(self.busy_intervals(*windows[key], token=token) for key in keys))
+        return dict(zip(keys, results))
+
+    async def aclose(self):
+        """Closes this event loop's client and forgets those of closed loops."""
+        with self._per_loop_lock:
+            pool = self._per_loop.pop(asyncio.get_running_loop(), None)
+            self._forget_closed_loops()
+        if pool is not None:
+            await pool[0].aclose()
+
+
+# -----------------------------
+# Sync bridge
+# -----------------------------
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop():
+    global _loop, _loop_pid
+    with _loop_lock:
+        # A forked gunicorn worker inherits the variable but not the thread running the loop
+        if _loop is None or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="async-calendar", daemon=True).start()
+            _loop, _loop_pid = loop, os.getpid()
+        return _loop
+
+
+def run_sync(coro, timeout=None):
+    """
+    Runs a coroutine on the shared background event loop and waits for it.
+
+    Lets synchronous Flask handlers use the async client while keeping one
+    connection pool per process, instead of a fresh loop and pool per call
+    as asyncio.run would create. Must not be called from that loop itself.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result(timeout)
@@ -0,0 +1,124 @@
+from datetime import datetime, time, timedelta, timezone
+
+# -----------------------------
+# Rules
+# -----------------------------
+WEEKDAYS = range(7)  # Monday = 0
+
+
+class AvailabilityRules:
+    """
+    Describes when slots may be offered.
+
+    Args:
+        business_hours (dict, optional): weekday -> [(time, time), ...] opening
+            windows; weekdays missing from the dict are closed.
+            Defaults to 09:00-17:00 every day.
+        slot_minutes (int): Length of each offered slot
+        step_minutes (int, optional): Distance between slot starts (defaults to slot_minutes)
+        buffer_minutes (int): Free time required before and after every busy interval
+        tz (tzinfo, optional): Zone the business hours are expressed in
+            (defaults to the server's local zone)
+    """
+
+    def __init__(self, business_hours=None, slot_minutes=30, step_minutes=None, buffer_minutes=0, tz=None):
+        if business_hours is None:
+            business_hours = {weekday: [(time(9, 0), time(17, 0))] for weekday in WEEKDAYS}
+        self.business_hours = {weekday: sorted(windows) for weekday, windows in business_hours.items()}
+        self.slot = timedelta(minutes=slot_minutes)
+        self.step = timedelta(minutes=step_minutes or slot_minutes)
+        self.buffer = timedelta(minutes=buffer_minutes)
+        self.tz = tz
+
+    def windows(self, day):
+        """Returns the opening windows of a day as UTC (start, end) pairs."""
+        result = []
+        for open_at, close_at in self.business_hours.get(day.weekday(), ()):
+            if self.tz is None:
+                start = datetime.combine(day, open_at).astimezone(timezone.utc)
+                end = datetime.combine(day, close_at).astimezone(timezone.utc)
+            else:
+                start = datetime.combine(day, open_at, tzinfo=self.tz).astimezone(timezone.utc)
+                end = datetime.combine(day, close_at, tzinfo=self.tz).astimezone(timezone.utc)
+            result.append((start, end))
+        return result
+
+
+DEFAULT_RULES = AvailabilityRules()
+
+
+# -----------------------------
+# Interval helpers
+# -----------------------------
+def merge_intervals(intervals, buffer=timedelta(0)):
+    """Sorts intervals, widens them by `buffer` and merges overlapping or touching ones."""
+    merged = []
+    for start, end in sorted(intervals):
+        start, end = start - buffer, end + buffer
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+# -----------------------------
+# Sweep
+# -----------------------------
+def _sweep_window(window_start, window_end, busy, index, rules, out):
+    """
+    Emits grid-aligned free slots of one window into `out`.
+
+    `busy` is merged and sorted; `index` is where the previous window stopped.
+    Returns the index to resume from for the next window.
+    """
+    # Windows may overlap, so step back to the first block still reaching into this one
+    while index > 0 and busy[index - 1][1] > window_start:
+        index -= 1
+
+    slot, step = rules.slot, rules.step
+    cursor = window_start
+    count = len(busy)
+    while cursor + slot <= window_end:
+        while index < count and busy[index][1] <= cursor:
+            index += 1
+        if index < count and busy[index][0] < cursor + slot:
+            # Jump to the first grid point at or after the end of the busy block
+            steps = -((cursor - busy[index][1]) // step)
+            cursor += steps * step
+            continue
+        out.append((cursor, cursor + slot))
+        cursor += step
+    return index
+
+
+def free_slots(day, busy, rules=DEFAULT_RULES):
+    """
+    Returns the free (start, end) slots of a day in UTC.
+
+    Args:
+        day (date): Day to compute
+        busy (list): (start, end) busy intervals, in any order
+        rules (AvailabilityRules): Hours, slot length, buffers and zone
+    """
+    return free_slots_range(day, day, busy, rules)[day]
+
+
+def free_slots_range(start_day, end_day, busy, rules=DEFAULT_RULES):
+    """
+    Returns {day: [(start, end), ...]} for every day from start_day to end_day.
+
+    Busy intervals are merged once and swept in a single pass over all days.
+    """
+    merged = merge_intervals(busy, rules.buffer)
+    result = {}
+    index = 0
+    day = start_day
+    while day <= end_day:
+        slots = []
+        for window_start, window_end in rules.windows(day):
+            index = _sweep_window(window_start, window_end, merged, index, rules, slots)
+        result[day] = slots
+        day += timedelta(days=1)
+    return result
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from backend.availability import DEFAULT_RULES
+
+
+class OccupancyGrid:
+    """
+    Bitmap availability for many resources (agents, properties) at once.
+
+    Each resource gets one row of fixed-resolution bins covering the horizon;
+    a bin is set when the resource is busy or outside business hours. Busy
+    intervals are painted in bulk and free runs are found with vectorized
+    prefix sums, so answering "who is free for this slot" across hundreds of
+    resources and weeks of days stays a handful of array operations.
+
+    Intervals are rounded outward to whole bins, so results are conservative
+    at the chosen resolution.
+
+    Args:
+        resources (iterable): Resource ids, one row each
+        start_day (date): First day of the horizon
+        days (int): Number of days covered
+        resolution_minutes (int): Minutes per bin; must divide the slot length
+        rules (AvailabilityRules, optional): Business hours applied to every resource
+    """
+
+    def __init__(self, resources, start_day, days, resolution_minutes=5, rules=DEFAULT_RULES):
+        self.resources = list(resources)
+        self._rows = {resource: row for row, resource in enumerate(self.resources)}
+        self.start_day = start_day
+        self.days = days
+        self.rules = rules
+        self.resolution = timedelta(minutes=resolution_minutes)
+        # Day boundaries follow the rules' zone so windows line up with bins
+        self.origin = datetime.combine(start_day, datetime.min.time(), tzinfo=rules.tz).astimezone(timezone.utc)
+        self.bins = days * 24 * 60 // resolution_minutes
+        self.busy = np.zeros((len(self.resources), self.bins), dtype=bool)
+        self._cumulative = None
+        self._close_outside_hours()
+
+    # -----------------------------
+    # Bin conversion
+    # -----------------------------
+    def _floor_bin(self, moment):
+        return (moment - self.origin) // self.resolution
+
+    def _ceil_bin(self, moment):
+        return -((self.origin - moment) // self.resolution)
+
+    def bin_start(self, index):
+        return self.origin + index * self.resolution
+
+    # -----------------------------
+    # Painting
+    # -----------------------------
+    def _close_outside_hours(self):
+        open_mask = np.zeros(self.bins, dtype=bool)
+        for offset in range(self.days):
+            day = self.start_day + timedelta(days=offset)
+            for window_start, window_end in self.rules.windows(day):
+                lo = max(self._ceil_bin(window_start), 0)
+                hi = min(self._floor_bin(window_end), self.bins)
+                if lo < hi:
+                    open_mask[lo:hi] = True
+        self.busy |= ~open_mask
+
+    def paint(self, intervals_by_resource):
+        """
+        Marks busy intervals for many resources in one vectorized pass.
+
+        Args:
+            intervals_by_resource (dict): resource -> [(start, end), ...]
+        """
+        buffer = self.rules.buffer.total_seconds()
+        rows, starts, ends = [], [], []
+        for resource, intervals in intervals_by_resource.items():
+            row = self._rows[resource]
+            for start, end in intervals:
+                rows.append(row)
+                starts.append(start.timestamp())
+                ends.append(end.timestamp())
+        if not rows:
+            return
+
+        # Convert epoch seconds to bin indices in bulk, rounding outward
+        origin = self.origin.timestamp()
+        width = self.resolution.total_seconds()
+        rows = np.asarray(rows, dtype=np.intp)
+        starts = np.floor((np.asarray(starts) - buffer - origin) / width).astype(np.int64)
+        ends = np.ceil((np.asarray(ends) + buffer - origin) / width).astype(np.int64)
+        starts = np.clip(starts, 0, self.bins)
+        ends = np.clip(ends, 0, self.bins)
+        keep = starts < ends
+        rows, starts, ends = rows[keep], starts[keep], ends[keep]
+
+        # Difference array: +1 where an interval opens, -1 where it closes
+        delta = np.zeros((len(self.resources), self.bins + 1), dtype=np.int32)
+        np.add.at(delta, (rows, starts), 1)
+        np.add.at(delta, (rows, ends), -1)
+        self.busy |= np.cumsum(delta, axis=1)[:, :self.bins] > 0
+        self._cumulative = None
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def _busy_prefix(self):
+        # prefix[r, i] = number of busy bins of resource r before bin i
+        if self._cumulative is None:
+            prefix = np.zeros((len(self.resources), self.bins + 1), dtype=np.int32)
+            np.cumsum(self.busy, axis=1, out=prefix[:, 1:])
+            self._cumulative = prefix
+        return self._cumulative
+
+    def free_resources(self, start, end):
+        """Returns the set of resources free for the whole of [start, end)."""
+        lo = max(self._floor_bin(start), 0)
+        hi = min(self._ceil_bin(end), self.bins)
+        if lo >= hi:
+            return set()
+        prefix = self._busy_prefix()
+        free = (prefix[:, hi] - prefix[:, lo]) == 0
+        return {self.resources[row] for row in np.flatnonzero(free)}
+
+    def free_matrix(self, slot_minutes=None, step_minutes=None):
+        """
+        Returns (first_bins, free) where free[r, k] says whether resource r
+        is free for the slot starting at bin first_bins[k]. Slot starts are
+        step multiples from midnight, so they match the scalar engine when
+        business hours open on a step boundary.
+        """
+        slot = timedelta(minutes=slot_minutes) if slot_minutes else self.rules.slot
+        step = timedelta(minutes=step_minutes) if step_minutes else self.rules.step
+        width = slot // self.resolution
+        stride = step // self.resolution
+        first_bins = np.arange(0, self.bins - width + 1, stride)
+        prefix = self._busy_prefix()
+        free = (prefix[:, first_bins + width] - prefix[:, first_bins]) == 0
+        return first_bins, free
+
+    def free_resources_by_slot(self, slot_minutes=None, step_minutes=None):
+        """
+        Returns [(slot_start, slot_end, {resource, ...}), ...] for every slot
+        where at least one resource is free.
+        """
+        slot = timedelta(minutes=slot_minutes) if slot_minutes else self.rules.slot
+        first_bins, free = self.free_matrix(slot_minutes, step_minutes)
+        result = []
+        for column in np.flatnonzero(free.any(axis=0)):
+            start = self.bin_start(int(first_bins[column]))
+            rows = np.flatnonzero(free[:, column])
+            result.append((start, start + slot, {self.resources[row] for row in rows}))
+        return result
@@ -0,0 +1,338 @@
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from backend.config import (
+    BOOKINGS_DB, BOOKING_WORKERS, BOOKING_MAX_ATTEMPTS, CONFIRMATION_EMAILS,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS booking_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL,
+    affinity TEXT,
+    affinity_until REAL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_booking_jobs_due ON booking_jobs (status, next_attempt_at);
+"""
+# Columns added after the first release, for databases created before them
+MIGRATIONS = {
+    "affinity": "ALTER TABLE booking_jobs ADD COLUMN affinity TEXT",
+    "affinity_until": "ALTER TABLE booking_jobs ADD COLUMN affinity_until REAL",
+}
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help."""
+
+
+class Job:
+    """A claimed job handed to the handler; `state` survives retries and restarts."""
+
+    def __init__(self, queue, row):
+        self._queue = queue
+        self.id = row["id"]
+        self.payload = json.loads(row["payload"])
+        self.state = json.loads(row["state"])
+        self.attempts = row["attempts"]
+        self.max_attempts = queue.max_attempts
+
+    @property
+    def last_attempt(self):
+        return self.attempts + 1 >= self.max_attempts
+
+    def save_state(self):
+        """Checkpoints progress so a retry skips completed steps."""
+        self._queue._update(self.id, state=json.dumps(self.state))
+
+
+class JobQueue:
+    """
+    Persistent SQLite job queue with an in-process worker pool.
+
+    Jobs survive restarts: workers claim a job by taking a time-limited lease,
+    so jobs left running by a crashed process become claimable again once the
+    lease expires. Failures are retried with exponential backoff and jitter.
+    Several processes may share one database file; a job enqueued with an
+    affinity TTL is only claimed by the enqueuing queue (process) until that
+    TTL runs out, so it can use state kept in that process's memory, such as
+    a slot hold, and falls back to any process if its owner goes away.
+
+    Args:
+        path (str): Database file path
+        handler (callable): Called with a Job; returns nothing, raises to retry
+        workers (int): Worker threads
+        max_attempts (int): Attempts before a job is marked failed
+        base_delay (float): First retry delay in seconds, doubled each attempt
+        max_delay (float): Upper bound on the retry delay
+        lease (float): Seconds a claimed job is reserved for its worker
+        on_failure (callable, optional): Called with a Job once it has failed for good
+    """
+
+    def __init__(self, path, handler, workers=4, max_attempts=5, base_delay=1.0, max_delay=60.0, lease=120.0,
+                 on_failure=None, poll_interval=1.0):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.on_failure = on_failure
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self.process_id = uuid.uuid4().hex  # Affinity key of the jobs this queue enqueues
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(booking_jobs)")}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    try:
+                        conn.execute(statement)
+                    except sqlite3.OperationalError:
+                        pass  # Added concurrently by another connection
+            self._local.conn = conn
+        return conn
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._connect().execute(f"UPDATE booking_jobs SET {assignments} WHERE id = ?", [*fields.values(), job_id])
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def enqueue(self, payload, job_id=None, affinity_ttl=None):
+        """
+        Queues a job and returns its id. With `affinity_ttl`, only this queue
+        may claim it for that many seconds.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        affinity, affinity_until = (self.process_id, now + affinity_ttl) if affinity_ttl else (None, None)
+        self._connect().execute(
+            "INSERT INTO booking_jobs "
+            "(id, status, payload, affinity, affinity_until, next_attempt_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(payload), affinity, affinity_until, now, now, now),
+        )
+        self._wakeup.set()
+        return job_id
+
+    def status(self, job_id):
+        row = self._connect().execute("SELECT * FROM booking_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "state": json.loads(row["state"]),
+            "error": row["error"],
+            "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+            "updated_at": datetime.fromtimestamp(row["updated_at"]).isoformat(),
+        }
+
+    # -----------------------------
+    # Worker side
+    # -----------------------------
+    def _claim(self):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM booking_jobs "
+                "WHERE ((status = ? AND next_attempt_at <= ?) OR (status = ? AND lease_until < ?)) "
+                "AND (affinity IS NULL OR affinity = ? OR affinity_until < ?) "
+                "ORDER BY next_attempt_at LIMIT 1",
+                (QUEUED, now, RUNNING, now, self.process_id, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE booking_jobs SET status = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                    (RUNNING, now + self.lease, now, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return Job(self, row) if row is not None else None
+
+    def _backoff(self, attempts):
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_once(self):
+        """Claims and runs one due job. Returns False if none was due."""
+        job = self._claim()
+        if job is None:
+            return False
+
+        try:
+            self.handler(job)
+        except Exception as e:
+            attempts = job.attempts + 1
+            permanent = isinstance(e, PermanentJobError) or attempts >= self.max_attempts
+            if permanent:
+                self._update(job.id, status=FAILED, attempts=attempts, error=str(e), lease_until=None,
+                             state=json.dumps(job.state))
+                if self.on_failure:
+                    self.on_failure(job)
+            else:
+                self._update(job.id, status=QUEUED, attempts=attempts, error=str(e), lease_until=None,
+                             state=json.dumps(job.state), next_attempt_at=time.time() + self._backoff(attempts))
+        else:
+            self._update(job.id, status=DONE, attempts=job.attempts + 1, error=None, lease_until=None,
+                         state=json.dumps(job.state))
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Clear before looking for work so an enqueue during run_once is not missed
+            self._wakeup.clear()
+            try:
+                if self.run_once():
+                    continue
+            except sqlite3.OperationalError:
+                pass  # Database busy; try again on the next poll
+            self._wakeup.wait(self.poll_interval)
+
+    def start(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"booking-worker-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+# -----------------------------
+# Booking handler
+# -----------------------------
+def process_booking(job):
+    """Creates the Calendar event, then sends the confirmation email."""
+    from backend.google_calendar import book_slot, book_with_agent, hold_slot
+    from backend.reservations import SlotConflict
+
+    payload = job.payload
+    if "event_link" not in job.state:
+        booking = dict(
+            summary=payload.get("summary", "Real Estate Consultation"),
+            start_time=datetime.fromisoformat(payload["start_time"]),
+            end_time=datetime.fromisoformat(payload["end_time"]),
+            client_email=payload["email"],
+            description=payload.get("description", ""),
+            recurring=payload.get("recurring", False),
+        )
+        # Same id on every attempt, so a retry after a lost insert response finds the
+        # event instead of creating a second one (jobs queued before ids get one here)
+        event_id = payload.get("event_id") or job.state.get("event_id")
+        if event_id is None:
+            event_id = job.state["event_id"] = uuid.uuid4().hex
+            job.save_state()
+        try:
+            if payload.get("assign_agent"):
+                agent, job.state["event_link"] = book_with_agent(event_id=event_id, **booking)
+                job.state["agent"] = agent.name
+            else:
+                # Renews the request's hold, or takes one if this process does not know it,
+                # and keeps it across failed attempts; _release_hold frees it once the job gives up
+                hold_id = hold_slot(booking["start_time"], booking["end_time"], owner=booking["client_email"],
+                                    hold_id=job.state.get("hold_id") or payload.get("hold_id"))
+                if job.state.get("hold_id") != hold_id:
+                    job.state["hold_id"] = hold_id
+                    job.save_state()
+                job.state["event_link"] = book_slot(hold_id=hold_id, event_id=event_id, release_on_error=False,
+                                                    **booking)
+        except SlotConflict as e:
+            raise PermanentJobError(f"Selected time slot was just booked by someone else ({e})")
+        job.save_state()
+
+    if CONFIRMATION_EMAILS and "email_sent" not in job.state:
+        from backend.gmail_service import send_email
+
+        result = send_email(
+            payload["email"],
+            "Your consultation is booked",
+            f"Your appointment on {payload.get('time_slot', payload['start_time'])} is confirmed.\n"
+            f"Calendar link: {job.state['event_link']}",
+        )
+        if result.startswith("Email sent"):
+            job.state["email_sent"] = True
+        elif job.last_attempt:
+            # The booking itself succeeded; report the email problem instead of failing it
+            job.state["email_error"] = result
+        else:
+            raise RuntimeError(result)
+
+
+def _release_hold(job):
+    from backend.google_calendar import release_slot
+
+    hold_id = job.state.get("hold_id") or job.payload.get("hold_id")
+    if hold_id and "event_link" not in job.state:
+        release_slot(hold_id)
+
+
+_booking_queue = None
+_booking_queue_lock = threading.Lock()
+
+
+def get_booking_queue():
+    """Returns the process-wide booking queue, starting its workers on first use."""
+    global _booking_queue
+    if _booking_queue is None:
+        with _booking_queue_lock:
+            if _booking_queue is None:
+                queue = JobQueue(
+                    BOOKINGS_DB, process_booking,
+                    workers=BOOKING_WORKERS,
+                    max_attempts=BOOKING_MAX_ATTEMPTS,
+                    on_failure=_release_hold,
+                )
+                queue.start()
+                _booking_queue = queue
+    return _booking_queue
+
+
+def stop_booking_queue(timeout=None):
+    """Stops the booking queue's workers, if started, waiting for running jobs."""
+    global _booking_queue
+    with _booking_queue_lock:
+        queue, _booking_queue = _booking_queue, None
+    if queue is not None:
+        queue.stop(timeout)
@@ -0,0 +1,301 @@
+import json
+import re
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+DEFAULT_DURATION = 60  # minutes
+
+ParsedBooking = namedtuple("ParsedBooking", "intent start duration email summary tier day", defaults=(None,))
+ParsedBooking.__doc__ = """
+Structured booking request.
+
+    intent (str): "book", "cancel", "availability" or "unknown"
+    start (datetime or None): Naive local start time; None unless the text gives a time of day
+    duration (int): Minutes
+    email (str or None): First email address in the text
+    summary (str): Text before the date/time, used as the event title
+    tier (str): Which parser answered: "regex", "dateparser", "llm" or "none"
+    day (date or None): Requested date, also set when no time of day was given
+"""
+
+# -----------------------------
+# Tier 1: compiled regex grammar
+# -----------------------------
+_WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_MONTH_NAMES = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_INTENT_RES = [
+    ("cancel", re.compile(r"\b(cancel|delete|remove|call off)\b", re.I)),
+    ("book", re.compile(r"\b(book|schedule|reserve|set up|arrange)\b", re.I)),
+    ("availability", re.compile(r"\b(available|availability|free|open|slots?|show|list)\b", re.I)),
+    ("book", re.compile(r"\b(add|meet|meeting|appointment|consultation|visit|call)\b", re.I)),
+]
+_DURATION_RE = re.compile(
+    r"\bfor\s+(?:(an?|one|half an?)\s+(hour|hr)|(\d+(?:\.\d+)?)\s*(minutes?|mins?|m|hours?|hrs?|h))\b", re.I
+)
+# "day after tomorrow" first, so it is never read as "tomorrow"
+_RELATIVE_RE = re.compile(r"\b(day after tomorrow|today|tonight|tomorrow)\b", re.I)
+_IN_RE = re.compile(r"\bin\s+(\d{1,3}|an?|one)\s+(days?|weeks?)\b", re.I)
+_WEEKDAY_RE = re.compile(r"\b(?:(next|this)\s+)?(mon|tue|wed|thu|fri|sat|sun)(?:day|sday|nesday|rsday|urday)?\b",
+                         re.I)
+_ISO_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})(?:[ T](\d{1,2}):(\d{2}))?\b")
+_MONTH_DAY_RE = re.compile(r"\b" + _MONTH_NAMES + r"\s+(\d{1,2})(?:st|nd|rd|th)?\b(?!\s*(?:[ap]\.?m\b|:))", re.I)
+_DAY_OF_MONTH_RE = re.compile(r"\bthe\s+(\d{1,2})(?:st|nd|rd|th)\b(?!\s+(?:of\s+)?" + _MONTH_NAMES + ")", re.I)
+_DAY_MONTH_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?" + _MONTH_NAMES + r"(?=\W|$)", re.I)
+_TIME_RE = re.compile(
+    r"\b(?:(\d{1,2})(?::(\d{2}))?\s*([ap])\.?m\.?(?=\W|$)|(\d{1,2}):(\d{2})\b|(noon|midday|midnight)\b)", re.I
+)
+
+
+def _duration(text):
+    match = _DURATION_RE.search(text)
+    if match is None:
+        return DEFAULT_DURATION
+    if match.group(2):
+        return 30 if match.group(1).lower().startswith("half") else 60
+    amount, unit = float(match.group(3)), match.group(4).lower()
+    return int(amount * 60) if unit.startswith("h") else int(amount)
+
+
+def _intent(text):
+    for intent, pattern in _INTENT_RES:
+        if pattern.search(text):
+            return intent
+    return "unknown"
+
+
+def _find_date(text, today):
+    """Returns (date, match start) for the first date expression, or (None, None)."""
+    match = _ISO_RE.search(text)
+    if match:
+        try:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3))), match.start()
+        except ValueError:
+            return None, None
+
+    match = _RELATIVE_RE.search(text)
+    if match:
+        offset = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}[match.group(1).lower()]
+        return today + timedelta(days=offset), match.start()
+
+    match = _IN_RE.search(text)
+    if match:
+        amount = int(match.group(1)) if match.group(1).isdigit() else 1
+        return today + timedelta(days=amount * (7 if match.group(2).lower().startswith("week") else 1)), match.start()
+
+    match = _WEEKDAY_RE.search(text)
+    if match:
+        ahead = (_WEEKDAYS.index(match.group(2).lower()) - today.weekday()) % 7
+        if match.group(1) and match.group(1).lower() == "next" and ahead == 0:
+            ahead = 7
+        return today + timedelta(days=ahead), match.start()
+
+    # "5th of November 4 pm" must not read as November 4, so the earliest match wins
+    candidates = [(match.start(), match, month_group, day_group)
+                  for pattern, month_group, day_group in ((_MONTH_DAY_RE, 1, 2), (_DAY_MONTH_RE, 2, 1))
+                  for match in [pattern.search(text)] if match]
+    if candidates:
+        _, match, month_group, day_group = min(candidates, key=lambda candidate: candidate[0])
+        month = _MONTHS.index(match.group(month_group).lower()) + 1
+        try:
+            found = date(today.year, month, int(match.group(day_group)))
+            if found < today:
+                found = found.replace(year=today.year + 1)
+        except ValueError:
+            return None, None
+        return found, match.start()
+
+    # "the 5th": the next 5th of a month, this month's if it is still ahead
+    match = _DAY_OF_MONTH_RE.search(text)
+    if match:
+        year, month = today.year, today.month
+        if int(match.group(1)) < today.day:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        try:
+            return date(year, month, int(match.group(1))), match.start()
+        except ValueError:
+            return None, None
+    return None, None
+
+
+def _find_time(text):
+    """Returns (hour, minute) for the first time expression, or None."""
+    for match in _TIME_RE.finditer(text):
+        if match.group(1):
+            hour, minute = int(match.group(1)), int(match.group(2) or 0)
+            if hour > 12:
+                continue
+            hour = hour % 12 + (12 if match.group(3).lower() == "p" else 0)
+        elif match.group(4):
+            hour, minute = int(match.group(4)), int(match.group(5))
+        else:
+            hour, minute = (0, 0) if match.group(6).lower() == "midnight" else (12, 0)
+        if hour < 24 and minute < 60:
+            return hour, minute
+    return None
+
+
+def _summary(text, cut):
+    summary = text[:cut] if cut is not None else text.split(" at ")[0]
+    summary = EMAIL_RE.sub("", summary)
+    summary = re.sub(r"(^|\s+)(on|at|for|this|next|the)\s*$", "", summary.strip(" ,-|"), flags=re.I)
+    return summary.strip() or "Meeting"
+
+
+def parse_fast(text, now=None):
+    """
+    Regex fast path for the common forms ("tomorrow 3pm", "next Monday 10:30",
+    "2025-10-01 14:00", "Oct 5 at 4 pm", "in 2 days", "the 5th"). Returns
+    None unless a date is found, so such text falls through to the slower
+    tiers; a date without a time of day gives start None.
+    """
+    now = now or datetime.now()
+    found_date, cut = _find_date(text, now.date())
+    if found_date is None:
+        return None
+    iso = _ISO_RE.search(text)
+    if iso and iso.group(4):
+        found_time = (int(iso.group(4)), int(iso.group(5)))
+    else:
+        found_time = _find_time(text)
+    if found_time is not None and (found_time[0] > 23 or found_time[1] > 59):
+        return None
+
+    email = EMAIL_RE.search(text)
+    return ParsedBooking(
+        intent=_intent(text),
+        start=datetime.combine(found_date, datetime.min.time()).replace(hour=found_time[0], minute=found_time[1])
+        if found_time else None,
+        duration=_duration(text),
+        email=email.group(0) if email else None,
+        summary=_summary(text, cut),
+        tier="regex",
+        day=found_date,
+    )
+
+
+# -----------------------------
+# Tier 2: dateparser, English only
+# -----------------------------
+# RETURN_TIME_AS_PERIOD tells "in 2 days" (period "day", clock time of RELATIVE_BASE) from "in 2 days at 10am"
+DATEPARSER_SETTINGS = {"PREFER_DATES_FROM": "future", "PREFER_DAY_OF_MONTH": "first", "RETURN_TIME_AS_PERIOD": True}
+_date_parser = None
+
+
+def _get_date_parser(now):
+    """Pinned-language parser; built once (per relative base) instead of per call."""
+    global _date_parser
+    from dateparser.date import DateDataParser  # Deferred: importing dateparser takes ~0.5s
+
+    if now is not None:
+        return DateDataParser(languages=["en"], settings=dict(DATEPARSER_SETTINGS, RELATIVE_BASE=now))
+    if _date_parser is None:
+        _date_parser = DateDataParser(languages=["en"], settings=DATEPARSER_SETTINGS)
+    return _date_parser
+
+
+def parse_dateparser(text, now=None):
+    """
+    Parses the whole text with dateparser, then searches it for an embedded
+    date. start is None when the text names a day but no time of day.
+    """
+    data = _get_date_parser(now).get_date_data(text)
+    start, has_time = data.date_obj, data.period == "time"
+    cut = None
+    if start is None:
+        from dateparser.search import search_dates
+
+        settings = dict(DATEPARSER_SETTINGS, RELATIVE_BASE=now) if now is not None else DATEPARSER_SETTINGS
+        found = search_dates(EMAIL_RE.sub(" ", text), languages=["en"], settings=settings)
+        if not found:
+            return None
+        phrase, start = found[0]
+        cut = text.find(phrase)
+        # search_dates drops the time of day from phrases like "in 2 days at 10am"
+        found_time = _find_time(text)
+        has_time = found_time is not None
+        if has_time:
+            start = start.replace(hour=found_time[0], minute=found_time[1])
+
+    email = EMAIL_RE.search(text)
+    return ParsedBooking(
+        intent=_intent(text),
+        # Without a time of day dateparser keeps the clock time of "now"; never book that
+        start=start.replace(tzinfo=None, second=0, microsecond=0) if has_time else None,
+        duration=_duration(text),
+        email=email.group(0) if email else None,
+        summary=_summary(text, cut),
+        tier="dateparser",
+        day=start.date(),
+    )
+
+
+# -----------------------------
+# Tier 3: LLM fallback
+# -----------------------------
+LLM_SYSTEM_PROMPT = (
+    "Extract the booking request from the user's message. Reply with JSON only, using the keys "
+    '"intent" (one of "book", "cancel", "availability", "unknown"), "start" (ISO 8601 local time or null), '
+    '"duration_minutes" (integer or null), "email" (string or null) and "summary" (short title). '
+    "The current time is {now}."
+)
+
+
+def parse_llm(text, now=None, llm=None):
+    """Asks the LLM for the structured fields; returns None if the reply is unusable."""
+    now = now or datetime.now()
+    if llm is None:
+        from backend.groq_provider import ask_groq as llm
+
+    reply = llm(text, LLM_SYSTEM_PROMPT.format(now=now.isoformat(timespec="minutes")))
+    match = re.search(r"\{.*\}", reply or "", re.S)
+    if match is None:
+        return None
+    try:
+        data = json.loads(match.group(0))
+        start = datetime.fromisoformat(data["start"]).replace(tzinfo=None) if data.get("start") else None
+    except (ValueError, TypeError, KeyError):
+        return None
+
+    return ParsedBooking(
+        intent=data.get("intent") or "unknown",
+        start=start,
+        duration=int(data.get("duration_minutes") or DEFAULT_DURATION),
+        email=data.get("email") or (EMAIL_RE.search(text).group(0) if EMAIL_RE.search(text) else None),
+        summary=data.get("summary") or _summary(text, None),
+        tier="llm",
+        day=start.date() if start else None,
+    )
+
+
+def parse_booking(text, now=None, use_llm=True, llm=None):
+    """
+    Parses a free-text booking request, trying the cheapest tier first.
+
+    Args:
+        text (str): User message, e.g. "Site visit tomorrow at 3pm for 30 minutes"
+        now (datetime, optional): Naive local reference time, defaults to now
+        use_llm (bool): Allow the LLM fallback
+        llm (callable, optional): (prompt, system_prompt) -> str, defaults to ask_groq
+
+    Returns:
+        ParsedBooking: start None (and day set) when a date but no time of
+            day was found; tier "none" with both None when nothing could be parsed
+    """
+    parsed = parse_fast(text, now)
+    if parsed is not None and parsed.start is None:
+        # The grammar may just not know this time phrase; dateparser may, for the same day
+        fallback = parse_dateparser(text, now)
+        if fallback is not None and fallback.start is not None and fallback.day == parsed.day:
+            parsed = fallback
+    elif parsed is None:
+        parsed = parse_dateparser(text, now)
+    if parsed is None and use_llm:
+        parsed = parse_llm(text, now, llm)
+    if parsed is None:
+        email = EMAIL_RE.search(text)
+        parsed = ParsedBooking(_intent(text), None, _duration(text), email.group(0) if email else None,
+                               _summary(text, None), "none")
+    return parsed
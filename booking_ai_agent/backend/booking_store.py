@@ -0,0 +1,177 @@
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from backend.config import BOOKINGS_DB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    calendar_id TEXT NOT NULL DEFAULT 'primary',
+    event_id TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bookings_start ON bookings (start_time);
+-- Also serves lookups by email, already ordered by start_time. Not unique: a client may cancel in
+-- Google Calendar and book the same slot again, which is a new event and a new row.
+DROP INDEX IF EXISTS idx_bookings_email;
+CREATE INDEX IF NOT EXISTS idx_bookings_email_start ON bookings (email, start_time, end_time);
+"""
+
+
+def _to_text(moment):
+    # Uniform UTC ISO strings sort chronologically, so range queries can use the index
+    return moment.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _row_to_dict(row):
+    booking = dict(row)
+    booking["start_time"] = datetime.fromisoformat(booking["start_time"])
+    booking["end_time"] = datetime.fromisoformat(booking["end_time"])
+    return booking
+
+
+class BookingStore:
+    """
+    SQLite-backed booking repository.
+
+    Runs in WAL mode so readers never block the writer, and every write is a
+    transaction, so concurrent gunicorn workers cannot interleave records.
+    Each thread gets its own connection; the database file is only opened on
+    first use.
+
+    Args:
+        path (str): Database file path
+    """
+
+    def __init__(self, path=BOOKINGS_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def add(self, email, start_time, end_time, description="", calendar_id="primary", event_id=None):
+        """Stores a booking and returns its id."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO bookings "
+                "(email, start_time, end_time, description, calendar_id, event_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (email, _to_text(start_time), _to_text(end_time), description or "", calendar_id, event_id,
+                 _to_text(datetime.now(timezone.utc))),
+            )
+            return cursor.lastrowid
+
+    def add_many(self, bookings, skip_existing=False):
+        """
+        Stores many bookings in a single transaction.
+
+        Args:
+            bookings (iterable): dicts with email, start_time, end_time and optional
+                description, calendar_id, event_id
+            skip_existing (bool): Skip rows whose email, start and end are already
+                stored (or appear earlier in `bookings`), for rerunnable imports
+
+        Returns:
+            int: Number of new rows
+        """
+        created_at = _to_text(datetime.now(timezone.utc))
+        rows = [
+            (b["email"], _to_text(b["start_time"]), _to_text(b["end_time"]), b.get("description") or "",
+             b.get("calendar_id", "primary"), b.get("event_id"), created_at)
+            for b in bookings
+        ]
+        query = ("INSERT INTO bookings "
+                 "(email, start_time, end_time, description, calendar_id, event_id, created_at) ")
+        if skip_existing:
+            # Sees rows inserted earlier in this transaction, so duplicates within `rows` are skipped too
+            query += ("SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7 WHERE NOT EXISTS "
+                      "(SELECT 1 FROM bookings WHERE email = ?1 AND start_time = ?2 AND end_time = ?3)")
+        else:
+            query += "VALUES (?, ?, ?, ?, ?, ?, ?)"
+        conn = self._connect()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(query, rows)
+            return conn.total_changes - before
+
+    def for_email(self, email):
+        rows = self._connect().execute(
+            "SELECT * FROM bookings WHERE email = ? ORDER BY start_time", (email,)
+        ).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def between(self, start, end, calendar_id=None):
+        """Returns bookings overlapping [start, end), ordered by start."""
+        query = "SELECT * FROM bookings WHERE start_time < ? AND end_time > ?"
+        params = [_to_text(end), _to_text(start)]
+        if calendar_id is not None:
+            query += " AND calendar_id = ?"
+            params.append(calendar_id)
+        rows = self._connect().execute(query + " ORDER BY start_time", params).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def on_day(self, day, tz=None):
+        """Returns bookings starting on a calendar day (server local zone unless tz is given)."""
+        start = datetime.combine(day, datetime.min.time(), tzinfo=tz).astimezone(timezone.utc)
+        end = datetime.combine(day, datetime.max.time(), tzinfo=tz).astimezone(timezone.utc)
+        rows = self._connect().execute(
+            "SELECT * FROM bookings WHERE start_time >= ? AND start_time <= ? ORDER BY start_time",
+            (_to_text(start), _to_text(end)),
+        ).fetchall()
+        return [_row_to_dict(row) for row in rows]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    def import_csv(self, csv_path):
+        """
+        One-shot import of a legacy bookings.csv (Email, Start Time, End Time,
+        Description). Rows already present are skipped, so it is safe to rerun.
+
+        Returns:
+            int: Number of new rows
+        """
+        with open(csv_path, newline="") as csvfile:
+            bookings = [{
+                "email": row["Email"],
+                "start_time": datetime.fromisoformat(row["Start Time"]),
+                "end_time": datetime.fromisoformat(row["End Time"]),
+                "description": row.get("Description", ""),
+            } for row in csv.DictReader(csvfile)]
+        return self.add_many(bookings, skip_existing=True)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Import a legacy bookings.csv into the booking database")
+    parser.add_argument("csv_path", nargs="?", default=os.path.join(os.path.dirname(__file__), "bookings.csv"))
+    parser.add_argument("--db", default=BOOKINGS_DB)
+    args = parser.parse_args()
+
+    store = BookingStore(args.db)
+    imported = store.import_csv(args.csv_path)
+    print(f"✅ Imported {imported} booking(s) into {args.db} ({store.count()} total)")
+
+
+if __name__ == "__main__":
+    main()
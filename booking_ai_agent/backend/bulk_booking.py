@@ -0,0 +1,304 @@
+import argparse
+import csv
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from backend.interval_tree import IntervalTree
+from backend.metrics import EXTERNAL_CALLS, EXTERNAL_RETRIES, record_error
+
+BATCH_SIZE = 50  # Calendar accepts up to 1000 calls per batch but throttles above ~50
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_SUMMARY = "Real Estate Consultation"
+
+# Result statuses
+CREATED = "created"
+VALID = "valid"          # Passed validation on a dry run
+INVALID = "invalid"      # Malformed row
+CONFLICT = "conflict"    # Overlaps a calendar event, a hold or an earlier row
+FAILED = "failed"        # Calendar rejected the insert, or retries ran out
+
+
+class BulkBooking:
+    """
+    One row of a bulk import.
+
+    Args:
+        row (int): Line number in the source file (1 = first data row)
+        email (str): Client email, added as an attendee
+        start_time (datetime): Aware start
+        end_time (datetime): Aware end
+        summary (str): Event title
+        description (str): Event description
+    """
+
+    __slots__ = ("row", "email", "start_time", "end_time", "summary", "description")
+
+    def __init__(self, row, email, start_time, end_time, summary=DEFAULT_SUMMARY, description=""):
+        self.row = row
+        self.email = email
+        self.start_time = start_time
+        self.end_time = end_time
+        self.summary = summary
+        self.description = description
+
+
+def result(booking_or_row, status, error=None, event=None):
+    """Per-row outcome, JSON-serializable for the CLI report."""
+    booking = booking_or_row if isinstance(booking_or_row, BulkBooking) else None
+    outcome = {"row": booking.row if booking else booking_or_row, "status": status}
+    if booking is not None:
+        outcome.update(email=booking.email, start_time=booking.start_time.isoformat(),
+                       end_time=booking.end_time.isoformat())
+    if event is not None:
+        outcome.update(event_id=event.get("id"), link=event.get("htmlLink"))
+    if error is not None:
+        outcome["error"] = str(error)
+    return outcome
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def _parse_time(value, tz):
+    moment = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz) if tz is not None else moment.astimezone()
+    return moment
+
+
+def parse_row(row, fields, tz=None):
+    """
+    Builds a BulkBooking from a CSV/JSONL record with email, start and either
+    end or duration_minutes, plus optional summary and description. Naive
+    times are read in `tz` (the server zone if None).
+
+    Raises:
+        ValueError: If a field is missing or malformed
+    """
+    email = (fields.get("email") or "").strip()
+    if "@" not in email:
+        raise ValueError(f"invalid email {email!r}")
+    if not fields.get("start"):
+        raise ValueError("missing start")
+    start_time = _parse_time(fields["start"], tz)
+    if fields.get("end"):
+        end_time = _parse_time(fields["end"], tz)
+    elif fields.get("duration_minutes"):
+        end_time = start_time + timedelta(minutes=int(fields["duration_minutes"]))
+    else:
+        raise ValueError("missing end or duration_minutes")
+    if end_time <= start_time:
+        raise ValueError("end is not after start")
+    return BulkBooking(row, email, start_time, end_time,
+                       summary=fields.get("summary") or DEFAULT_SUMMARY,
+                       description=fields.get("description") or "")
+
+
+def load_bookings(path, tz=None):
+    """
+    Reads a .csv (with a header row) or .jsonl file of bookings.
+
+    Returns:
+        tuple: ([BulkBooking], [result dicts for rows that could not be parsed])
+    """
+    with open(path, newline="") as handle:
+        if path.endswith(".jsonl"):
+            records = [(n, line) for n, line in enumerate(handle, 1) if line.strip()]
+            records = [(n, _json_record(line)) for n, line in records]
+        else:
+            records = list(enumerate(csv.DictReader(handle), 1))
+
+    bookings, invalid = [], []
+    for row, fields in records:
+        try:
+            if isinstance(fields, Exception):
+                raise fields
+            bookings.append(parse_row(row, fields, tz))
+        except (ValueError, TypeError) as err:
+            invalid.append(result(row, INVALID, err))
+    return bookings, invalid
+
+
+def _json_record(line):
+    try:
+        record = json.loads(line)
+    except ValueError as err:
+        return ValueError(f"invalid JSON: {err}")
+    return record if isinstance(record, dict) else ValueError("expected a JSON object")
+
+
+# -----------------------------
+# Validation
+# -----------------------------
+def validate_bookings(bookings, busy, buffer=timedelta(0), now=None):
+    """
+    Checks every booking against one busy list (from a single range fetch)
+    and against the rows accepted before it, so a file cannot double-book
+    itself. Overlap checks are O(log n) on an interval tree.
+
+    Args:
+        bookings (list): BulkBooking rows, in file order
+        busy (iterable): (start, end) intervals already on the calendar or held
+        buffer (timedelta): Gap required around existing meetings (not between rows)
+        now (datetime, optional): Bookings starting earlier are rejected
+
+    Returns:
+        tuple: ([accepted BulkBooking], [result dicts for rejected rows])
+    """
+    now = now or datetime.now(timezone.utc)
+    # The buffer pads existing meetings only; rows of the file may be back to back
+    index = IntervalTree((start - buffer, end + buffer, "calendar") for start, end in busy)
+    accepted, rejected = [], []
+    for booking in bookings:
+        if booking.start_time < now:
+            rejected.append(result(booking, INVALID, "starts in the past"))
+            continue
+        clashes = index.overlapping(booking.start_time, booking.end_time)
+        if clashes:
+            owner = clashes[0][2]
+            rejected.append(result(booking, CONFLICT, f"overlaps {owner}"))
+            continue
+        index.insert(booking.start_time, booking.end_time, f"row {booking.row}")
+        accepted.append(booking)
+    return accepted, rejected
+
+
+# -----------------------------
+# Batched insert
+# -----------------------------
+def _status(error):
+    return getattr(getattr(error, "resp", None), "status", None)
+
+
+def _retryable(error):
+    status = _status(error)
+    if status is None:
+        return True  # Transport error: the whole batch round-trip failed
+    if status == 403:
+        return b"ateLimitExceeded" in (getattr(error, "content", b"") or b"")
+    return status in RETRY_STATUSES
+
+
+def insert_events(service, calendar_id, bodies, batch_size=BATCH_SIZE, max_attempts=4, backoff=1.0,
+                  send_updates="all", sleep=time.sleep):
+    """
+    Inserts events with BatchHttpRequest, up to `batch_size` per round-trip.
+
+    Items failing with 429/5xx (or a lost batch) are retried in later rounds
+    with exponential backoff. Every body carries a client-side event id, so
+    a retry of an insert that did land answers 409 and counts as created
+    instead of duplicating the event.
+
+    Args:
+        service: Calendar v3 service
+        calendar_id (str): Target calendar
+        bodies (dict): {request_id (str): event body}
+        max_attempts (int): Rounds per item, including the first
+
+    Returns:
+        tuple: ({request_id: created event}, {request_id: last error})
+    """
+    created, failed = {}, {}
+    pending = list(bodies)
+    for attempt in range(max_attempts):
+        answered = {}
+
+        def callback(request_id, response, exception):
+            answered[request_id] = (response, exception)
+
+        retry = []
+        for offset in range(0, len(pending), batch_size):
+            chunk = pending[offset:offset + batch_size]
+            batch = service.new_batch_http_request(callback=callback)
+            for request_id in chunk:
+                batch.add(service.events().insert(calendarId=calendar_id, body=bodies[request_id],
+                                                  sendUpdates=send_updates), request_id=request_id)
+            EXTERNAL_CALLS.labels("calendar", "events.batch").inc()
+            lost = None
+            try:
+                batch.execute()
+            except Exception as err:
+                record_error("calendar", err)
+                lost = err
+            for request_id in chunk:
+                response, error = answered.get(request_id, (None, lost))
+                if error is None and response is None:
+                    error = RuntimeError("no response in batch")
+                if error is None:
+                    created[request_id] = response
+                    failed.pop(request_id, None)
+                elif attempt and _status(error) == 409:
+                    created[request_id] = dict(bodies[request_id])  # Landed on an earlier attempt
+                    failed.pop(request_id, None)
+                else:
+                    if lost is None:
+                        record_error("calendar", error)
+                    failed[request_id] = error
+                    if _retryable(error):
+                        retry.append(request_id)
+        pending = retry
+        if not pending or attempt + 1 == max_attempts:
+            break
+        EXTERNAL_RETRIES.labels("calendar").inc(len(pending))
+        sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.0))
+    return created, failed
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def failed_rows(report_path):
+    """Row numbers a previous run's JSONL report marked as failed (worth retrying)."""
+    with open(report_path) as report:
+        outcomes = [json.loads(line) for line in report if line.strip()]
+    return {outcome["row"] for outcome in outcomes if outcome["status"] == FAILED}
+
+
+def main():
+    from backend import google_calendar  # Deferred: pulls in the Calendar client
+
+    parser = argparse.ArgumentParser(description="Create many bookings from a CSV or JSONL file")
+    parser.add_argument("path", help="CSV with a header row, or JSONL; fields: email, start, "
+                                     "end or duration_minutes, summary, description")
+    parser.add_argument("--calendar", default=google_calendar.CALENDAR_ID)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--no-notify", action="store_true", help="Do not email attendees")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only; create nothing")
+    parser.add_argument("--report", help="Write per-row results to this JSONL file")
+    parser.add_argument("--retry-failed", metavar="REPORT",
+                        help="Only rerun the rows a previous --report marked as failed")
+    args = parser.parse_args()
+
+    bookings, invalid = load_bookings(args.path, tz=google_calendar.AVAILABILITY_RULES.tz)
+    if args.retry_failed:
+        rows = failed_rows(args.retry_failed)
+        bookings = [booking for booking in bookings if booking.row in rows]
+        invalid = [outcome for outcome in invalid if outcome["row"] in rows]
+    started = time.perf_counter()
+    results = invalid + google_calendar.book_many(
+        bookings, calendar_id=args.calendar, batch_size=args.batch_size, dry_run=args.dry_run,
+        send_updates="none" if args.no_notify else "all")
+    elapsed = time.perf_counter() - started
+    results.sort(key=lambda outcome: outcome["row"])
+
+    if args.report:
+        with open(args.report, "w") as report:
+            report.writelines(json.dumps(outcome) + "\n" for outcome in results)
+    counts = {}
+    for outcome in results:
+        counts[outcome["status"]] = counts.get(outcome["status"], 0) + 1
+        if outcome["status"] not in (CREATED, VALID):
+            print(f"❌ Row {outcome['row']}: {outcome['status']} ({outcome.get('error', '')})")
+    created = counts.get(CREATED, 0)
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"✅ {summary or 'nothing to do'} in {elapsed:.1f}s"
+          + (f" ({created / elapsed:.0f} bookings/s)" if created and elapsed else ""))
+    if args.report:
+        print(f"Report: {os.path.abspath(args.report)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class BusyIntervalCache:
+    """
+    In-process TTL + LRU cache of busy intervals keyed by (calendar_id, day).
+
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted once `max_entries` is reached. Writers patch cached days in place
+    so a new booking is visible without waiting for the TTL.
+
+    Invalidations and patches bump a generation per key. A loader reads
+    generation() before fetching and passes it to put(), which discards the
+    result if the day changed meanwhile instead of caching what the fetch
+    saw from before the change.
+
+    Args:
+        ttl (float): Seconds an entry stays fresh
+        max_entries (int): Maximum number of (calendar, day) entries
+        clock (callable, optional): Monotonic time source, overridable in tests
+    """
+
+    def __init__(self, ttl=60, max_entries=256, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # (calendar_id, day) -> (stored_at, [(start, end), ...])
+        self._generations = {}  # (calendar_id, day) -> changes since the last epoch
+        self._epoch = 0  # Bumped by wider invalidations and when _generations is pruned
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "patches": 0, "stale_skips": 0}
+        self._age_served = 0.0
+        self._max_age_served = 0.0
+
+    def get(self, calendar_id, day):
+        key = (calendar_id, day)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            stored_at, intervals = entry
+            age = now - stored_at
+            if age >= self.ttl:
+                del self._entries[key]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            self._age_served += age
+            self._max_age_served = max(self._max_age_served, age)
+            return list(intervals)
+
+    def generation(self, calendar_id, day):
+        """Opaque token that changes whenever the day is invalidated or patched."""
+        with self._lock:
+            return self._epoch, self._generations.get((calendar_id, day), 0)
+
+    def put(self, calendar_id, day, intervals, generation=None):
+        """Stores a day unless it changed since `generation` was read; returns whether it did."""
+        key = (calendar_id, day)
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key, 0)):
+                self._stats["stale_skips"] += 1
+                return False
+            self._entries[key] = (self._clock(), sorted(intervals))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+            return True
+
+    def _bump(self, key):
+        # Caller holds the lock. Forgetting the counters would let an old
+        # generation match again, so pruning them starts a new epoch instead.
+        if key not in self._generations and len(self._generations) >= 4 * self.max_entries:
+            self._generations.clear()
+            self._epoch += 1
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def add_interval(self, calendar_id, day, start, end):
+        """Write-through patch: adds a busy interval to a cached day, if present."""
+        key = (calendar_id, day)
+        with self._lock:
+            self._bump(key)  # A fetch in flight started before this interval existed
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            stored_at, intervals = entry
+            self._entries[key] = (stored_at, sorted(intervals + [(start, end)]))
+            self._stats["patches"] += 1
+            return True
+
+    def invalidate(self, calendar_id=None, day=None):
+        """Drops one day, one calendar, or (with no arguments) everything."""
+        with self._lock:
+            if calendar_id is None:
+                self._entries.clear()
+                self._generations.clear()
+                self._epoch += 1
+                return
+            if day is None:
+                self._epoch += 1
+            else:
+                self._bump((calendar_id, day))
+            for key in list(self._entries):
+                if key[0] == calendar_id and (day is None or key[1] == day):
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["entries"] = len(self._entries)
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["avg_age_served"] = self._age_served / stats["hits"] if stats["hits"] else 0.0
+            stats["max_age_served"] = self._max_age_served
+            return stats
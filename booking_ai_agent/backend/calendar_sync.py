@@ -0,0 +1,218 @@
+import threading
+import time
+from datetime import date, datetime, timezone
+
+from backend.interval_tree import IntervalTree
+
+
+class SyncTokenExpired(Exception):
+    """Raised when Google answers 410 Gone for a stale sync token."""
+
+
+# -----------------------------
+# Event parsing
+# -----------------------------
+def event_interval(event):
+    """
+    Returns the busy (start, end) of an event in UTC, or None if the event
+    does not block time (cancelled or marked as free).
+    """
+    if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+        return None
+    start, end = event.get("start", {}), event.get("end", {})
+    if "dateTime" in start:
+        return (
+            datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00")).astimezone(timezone.utc),
+            datetime.fromisoformat(end["dateTime"].replace("Z", "+00:00")).astimezone(timezone.utc),
+        )
+    if "date" in start:
+        # All-day events block whole local days
+        return (
+            datetime.combine(date.fromisoformat(start["date"]), datetime.min.time()).astimezone(timezone.utc),
+            datetime.combine(date.fromisoformat(end["date"]), datetime.min.time()).astimezone(timezone.utc),
+        )
+    return None
+
+
+# -----------------------------
+# Fetch layer
+# -----------------------------
+class GoogleEventsFetcher:
+    """
+    Reads events through a Calendar service, following pageToken paging.
+
+    Args:
+        get_service (callable): Returns a Calendar v3 service (real or fake)
+        calendar_id (str): Calendar to sync
+    """
+
+    def __init__(self, get_service, calendar_id="primary"):
+        self.get_service = get_service
+        self.calendar_id = calendar_id
+
+    def fetch(self, sync_token=None):
+        """Returns (events, next_sync_token); a full listing when sync_token is None."""
+        from googleapiclient.errors import HttpError
+
+        service = self.get_service()
+        events = []
+        page_token = None
+        while True:
+            params = {"calendarId": self.calendar_id, "singleEvents": True, "pageToken": page_token}
+            if sync_token:
+                params["syncToken"] = sync_token
+            else:
+                params["showDeleted"] = False
+            try:
+                result = service.events().list(**params).execute()
+            except HttpError as err:
+                if err.resp.status == 410:
+                    raise SyncTokenExpired(str(err))
+                raise
+            events.extend(result.get("items", []))
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return events, result.get("nextSyncToken")
+
+
+# -----------------------------
+# Local busy-interval store
+# -----------------------------
+class BusyStore:
+    """
+    Thread-safe store of busy intervals keyed by event id.
+
+    Intervals live in an interval tree, so upserts and range queries are
+    O(log n) however many events the calendar holds, and one long event
+    (an all-day block, a multi-week leave) does not widen every query.
+    """
+
+    def __init__(self):
+        self._by_id = {}       # event_id -> (start, end)
+        self._tree = IntervalTree()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def _remove(self, event_id):
+        interval = self._by_id.pop(event_id, None)
+        if interval is not None:
+            self._tree.remove(interval[0], interval[1], event_id)
+
+    def _add(self, event_id, interval):
+        self._by_id[event_id] = interval
+        self._tree.insert(interval[0], interval[1], event_id)
+
+    def replace(self, events):
+        with self._lock:
+            self._by_id.clear()
+            self._tree.clear()
+            for event in events:
+                interval = event_interval(event)
+                if interval is not None:
+                    self._add(event["id"], interval)
+
+    def apply(self, events):
+        """Upserts changed events and drops cancelled ones."""
+        with self._lock:
+            for event in events:
+                self._remove(event["id"])
+                interval = event_interval(event)
+                if interval is not None:
+                    self._add(event["id"], interval)
+
+    def busy_between(self, start, end):
+        """Returns sorted (start, end) intervals overlapping [start, end)."""
+        with self._lock:
+            return [(s, e) for s, e, _ in self._tree.overlapping(start, end)]
+
+    def next_free(self, start, duration, until=None):
+        """Earliest start >= `start` of a `duration`-long gap, or None if none ends by `until`."""
+        with self._lock:
+            return self._tree.next_free(start, duration, until)
+
+
+# -----------------------------
+# Sync engine
+# -----------------------------
+class CalendarSync:
+    """
+    Keeps a BusyStore current with one full sync followed by incremental
+    nextSyncToken syncs, falling back to a full resync on 410 Gone.
+
+    Args:
+        fetcher: Object with fetch(sync_token) -> (events, next_sync_token)
+        store (BusyStore, optional): Store to keep current
+        interval (float): Seconds between background syncs
+    """
+
+    def __init__(self, fetcher, store=None, interval=60):
+        self.fetcher = fetcher
+        self.store = store if store is not None else BusyStore()
+        self.interval = interval
+        self.sync_token = None
+        self.last_sync = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._sync_lock = threading.Lock()
+        self._thread = None
+        self._stats = {"full_syncs": 0, "incremental_syncs": 0, "resyncs": 0, "events_applied": 0, "errors": 0}
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def _full_sync(self):
+        events, self.sync_token = self.fetcher.fetch(None)
+        self.store.replace(events)
+        self._stats["full_syncs"] += 1
+        self._stats["events_applied"] += len(events)
+
+    def sync(self):
+        """Runs one sync round; safe to call from any thread."""
+        with self._sync_lock:
+            if self.sync_token is None:
+                self._full_sync()
+            else:
+                try:
+                    events, next_token = self.fetcher.fetch(self.sync_token)
+                except SyncTokenExpired:
+                    self._stats["resyncs"] += 1
+                    self._full_sync()
+                else:
+                    self.store.apply(events)
+                    self.sync_token = next_token
+                    self._stats["incremental_syncs"] += 1
+                    self._stats["events_applied"] += len(events)
+            self.last_sync = time.time()
+            self._ready.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync()
+            except Exception:
+                self._stats["errors"] += 1
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="calendar-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats["events"] = len(self.store)
+        stats["ready"] = self.ready
+        stats["last_sync"] = self.last_sync
+        return stats
@@ -4,6 +4,9 @@ from dotenv import load_dotenv
 # Load environment variables from .env
 load_dotenv()
 
+# docker-compose.prod.yml sets FLASK_ENV=production; some misconfigurations fail startup there
+PRODUCTION = os.getenv("FLASK_ENV", "").lower() == "production"
+
 # API Keys
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
@@ -19,3 +22,59 @@ GOOGLE_CREDENTIALS_FILE = os.getenv(
 # Email settings for confirmation
 EMAIL_SENDER = os.getenv("EMAIL_SENDER")      # your email address
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")  # app password if Gmail
+
+# Calendar busy-interval cache
+BUSY_CACHE_TTL = float(os.getenv("BUSY_CACHE_TTL", "60"))         # seconds
+BUSY_CACHE_SIZE = int(os.getenv("BUSY_CACHE_SIZE", "256"))        # (calendar, day) entries
+
+# Busy-interval tier shared by all workers/containers (redis://host:6379/0, or fake:// in-process); empty disables it
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL", "")
+SHARED_CACHE_TTL = float(os.getenv("SHARED_CACHE_TTL", "60"))     # seconds; bookings invalidate it sooner
+
+# Background incremental calendar sync (serves availability from a local store)
+CALENDAR_SYNC_ENABLED = os.getenv("CALENDAR_SYNC_ENABLED", "false").lower() == "true"
+CALENDAR_SYNC_INTERVAL = float(os.getenv("CALENDAR_SYNC_INTERVAL", "30"))  # seconds
+
+# Slot rules (business hours are 09:00-17:00 in BOOKING_TIMEZONE, server local time if unset)
+BOOKING_TIMEZONE = os.getenv("BOOKING_TIMEZONE")            # e.g. "Asia/Kolkata"
+SLOT_MINUTES = int(os.getenv("SLOT_MINUTES", "30"))
+BUFFER_MINUTES = int(os.getenv("BUFFER_MINUTES", "0"))      # gap kept around existing meetings
+
+# Local booking database (SQLite, WAL mode)
+BOOKINGS_DB = os.getenv("BOOKINGS_DB", os.path.join(BASE_DIR, "bookings.db"))
+
+# Seconds a slot stays held while a booking is being confirmed
+SLOT_HOLD_TTL = float(os.getenv("SLOT_HOLD_TTL", "300"))
+
+# Signed slot offers returned by /api/available_slots; every worker and replica must share the
+# secret. Required in production; elsewhere a missing one is generated per process with a warning.
+SLOT_TOKEN_SECRET = os.getenv("SLOT_TOKEN_SECRET")
+SLOT_TOKEN_TTL = float(os.getenv("SLOT_TOKEN_TTL", "900"))  # seconds an offer stays bookable
+
+# HTTP caching of availability responses (ETag + Cache-Control; pre-serialized bodies per generation)
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "10"))      # seconds a response is fresh
+HTTP_CACHE_STALE = int(os.getenv("HTTP_CACHE_STALE", "30"))          # stale-while-revalidate seconds
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))   # serialized bodies kept
+
+# Background booking pipeline
+ASYNC_BOOKINGS = os.getenv("ASYNC_BOOKINGS", "true").lower() == "true"
+BOOKING_WORKERS = int(os.getenv("BOOKING_WORKERS", "4"))
+BOOKING_MAX_ATTEMPTS = int(os.getenv("BOOKING_MAX_ATTEMPTS", "5"))
+CONFIRMATION_EMAILS = os.getenv("CONFIRMATION_EMAILS", "false").lower() == "true"  # via gmail_service
+
+# LLM response cache (in-memory LRU, plus a SQLite tier when LLM_CACHE_DB is set)
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))   # seconds
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB")                    # e.g. os.path.join(BASE_DIR, "llm_cache.db")
+LLM_CACHE_FUZZY = os.getenv("LLM_CACHE_FUZZY", "false").lower() == "true"  # case/date-insensitive keys
+
+# Concurrent Calendar API requests per process for multi-day / multi-calendar fan-out
+CALENDAR_CONCURRENCY = int(os.getenv("CALENDAR_CONCURRENCY", "10"))
+
+# Agents (one calendar each); without AGENTS_FILE every booking goes to the primary calendar
+AGENTS_FILE = os.getenv("AGENTS_FILE")                                 # JSON list, see backend/agents.py
+ASSIGNMENT_STRATEGY = os.getenv("ASSIGNMENT_STRATEGY", "round_robin")  # or least_loaded, priority
+
+# Recurring events: expanded locally from their RRULE
+RECURRENCE_CACHE_SIZE = int(os.getenv("RECURRENCE_CACHE_SIZE", "512"))     # expanded series kept in memory
+RECURRENCE_HORIZON_DAYS = int(os.getenv("RECURRENCE_HORIZON_DAYS", "365"))  # conflict check cut-off for open-ended rules
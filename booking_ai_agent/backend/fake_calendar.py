@@ -0,0 +1,264 @@
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from backend.recurrence import SeriesCache, instance_event
+
+
+def _http_error(status, reason):
+    return HttpError(httplib2.Response({"status": status, "reason": reason}), reason.encode())
+
+
+def _parse(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+class _Request:
+    def __init__(self, calendar, fn, *args, **kwargs):
+        self._calendar = calendar
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    def execute(self, num_retries=0):
+        if self._calendar.latency:
+            time.sleep(self._calendar.latency)
+        return self._fn(*self._args, **self._kwargs)
+
+
+class _Batch:
+    """BatchHttpRequest stand-in: one round-trip of latency for all its requests."""
+
+    def __init__(self, calendar, callback=None):
+        self._calendar = calendar
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, callback=None, request_id=None):
+        self._requests.append((request, callback or self._callback, request_id))
+
+    def execute(self):
+        calendar = self._calendar
+        with calendar._lock:
+            calendar.calls["batch"] += 1
+            failure = calendar._batch_failures.pop(0) if calendar._batch_failures else None
+        if failure is not None and not failure[1]:
+            raise failure[0]
+        if calendar.latency:
+            time.sleep(calendar.latency)
+        answers = []
+        for request, callback, request_id in self._requests:
+            try:
+                answers.append((callback, request_id, request._fn(*request._args, **request._kwargs), None))
+            except HttpError as err:
+                answers.append((callback, request_id, None, err))
+        if failure is not None:
+            raise failure[0]  # The requests ran, but the response never arrived
+        for callback, request_id, response, error in answers:
+            if callback is not None:
+                callback(request_id, response, error)
+
+
+class _FreeBusy:
+    def __init__(self, calendar):
+        self._calendar = calendar
+
+    def query(self, body):
+        return _Request(self._calendar, self._calendar._freebusy, body)
+
+
+class _Events:
+    def __init__(self, calendar):
+        self._calendar = calendar
+
+    def list(self, **kwargs):
+        return _Request(self._calendar, self._calendar._list, **kwargs)
+
+    def insert(self, calendarId, body, **kwargs):
+        return _Request(self._calendar, self._calendar._insert, calendarId, body)
+
+    def get(self, calendarId, eventId, **kwargs):
+        return _Request(self._calendar, self._calendar._get, calendarId, eventId)
+
+    def delete(self, calendarId, eventId, **kwargs):
+        return _Request(self._calendar, self._calendar._delete, calendarId, eventId)
+
+
+class FakeCalendar:
+    """
+    Offline stand-in for the Calendar v3 service returned by googleapiclient.
+
+    Supports the calls this project makes: events().list (time-window and
+    syncToken/pageToken paging, including 410 Gone for expired tokens),
+    events().insert, events().get, events().delete and freebusy().query, the event calls
+    alone or in a batch from
+    new_batch_http_request(). Inserts honor client-supplied event ids
+    (409 if taken) and can be made to fail on demand. Recurring events are listed as
+    masters, or as expanded instances with singleEvents=True, like Google
+    does. Thread-safe, so it can back concurrency tests and load tests.
+
+    Args:
+        page_size (int): Events returned per list page
+        latency (float): Seconds each request sleeps, to mimic network round-trips
+    """
+
+    def __init__(self, page_size=250, latency=0.0):
+        self.page_size = page_size
+        self.latency = latency
+        self.calls = {"list": 0, "insert": 0, "get": 0, "delete": 0, "batch": 0, "freebusy": 0}
+        self._insert_failures = []  # HttpErrors raised by the next inserts
+        self._batch_failures = []   # Exceptions raised by the next batch executions
+        self._events = {}    # (calendar_id, event_id) -> event
+        self._changes = []   # [(seq, calendar_id, event_id)]
+        self._pages = {}     # pageToken -> (matches, sync_seq, offset)
+        self._seq = 0
+        self._min_valid_token = 0
+        self._ids = itertools.count(1)
+        self._series = SeriesCache()
+        self._lock = threading.Lock()
+
+    # Service interface
+    def events(self):
+        return _Events(self)
+
+    def freebusy(self):
+        return _FreeBusy(self)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    # Test helpers
+    def add_event(self, start, end, calendar_id="primary", summary="Busy", **extra):
+        body = {
+            "summary": summary,
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": end.isoformat()},
+        }
+        body.update(extra)
+        return self._insert(calendar_id, body, count=False)
+
+    def fail_inserts(self, status, times=1):
+        """Makes the next `times` inserts answer `status`."""
+        with self._lock:
+            self._insert_failures.extend(_http_error(status, "Injected failure") for _ in range(times))
+
+    def fail_batches(self, error, times=1, after_running=False):
+        """
+        Makes the next `times` batch executions raise `error`, before running
+        anything or, with after_running, once their requests have been applied.
+        """
+        with self._lock:
+            self._batch_failures.extend((error, after_running) for _ in range(times))
+
+    def expire_sync_tokens(self):
+        """Makes every outstanding sync token answer 410 Gone."""
+        with self._lock:
+            self._min_valid_token = self._seq
+
+    def all_events(self, calendar_id="primary"):
+        with self._lock:
+            return [e for (cal, _), e in self._events.items() if cal == calendar_id and e["status"] != "cancelled"]
+
+    # Internals
+    def _record(self, calendar_id, event_id):
+        self._seq += 1
+        self._changes.append((self._seq, calendar_id, event_id))
+
+    def _insert(self, calendar_id, body, count=True):
+        with self._lock:
+            if count:
+                self.calls["insert"] += 1
+                if self._insert_failures:
+                    raise self._insert_failures.pop(0)
+            event_id = body.get("id") or "evt%d" % next(self._ids)
+            if (calendar_id, event_id) in self._events:
+                raise _http_error(409, "The requested identifier already exists.")
+            event = dict(body, id=event_id, status="confirmed",
+                         htmlLink="https://calendar.example/%s" % event_id)
+            self._events[(calendar_id, event_id)] = event
+            self._record(calendar_id, event_id)
+            return dict(event)
+
+    def _get(self, calendar_id, event_id):
+        with self._lock:
+            self.calls["get"] += 1
+            event = self._events.get((calendar_id, event_id))
+            if event is None:
+                raise _http_error(404, "Not Found")
+            return dict(event)
+
+    def _delete(self, calendar_id, event_id):
+        with self._lock:
+            self.calls["delete"] += 1
+            event = self._events.get((calendar_id, event_id))
+            if event is None or event["status"] == "cancelled":
+                raise _http_error(404, "Not Found")
+            event["status"] = "cancelled"
+            self._record(calendar_id, event_id)
+            return ""
+
+    def _list(self, calendarId="primary", timeMin=None, timeMax=None, syncToken=None,
+              pageToken=None, maxResults=None, **kwargs):
+        with self._lock:
+            self.calls["list"] += 1
+            if pageToken is not None:
+                matches, sync_seq, offset = self._pages.pop(pageToken)
+            else:
+                offset = 0
+                sync_seq = self._seq
+                if syncToken is not None:
+                    since = int(syncToken)
+                    if since < self._min_valid_token:
+                        raise _http_error(410, "Gone")
+                    changed = {eid for seq, cal, eid in self._changes if seq > since and cal == calendarId}
+                    matches = [self._events[(calendarId, eid)] for eid in sorted(changed)]
+                else:
+                    low = _parse(timeMin) if timeMin else None
+                    high = _parse(timeMax) if timeMax else None
+                    matches = self._in_window(calendarId, low, high, kwargs.get("singleEvents") in (True, "true"))
+
+            size = maxResults or self.page_size
+            page = [dict(e) for e in matches[offset:offset + size]]
+            result = {"items": page}
+            if offset + size < len(matches):
+                token = "page%d" % next(self._ids)
+                self._pages[token] = (matches, sync_seq, offset + size)
+                result["nextPageToken"] = token
+            else:
+                result["nextSyncToken"] = str(sync_seq)
+            return result
+
+    def _in_window(self, calendar_id, low, high, single_events):
+        matches = []
+        for (cal, _), event in self._events.items():
+            if cal != calendar_id or event["status"] == "cancelled":
+                continue
+            start = _parse(event["start"]["dateTime"])
+            end = _parse(event["end"]["dateTime"])
+            if event.get("recurrence"):
+                window = (low or start, high or start + timedelta(days=366))
+                occurrences = self._series.series(event).between(*window)
+                if single_events:
+                    matches.extend(instance_event(event, *occurrence) for occurrence in occurrences)
+                elif occurrences:
+                    matches.append(event)
+            elif (high is None or start < high) and (low is None or end > low):
+                matches.append(event)
+        matches.sort(key=lambda e: _parse(e["start"]["dateTime"]))
+        return matches
+
+    def _freebusy(self, body):
+        low, high = _parse(body["timeMin"]), _parse(body["timeMax"])
+        calendars = {}
+        with self._lock:
+            self.calls["freebusy"] += 1
+            for item in body.get("items", []):
+                busy = [{"start": event["start"]["dateTime"], "end": event["end"]["dateTime"]}
+                        for event in self._in_window(item["id"], low, high, single_events=True)]
+                calendars[item["id"]] = {"busy": busy}
+        return {"kind": "calendar#freeBusy", "timeMin": body["timeMin"], "timeMax": body["timeMax"],
+                "calendars": calendars}
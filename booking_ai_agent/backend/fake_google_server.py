@@ -0,0 +1,292 @@
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from googleapiclient.errors import HttpError
+
+from backend.fake_calendar import FakeCalendar
+
+CALENDAR_PREFIX = "/calendar/v3/"
+EVENTS_PREFIX = CALENDAR_PREFIX + "calendars/"
+GMAIL_PREFIX = "/gmail/v1/users/"
+CHAT_PATH = "/openai/v1/chat/completions"  # Groq's OpenAI-compatible endpoint
+DEFAULT_REPLY = "Sure, I can help you book a consultation. Which day works best for you?"
+
+
+def _service_of(path):
+    if path.startswith(CALENDAR_PREFIX):
+        return "calendar"
+    if path.startswith(GMAIL_PREFIX):
+        return "gmail"
+    if path == CHAT_PATH:
+        return "chat"
+    return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    disable_nagle_algorithm = True  # Headers and body are separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, status, body, headers=None):
+        self._send(status, json.dumps(body).encode("utf-8"), headers=headers)
+
+    def _error(self, status, message, headers=None):
+        self._send_json(status, {"error": {"code": status, "message": message}}, headers)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        server = self.server
+        url = urlsplit(self.path)
+        service = _service_of(url.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""  # Always drain, or keep-alive breaks
+        with server.stats_lock:
+            server.requests += 1
+            server.by_service[service] = server.by_service.get(service, 0) + 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            if server.failures:
+                failure = server.failures.pop(0)
+            elif server.error_rate and server.rng.random() < server.error_rate:
+                failure = server.rng.choice(server.error_statuses)
+            else:
+                failure = None
+        try:
+            latency = server.latencies.get(service, server.latency)
+            if latency:
+                time.sleep(latency)
+            if failure is not None:
+                return self._error(failure, "Injected failure", {"Retry-After": "0"} if failure == 429 else None)
+            if service is None:
+                return self._error(404, "Not Found")
+            if service != "chat" and not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._error(401, "Login Required")
+            try:
+                payload = json.loads(body) if body else {}
+            except ValueError:
+                return self._error(400, "Invalid JSON payload")
+            getattr(self, "_" + service)(method, url, payload)
+        finally:
+            with server.stats_lock:
+                server.in_flight -= 1
+
+    # Calendar v3
+    def _calendar(self, method, url, payload):
+        calendar = self.server.calendar
+        path = url.path
+        params = dict(parse_qsl(url.query))
+        try:
+            if method == "POST" and path == CALENDAR_PREFIX + "freeBusy":
+                return self._send_json(200, calendar._freebusy(payload))
+            if path.startswith(EVENTS_PREFIX) and path.endswith("/events"):
+                calendar_id = unquote(path[len(EVENTS_PREFIX):-len("/events")])
+                if method == "POST":
+                    return self._send_json(200, dict(calendar._insert(calendar_id, payload), kind="calendar#event"))
+                if "maxResults" in params:
+                    params["maxResults"] = int(params["maxResults"])
+                result = calendar._list(calendarId=calendar_id, **params)
+                return self._send_json(200, dict(result, kind="calendar#events"))
+        except HttpError as err:
+            return self._error(err.resp.status, str(err))
+        self._error(404, "Not Found")
+
+    # Gmail v1
+    def _gmail(self, method, url, payload):
+        if method != "POST" or not url.path.endswith("/messages/send"):
+            return self._error(404, "Not Found")
+        if not payload.get("raw"):
+            return self._error(400, "'raw' RFC822 payload message string or uploading message via /upload/* "
+                                    "URL required")
+        server = self.server
+        with server.stats_lock:
+            message_id = "msg%d" % next(server.ids)
+            server.sent_messages.append(payload["raw"])
+        self._send_json(200, {"id": message_id, "threadId": message_id, "labelIds": ["SENT"]})
+
+    # OpenAI-compatible chat completions
+    def _chat(self, method, url, payload):
+        if method != "POST":
+            return self._error(405, "Method Not Allowed")
+        if not payload.get("messages"):
+            return self._error(400, "'messages' is required")
+        server = self.server
+        reply = server.chat_reply(payload) if callable(server.chat_reply) else server.chat_reply
+        model = payload.get("model", "fake-model")
+        with server.stats_lock:
+            completion_id = "chatcmpl-%d" % next(server.ids)
+        if payload.get("stream"):
+            words = reply.split(" ")
+            chunks = [word if n == 0 else " " + word for n, word in enumerate(words)]
+            events = "".join(
+                "data: %s\n\n" % json.dumps({"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                                             "choices": [{"index": 0, "delta": {"content": chunk}}]})
+                for chunk in chunks
+            ) + "data: [DONE]\n\n"
+            return self._send(200, events.encode("utf-8"), "text/event-stream")
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in payload["messages"])
+        completion_tokens = len(reply.split())
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # The default listen backlog of 5 drops bursts of concurrent connects
+
+
+class FakeGoogleServer:
+    """
+    Local HTTP server standing in for every external API the app calls.
+
+    Serves, over a FakeCalendar:
+      - GET/POST /calendar/v3/calendars/{calendarId}/events (time windows,
+        paging, sync tokens; inserts) and POST /calendar/v3/freeBusy
+      - POST /gmail/v1/users/{userId}/messages/send
+      - POST /openai/v1/chat/completions (OpenAI/Groq format, with SSE streaming)
+
+    so the hot paths can be tested and benchmarked offline with the real
+    HTTP clients (see build_service and chat_url). Each request is handled on
+    its own thread after sleeping its service's latency, then fails with
+    probability `error_rate` or answers normally.
+
+    Args:
+        calendar (FakeCalendar, optional): Backing store, a new one by default
+        latency (float): Seconds each request waits before answering
+        host (str): Interface to bind; the port is picked automatically
+        latencies (dict, optional): Per-service overrides of latency ("calendar", "gmail", "chat")
+        error_rate (float): Fraction of requests answered with one of error_statuses
+        error_statuses (tuple): Statuses used for random failures
+        chat_reply (str or callable): Assistant reply, or a function of the request payload
+        seed (int, optional): Seed for the random failures
+    """
+
+    def __init__(self, calendar=None, latency=0.0, host="127.0.0.1", latencies=None, error_rate=0.0,
+                 error_statuses=(429, 503), chat_reply=DEFAULT_REPLY, seed=None):
+        self.calendar = calendar or FakeCalendar()
+        self._server = _Server((host, 0), _Handler)
+        self._server.calendar = self.calendar
+        self._server.latency = latency
+        self._server.latencies = dict(latencies or {})
+        self._server.error_rate = error_rate
+        self._server.error_statuses = tuple(error_statuses)
+        self._server.chat_reply = chat_reply
+        self._server.rng = random.Random(seed)
+        self._server.ids = itertools.count(1)
+        self._server.requests = 0
+        self._server.by_service = {}
+        self._server.in_flight = 0
+        self._server.max_in_flight = 0
+        self._server.failures = []
+        self._server.sent_messages = []
+        self._server.stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def chat_url(self):
+        """Pass as GroqClient(api_url=...)."""
+        return self.base_url + CHAT_PATH
+
+    @property
+    def requests(self):
+        return self._server.requests
+
+    @property
+    def max_in_flight(self):
+        """Most requests that were being handled at the same time."""
+        return self._server.max_in_flight
+
+    @property
+    def sent_messages(self):
+        """Base64url RFC 822 messages received by Gmail send, in order."""
+        with self._server.stats_lock:
+            return list(self._server.sent_messages)
+
+    def stats(self):
+        with self._server.stats_lock:
+            return {"requests": self._server.requests, "max_in_flight": self._server.max_in_flight,
+                    **{f"{service}_requests": count for service, count in self._server.by_service.items()
+                       if service is not None}}
+
+    def fail_next(self, status, times=1):
+        """Answers the next `times` requests with an error status (e.g. 429, 503)."""
+        with self._server.stats_lock:
+            self._server.failures.extend([status] * times)
+
+    def populate(self, calendar_ids=("primary",), days=30, per_day=8, start=None, minutes=(30, 45, 60), seed=0):
+        """
+        Fills the calendars with `per_day` events a day for `days` days from
+        `start` (today, UTC) between 08:00 and 18:00 UTC, to size benchmarks.
+        """
+        rng = random.Random(seed)
+        first = start or datetime.now(timezone.utc).date()
+        for calendar_id in calendar_ids:
+            for offset in range(days):
+                base = datetime.combine(first + timedelta(days=offset), datetime.min.time(), tzinfo=timezone.utc)
+                for _ in range(per_day):
+                    begin = base + timedelta(minutes=rng.randrange(8 * 60, 18 * 60, 15))
+                    self.calendar.add_event(begin, begin + timedelta(minutes=rng.choice(minutes)),
+                                            calendar_id=calendar_id)
+
+    def build_service(self, api, version):
+        """
+        A googleapiclient service for `api` (calendar or gmail) that talks to
+        this server with a dummy bearer token; usable as a
+        GoogleServiceManager build_service.
+        """
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
+        # api_endpoint replaces rootUrl + servicePath of the discovery document
+        endpoint = self.base_url + (CALENDAR_PREFIX if api == "calendar" else "/")
+        return build(api, version, credentials=Credentials(token="fake-token"), static_discovery=True,
+                     cache_discovery=False, client_options={"api_endpoint": endpoint})
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="fake-google", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
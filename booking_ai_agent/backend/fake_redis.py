@@ -0,0 +1,170 @@
+import queue
+import threading
+import time
+
+
+def _bytes(value):
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return str(value).encode("ascii")
+
+
+class _PubSub:
+    """Subscriber handle returned by FakeRedis.pubsub()."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._messages = queue.Queue()
+        self.channels = set()
+
+    def subscribe(self, *channels):
+        for channel in map(_bytes, channels):
+            self.channels.add(channel)
+            self._redis._subscribe(channel, self)
+            self._messages.put({"type": "subscribe", "pattern": None, "channel": channel,
+                                "data": len(self.channels)})
+
+    def unsubscribe(self, *channels):
+        for channel in map(_bytes, channels or tuple(self.channels)):
+            self.channels.discard(channel)
+            self._redis._unsubscribe(channel, self)
+
+    def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        while True:
+            try:
+                message = self._messages.get(timeout=timeout) if timeout else self._messages.get_nowait()
+            except queue.Empty:
+                return None
+            if not (ignore_subscribe_messages and message["type"] == "subscribe"):
+                return message
+
+    def close(self):
+        self.unsubscribe()
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the subset of redis.Redis the shared cache uses.
+
+    Keys, expiry (ex/px), NX sets, INCR, MGET and pub/sub behave like Redis
+    with decode_responses=False: values come back as bytes. Every client
+    built on the same instance sees the same keyspace, so several
+    SharedBusyCache objects over one FakeRedis model several workers.
+
+    There is no Lua interpreter: EVAL runs the Python equivalent registered
+    for the exact script text with FakeRedis.script(), atomically with
+    respect to every other command.
+
+    Args:
+        clock (callable, optional): Monotonic time source, overridable in tests
+    """
+
+    _scripts = {}  # Lua source -> fn(redis, keys, args)
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._data = {}  # key -> (value, expires_at or None)
+        self._subscribers = {}  # channel -> set of _PubSub
+        self._lock = threading.RLock()  # Re-entered by scripts run from eval()
+        self.commands = 0
+
+    @classmethod
+    def script(cls, source):
+        """Decorator registering fn(redis, keys, args) as what EVAL of `source` does."""
+        def register(fn):
+            cls._scripts[source] = fn
+            return fn
+        return register
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+            del self._data[key]
+            return None
+        return entry
+
+    def ping(self):
+        return True
+
+    def get(self, key):
+        with self._lock:
+            self.commands += 1
+            entry = self._live(_bytes(key))
+            return entry[0] if entry else None
+
+    def mget(self, keys, *args):
+        keys = [keys] + list(args) if isinstance(keys, (str, bytes)) else list(keys) + list(args)
+        with self._lock:
+            self.commands += 1
+            return [entry[0] if entry else None for entry in map(self._live, map(_bytes, keys))]
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        key = _bytes(key)
+        ttl = ex if ex is not None else (px / 1000 if px is not None else None)
+        with self._lock:
+            self.commands += 1
+            if nx and self._live(key) is not None:
+                return None
+            self._data[key] = (_bytes(value), None if ttl is None else self._clock() + ttl)
+            return True
+
+    def incr(self, key, amount=1):
+        key = _bytes(key)
+        with self._lock:
+            self.commands += 1
+            entry = self._live(key)
+            value = int(entry[0]) + amount if entry else amount
+            self._data[key] = (_bytes(value), entry[1] if entry else None)
+            return value
+
+    def exists(self, *keys):
+        with self._lock:
+            self.commands += 1
+            return sum(self._live(_bytes(key)) is not None for key in keys)
+
+    def delete(self, *keys):
+        with self._lock:
+            self.commands += 1
+            return sum(self._data.pop(_bytes(key), None) is not None for key in keys)
+
+    def eval(self, script, numkeys, *keys_and_args):
+        fn = self._scripts.get(script)
+        if fn is None:
+            raise NotImplementedError("FakeRedis has no Python equivalent registered for this script")
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        with self._lock:
+            commands = self.commands
+            result = fn(self, list(keys), [_bytes(arg) for arg in args])
+            self.commands = commands + 1
+            return result
+
+    def flushall(self):
+        with self._lock:
+            self._data.clear()
+            return True
+
+    def publish(self, channel, message):
+        channel = _bytes(channel)
+        with self._lock:
+            self.commands += 1
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber._messages.put({"type": "message", "pattern": None, "channel": channel,
+                                      "data": _bytes(message)})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return _PubSub(self)
+
+    def _subscribe(self, channel, subscriber):
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscriber)
+
+    def _unsubscribe(self, channel, subscriber):
+        with self._lock:
+            self._subscribers.get(channel, set()).discard(subscriber)
+
+    def close(self):
+        pass
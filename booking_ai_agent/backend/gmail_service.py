@@ -1,11 +1,38 @@
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from email.mime.text import MIMEText
+from string import Template
 import base64
-from config import GOOGLE_CREDENTIALS_FILE
+from backend.config import GOOGLE_CREDENTIALS_FILE
+from backend.metrics import EXTERNAL_CALLS, record_error, timed
+from backend.service_manager import GoogleServiceManager
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
+BATCH_LIMIT = 100  # Gmail accepts at most 100 calls per HTTP batch request
 
+
+def _load_credentials():
+    from google.oauth2 import service_account
+
+    return service_account.Credentials.from_service_account_file(
+        GOOGLE_CREDENTIALS_FILE, scopes=SCOPES
+    )
+
+
+# Credentials and the discovery client are built once, not per message
+_gmail_services = GoogleServiceManager("gmail", "v1", load_credentials=_load_credentials)
+
+
+def get_gmail_service():
+    return _gmail_services.get_service()
+
+
+def _raw_message(to, subject, body):
+    message = MIMEText(body)
+    message["to"] = to
+    message["subject"] = subject
+    return base64.urlsafe_b64encode(message.as_bytes()).decode()
+
+
+@timed("send_email")
 def send_email(to: str, subject: str, body: str) -> str:
     """
     Sends an email using Gmail API via a service account.
@@ -19,23 +46,12 @@ def send_email(to: str, subject: str, body: str) -> str:
         str: Success message with email ID or error message
     """
     try:
-        # Load credentials
-        creds = service_account.Credentials.from_service_account_file(
-            GOOGLE_CREDENTIALS_FILE, scopes=SCOPES
-        )
-
-        # Build Gmail service
-        service = build("gmail", "v1", credentials=creds)
-
-        # Create MIME message
-        message = MIMEText(body)
-        message["to"] = to
-        message["subject"] = subject
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
+        service = get_gmail_service()
 
         # Send email
+        EXTERNAL_CALLS.labels("gmail", "messages.send").inc()
         sent_message = service.users().messages().send(
-            userId="me", body={"raw": raw_message}
+            userId="me", body={"raw": _raw_message(to, subject, body)}
         ).execute()
 
         return f"Email sent successfully, ID: {sent_message.get('id')}"
@@ -43,4 +59,99 @@ def send_email(to: str, subject: str, body: str) -> str:
     except FileNotFoundError:
         return "Error: Google credentials file not found."
     except Exception as e:
+        record_error("gmail", e)
         return f"Error sending email: {str(e)}"
+
+
+class EmailTemplate:
+    """
+    Subject and body templates using $placeholders (string.Template syntax).
+
+    Templates are compiled once; rendering is a cheap substitution, so it is
+    not memoized (contexts carry the recipient and time and rarely repeat).
+    """
+
+    def __init__(self, subject, body):
+        self.subject = Template(subject)
+        self.body = Template(body)
+
+    def render(self, **context):
+        return self.subject.safe_substitute(context), self.body.safe_substitute(context)
+
+
+@timed("send_emails_batch")
+def send_emails_batch(messages):
+    """
+    Sends many emails through Gmail HTTP batch requests (up to 100 per call).
+
+    Args:
+        messages (list): dicts with "to" plus either "subject" and "body", or
+            "template" (EmailTemplate) and optional "context" (dict)
+
+    Returns:
+        list: One dict per message, in input order:
+            {"to": ..., "ok": True, "id": ...} or {"to": ..., "ok": False, "error": ...}
+    """
+    results = [None] * len(messages)
+    raw_cache = {}
+    prepared = []
+    for index, message in enumerate(messages):
+        if "template" in message:
+            subject, body = message["template"].render(**message.get("context", {}))
+        else:
+            subject, body = message["subject"], message["body"]
+        key = (message["to"], subject, body)
+        if key not in raw_cache:
+            raw_cache[key] = _raw_message(*key)
+        prepared.append((index, raw_cache[key]))
+
+    try:
+        service = get_gmail_service()
+    except FileNotFoundError:
+        return [{"to": m["to"], "ok": False, "error": "Google credentials file not found."} for m in messages]
+
+    def callback(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            record_error("gmail", exception)
+            results[index] = {"to": messages[index]["to"], "ok": False, "error": str(exception)}
+        else:
+            results[index] = {"to": messages[index]["to"], "ok": True, "id": response.get("id")}
+
+    for start in range(0, len(prepared), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=callback)
+        for index, raw in prepared[start:start + BATCH_LIMIT]:
+            batch.add(service.users().messages().send(userId="me", body={"raw": raw}), request_id=str(index))
+        EXTERNAL_CALLS.labels("gmail", "batch").inc()
+        try:
+            batch.execute()
+        except Exception as e:
+            record_error("gmail", e)
+            # The whole batch call failed; mark every message in it that got no answer
+            for index, _ in prepared[start:start + BATCH_LIMIT]:
+                if results[index] is None:
+                    results[index] = {"to": messages[index]["to"], "ok": False, "error": str(e)}
+
+    return results
+
+
+REMINDER_TEMPLATE = EmailTemplate(
+    "Reminder: your consultation on $date",
+    "This is a reminder of your real estate consultation on $date at $time.\n\nSee you soon!",
+)
+
+
+def send_reminders(day):
+    """Sends a reminder to everyone booked on `day` in one batched blast."""
+    from backend.google_calendar import AVAILABILITY_RULES, get_booking_store
+
+    tz = AVAILABILITY_RULES.tz
+    messages = []
+    for booking in get_booking_store().on_day(day, tz=tz):
+        start = booking["start_time"].astimezone(tz)
+        messages.append({
+            "to": booking["email"],
+            "template": REMINDER_TEMPLATE,
+            "context": {"date": start.strftime("%a, %b %d"), "time": start.strftime("%I:%M %p")},
+        })
+    return send_emails_batch(messages)
@@ -1,9 +1,40 @@
+import hashlib
+import logging
 import os
 import pickle
-import csv
+import secrets
+import threading
+import uuid
 from datetime import datetime, timedelta, timezone
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8
+    from backports.zoneinfo import ZoneInfo
+from backend.agents import LEAST_LOADED, Agent, AgentRegistry, load_agents
+from backend.async_calendar import AsyncCalendarClient, run_sync
+from backend.availability import AvailabilityRules, free_slots, free_slots_range
+from backend.booking_store import BookingStore
+from backend.bulk_booking import (
+    BATCH_SIZE, CONFLICT, CREATED, FAILED, VALID, insert_events, result as bulk_result, validate_bookings,
+)
+from backend.busy_cache import BusyIntervalCache
+from backend.calendar_sync import CalendarSync, GoogleEventsFetcher, event_interval
+from backend.config import (
+    BUSY_CACHE_TTL, BUSY_CACHE_SIZE, CALENDAR_SYNC_ENABLED, CALENDAR_SYNC_INTERVAL,
+    BOOKING_TIMEZONE, SLOT_MINUTES, BUFFER_MINUTES, BOOKINGS_DB, SLOT_HOLD_TTL, CALENDAR_CONCURRENCY,
+    AGENTS_FILE, ASSIGNMENT_STRATEGY, RECURRENCE_CACHE_SIZE, RECURRENCE_HORIZON_DAYS, SLOT_TOKEN_SECRET,
+    SLOT_TOKEN_TTL, SHARED_CACHE_URL, SHARED_CACHE_TTL, PRODUCTION,
+)
+from backend.interval_tree import IntervalTree
+from backend.metrics import EXTERNAL_CALLS, REGISTRY, record_error, timed
+from backend.recurrence import (
+    RecurrenceConflict, SeriesCache, UnsupportedRecurrence, busy_from_events, expand, find_conflicts,
+    instance_event,
+)
+from backend.reservations import ReservationTable, SlotConflict
+from backend.service_manager import GoogleServiceManager
+from backend.shared_cache import SharedBusyCache, SingleFlight, connect as connect_shared_cache
+from backend.slot_tokens import SlotTokenSigner, availability_version
 
 # -----------------------------
 # Configuration
@@ -11,107 +42,745 @@ from googleapiclient.discovery import build
 SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
 TOKEN_FILE = "token.pickle"
 CREDENTIALS_FILE = os.path.join(os.path.dirname(__file__), "credentials1.json")  # OAuth client JSON
-BOOKINGS_FILE = os.path.join(os.path.dirname(__file__), "bookings.csv")  # Local booking record
+BOOKINGS_FILE = os.path.join(os.path.dirname(__file__), "bookings.csv")  # Legacy record, see booking_store
+CALENDAR_ID = "primary"
+RECURRENCE_RULE = "RRULE:FREQ=WEEKLY;COUNT=10"  # Weekly, 10 times
+AVAILABILITY_RULES = AvailabilityRules(
+    slot_minutes=SLOT_MINUTES,
+    buffer_minutes=BUFFER_MINUTES,
+    tz=ZoneInfo(BOOKING_TIMEZONE) if BOOKING_TIMEZONE else None,
+)
 
 # -----------------------------
 # Google Calendar Service
 # -----------------------------
-def get_calendar_service():
+def _load_credentials():
     creds = None
     if os.path.exists(TOKEN_FILE):
         with open(TOKEN_FILE, "rb") as token:
             creds = pickle.load(token)
 
-    if not creds or not creds.valid:
-        flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
-        creds = flow.run_local_server(port=0)
-        with open(TOKEN_FILE, "wb") as token:
-            pickle.dump(creds, token)
+    # Expired tokens with a refresh token are refreshed by the service manager
+    if not creds or not (creds.valid or creds.refresh_token):
+        creds = _run_oauth_flow()
+    return creds
+
+def _run_oauth_flow():
+    from google_auth_oauthlib.flow import InstalledAppFlow  # Deferred: ~60ms to import
+
+    flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
+    creds = flow.run_local_server(port=0)
+    _save_credentials(creds)
+    return creds
+
+def _save_credentials(creds):
+    with open(TOKEN_FILE, "wb") as token:
+        pickle.dump(creds, token)
+
+_calendar_services = GoogleServiceManager(
+    "calendar", "v3",
+    load_credentials=_load_credentials,
+    save_credentials=_save_credentials,
+    reauthorize=_run_oauth_flow,
+)
+
+@timed("get_calendar_service")
+def get_calendar_service():
+    return _calendar_services.get_service()
+
+def calendar_service_stats():
+    return _calendar_services.stats()
+
+# -----------------------------
+# Busy-interval cache
+# -----------------------------
+_busy_cache = BusyIntervalCache(ttl=BUSY_CACHE_TTL, max_entries=BUSY_CACHE_SIZE)
+
+def busy_cache_stats():
+    return _busy_cache.stats()
+
+_series_cache = SeriesCache(max_series=RECURRENCE_CACHE_SIZE)
+
+def recurrence_cache_stats():
+    return _series_cache.stats()
+
+# Concurrent misses for the same day(s) share one Calendar fetch within a process
+_single_flight = SingleFlight()
+
+def single_flight_stats():
+    return _single_flight.stats()
 
-    service = build("calendar", "v3", credentials=creds)
-    return service
+# -----------------------------
+# Shared (cross-worker) cache tier
+# -----------------------------
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_cache():
+    """Returns the Redis-backed tier, connecting on first use; None when SHARED_CACHE_URL is unset."""
+    global _shared_cache
+    if _shared_cache is None and SHARED_CACHE_URL:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                cache = SharedBusyCache(connect_shared_cache(SHARED_CACHE_URL), ttl=SHARED_CACHE_TTL)
+                # Other workers' bookings drop our local copy of the day
+                cache.listen(lambda calendar_id, day: _busy_cache.invalidate(calendar_id, day),
+                             on_reconnect=_busy_cache.invalidate)
+                _shared_cache = cache
+    return _shared_cache
+
+def shared_cache_stats():
+    return _shared_cache.stats() if _shared_cache is not None else {}
+
+def _days_spanned(start_time, end_time):
+    # Cache keys use the booking-zone calendar day, same as get_booked_slots
+    day = start_time.astimezone(AVAILABILITY_RULES.tz).date()
+    last_day = end_time.astimezone(AVAILABILITY_RULES.tz).date()
+    while day <= last_day:
+        yield day
+        day += timedelta(days=1)
+
+# -----------------------------
+# Incremental sync store
+# -----------------------------
+_calendar_sync = None
+_calendar_sync_lock = threading.Lock()
+
+def get_calendar_sync():
+    """Returns the running sync engine, starting it on first use if enabled."""
+    global _calendar_sync
+    if _calendar_sync is None and CALENDAR_SYNC_ENABLED:
+        with _calendar_sync_lock:
+            if _calendar_sync is None:
+                sync = CalendarSync(
+                    GoogleEventsFetcher(get_calendar_service, CALENDAR_ID),
+                    interval=CALENDAR_SYNC_INTERVAL,
+                )
+                sync.start()
+                _calendar_sync = sync
+    return _calendar_sync
+
+def _day_bounds(day):
+    tz = AVAILABILITY_RULES.tz
+    start_day = datetime.combine(day, datetime.min.time(), tzinfo=tz).astimezone(timezone.utc)
+    end_day = datetime.combine(day, datetime.max.time(), tzinfo=tz).astimezone(timezone.utc)
+    return start_day, end_day
 
 # -----------------------------
 # Fetch booked events for a day
 # -----------------------------
-def get_booked_slots(day):
-    service = get_calendar_service()
-    start_day = datetime.combine(day, datetime.min.time()).astimezone(timezone.utc)
-    end_day = datetime.combine(day, datetime.max.time()).astimezone(timezone.utc)
-    events_result = service.events().list(
-        calendarId="primary",
-        timeMin=start_day.isoformat(),
-        timeMax=end_day.isoformat(),
-        singleEvents=True,
-        orderBy="startTime"
-    ).execute()
-    booked_slots = []
-    for event in events_result.get("items", []):
-        start = datetime.fromisoformat(event['start'].get('dateTime')).astimezone(timezone.utc)
-        end = datetime.fromisoformat(event['end'].get('dateTime')).astimezone(timezone.utc)
-        booked_slots.append((start, end))
+@timed("get_booked_slots")
+def get_booked_slots(day, calendar_id=CALENDAR_ID):
+    sync = get_calendar_sync() if calendar_id == CALENDAR_ID else None
+    if sync is not None and sync.ready:
+        return sync.store.busy_between(*_day_bounds(day))
+
+    cached = _busy_cache.get(calendar_id, day)
+    if cached is not None:
+        return cached
+    return _single_flight.do((calendar_id, day), _load_booked_slots, day, calendar_id)
+
+def _load_booked_slots(day, calendar_id):
+    # Read first: an invalidation arriving while we fetch must win over our result
+    generation = _busy_cache.generation(calendar_id, day)
+    shared = get_shared_cache()
+    if shared is None:
+        booked_slots = _list_busy(calendar_id, *_day_bounds(day))
+    else:
+        booked_slots = shared.get_or_fetch(calendar_id, day,
+                                           lambda: _list_busy(calendar_id, *_day_bounds(day)))
+    _busy_cache.put(calendar_id, day, booked_slots, generation)
     return booked_slots
 
+def _execute(request, method):
+    EXTERNAL_CALLS.labels("calendar", method).inc()
+    try:
+        return request.execute()
+    except Exception as err:
+        record_error("calendar", err)
+        raise
+
+def _list_events(calendar_id, time_min, time_max, single_events):
+    service = get_calendar_service()
+    params = {"calendarId": calendar_id, "timeMin": time_min.isoformat(), "timeMax": time_max.isoformat(),
+              "singleEvents": single_events}
+    if single_events:
+        params["orderBy"] = "startTime"
+    events = []
+    page_token = None
+    while True:
+        events_result = _execute(service.events().list(pageToken=page_token, **params), "events.list")
+        events.extend(events_result.get("items", []))
+        page_token = events_result.get("nextPageToken")
+        if not page_token:
+            return events
+
+def _list_busy(calendar_id, time_min, time_max):
+    """
+    Busy intervals overlapping [time_min, time_max).
+
+    Recurring series come back as master events and are expanded locally
+    through the series cache; only rules the engine does not support make
+    us fall back to Google's per-instance expansion.
+    """
+    events = _list_events(calendar_id, time_min, time_max, single_events=False)
+    try:
+        return busy_from_events(events, time_min, time_max, _series_cache)
+    except UnsupportedRecurrence:
+        events = _list_events(calendar_id, time_min, time_max, single_events=True)
+        return sorted(interval for interval in map(event_interval, events) if interval is not None)
+
+# -----------------------------
+# Fetch booked events for a date range
+# -----------------------------
+def _fetch_busy_range(days, calendar_id):
+    time_min = _day_bounds(days[0])[0]
+    time_max = _day_bounds(days[-1])[1]
+    buckets = {day: [] for day in days}
+    for interval in _list_busy(calendar_id, time_min, time_max):
+        for day in _days_spanned(*interval):
+            if day in buckets:
+                buckets[day].append(interval)
+    return buckets
+
+@timed("get_booked_slots_range")
+def get_booked_slots_range(start_day, end_day, calendar_id=CALENDAR_ID):
+    """
+    Returns {day: [(start, end), ...]} for every day from start_day to end_day.
+
+    Days missing from the local cache are looked up in the shared tier, and
+    the rest are fetched with a single events().list over the whole span and
+    cached individually in both.
+    """
+    days = [start_day + timedelta(days=n) for n in range((end_day - start_day).days + 1)]
+    if not days:
+        return {}
+
+    sync = get_calendar_sync() if calendar_id == CALENDAR_ID else None
+    if sync is not None and sync.ready:
+        return {day: sync.store.busy_between(*_day_bounds(day)) for day in days}
+
+    booked = {}
+    missing = []
+    for day in days:
+        cached = _busy_cache.get(calendar_id, day)
+        if cached is None:
+            missing.append(day)
+        else:
+            booked[day] = cached
+
+    if missing:
+        loaded = _single_flight.do((calendar_id, tuple(missing)), _load_busy_range, missing, calendar_id)
+        booked.update((day, list(intervals)) for day, intervals in loaded.items())
+    return booked
+
+def _load_busy_range(days, calendar_id):
+    local_generations = {day: _busy_cache.generation(calendar_id, day) for day in days}
+    shared = get_shared_cache()
+    booked = shared.get_many(calendar_id, days) if shared is not None else {}
+    missing = [day for day in days if day not in booked]
+    if missing:
+        generations = {day: shared.generation(calendar_id, day) for day in missing} if shared is not None else {}
+        fetched = _fetch_busy_range(missing, calendar_id)
+        for day in missing:
+            booked[day] = sorted(fetched[day])
+            if shared is not None:
+                shared.put(calendar_id, day, booked[day], generations[day])
+    for day in days:
+        _busy_cache.put(calendar_id, day, booked[day], local_generations[day])
+    return booked
+
 # -----------------------------
 # Get available slots
 # -----------------------------
 def get_available_slots(day):
-    booked_slots = get_booked_slots(day)
-    slots = []
-    start_time = datetime.combine(day, datetime.strptime("09:00", "%H:%M").time()).astimezone(timezone.utc)
-    end_time = datetime.combine(day, datetime.strptime("17:00", "%H:%M").time()).astimezone(timezone.utc)
-    delta = timedelta(minutes=30)
-
-    while start_time + delta <= end_time:
-        slot_start = start_time
-        slot_end = start_time + delta
-        # Check overlap
-        overlap = False
-        for booked_start, booked_end in booked_slots:
-            if slot_start < booked_end and slot_end > booked_start:
-                overlap = True
-                break
-        if not overlap:
-            slots.append((slot_start, slot_end))
-        start_time += delta
-    return slots
+    return free_slots(day, get_booked_slots(day), AVAILABILITY_RULES)
+
+def get_available_slots_range(start_day, end_day):
+    """Returns {day: [(start, end), ...]} of free slots using one range fetch."""
+    booked = get_booked_slots_range(start_day, end_day)
+    busy = [interval for day_slots in booked.values() for interval in day_slots]
+    return free_slots_range(start_day, end_day, busy, AVAILABILITY_RULES)
+
+# -----------------------------
+# Concurrent fetch across days and calendars
+# -----------------------------
+_async_calendar = AsyncCalendarClient(
+    lambda: _calendar_services.get_credentials().token,
+    max_concurrency=CALENDAR_CONCURRENCY,
+    series_cache=_series_cache,
+)
+
+async def async_get_booked_slots_many(calendar_ids, days):
+    """
+    Returns {(calendar_id, day): [(start, end), ...]} for every pair.
+
+    Pairs served by the sync store or the cache cost nothing; the rest are
+    fetched concurrently (one request per calendar-day, at most
+    CALENDAR_CONCURRENCY in flight) instead of one round-trip after another.
+    """
+    sync = get_calendar_sync()
+    booked = {}
+    windows = {}
+    generations = {}
+    for calendar_id in calendar_ids:
+        for day in days:
+            if calendar_id == CALENDAR_ID and sync is not None and sync.ready:
+                booked[(calendar_id, day)] = sync.store.busy_between(*_day_bounds(day))
+                continue
+            cached = _busy_cache.get(calendar_id, day)
+            if cached is None:
+                windows[(calendar_id, day)] = (calendar_id, *_day_bounds(day))
+                generations[(calendar_id, day)] = _busy_cache.generation(calendar_id, day)
+            else:
+                booked[(calendar_id, day)] = cached
+
+    if windows:
+        fetched = await _async_calendar.busy_many(windows)
+        for (calendar_id, day), intervals in fetched.items():
+            _busy_cache.put(calendar_id, day, intervals, generations[(calendar_id, day)])
+        booked.update(fetched)
+    return booked
+
+async def async_get_available_slots_many(calendar_ids, days):
+    """Returns {(calendar_id, day): [(start, end), ...]} of free slots."""
+    booked = await async_get_booked_slots_many(calendar_ids, days)
+    return {key: free_slots(key[1], busy, AVAILABILITY_RULES) for key, busy in booked.items()}
+
+def get_booked_slots_many(calendar_ids, days):
+    """Blocking wrapper of async_get_booked_slots_many for Flask handlers."""
+    return run_sync(async_get_booked_slots_many(calendar_ids, days))
+
+def get_available_slots_many(calendar_ids, days):
+    """Blocking wrapper of async_get_available_slots_many for Flask handlers."""
+    return run_sync(async_get_available_slots_many(calendar_ids, days))
+
+# -----------------------------
+# Recurring bookings
+# -----------------------------
+def recurring_occurrences(start_time, end_time, rule=RECURRENCE_RULE):
+    """Occurrences of a new series, cut off RECURRENCE_HORIZON_DAYS ahead for open-ended rules."""
+    return list(expand(rule, start_time, end_time, horizon=start_time + timedelta(days=RECURRENCE_HORIZON_DAYS)))
+
+def find_recurring_conflicts(start_time, end_time, rule=RECURRENCE_RULE, calendar_id=CALENDAR_ID):
+    """
+    Occurrences of the series that would overlap busy time or another
+    request's hold, checked together: one range fetch covering every
+    occurrence (usually served by the cache or sync store), then one
+    interval-tree lookup per occurrence.
+    """
+    occurrences = recurring_occurrences(start_time, end_time, rule)
+    first_day = _day_of(occurrences[0][0])
+    last_day = _day_of(occurrences[-1][1])
+    booked = get_booked_slots_range(first_day, last_day, calendar_id)
+    busy_index = IntervalTree({interval for intervals in booked.values() for interval in intervals})
+    conflicts = set(find_conflicts(occurrences, busy_index, AVAILABILITY_RULES.buffer))
+    # The first occurrence is the slot the caller already holds
+    conflicts.update(occurrence for occurrence in occurrences[1:]
+                     if not _reservations.is_free(calendar_id, *occurrence))
+    return sorted(conflicts)
+
+def _day_of(moment):
+    return moment.astimezone(AVAILABILITY_RULES.tz).date()
 
 # -----------------------------
 # Create Event + Send Email
 # -----------------------------
-def create_event(summary, start_time, end_time, client_email, description="", recurring=False):
-    service = get_calendar_service()
-    event = {
+def _event_body(summary, start_time, end_time, client_email, description="", attendees=()):
+    return {
         "summary": summary,
         "description": description,
         "start": {"dateTime": start_time.isoformat(), "timeZone": "Asia/Kolkata"},
         "end": {"dateTime": end_time.isoformat(), "timeZone": "Asia/Kolkata"},
-        "attendees": [{"email": client_email}],
+        "attendees": [{"email": email} for email in (client_email, *attendees)],
     }
+
+def _write_through(calendar_id, start_time, end_time):
+    start_utc, end_utc = start_time.astimezone(timezone.utc), end_time.astimezone(timezone.utc)
+    shared = get_shared_cache()
+    for day in _days_spanned(start_time, end_time):
+        _busy_cache.add_interval(calendar_id, day, start_utc, end_utc)
+        if shared is not None:
+            shared.invalidate(calendar_id, day)
+
+def _existing_event(service, calendar_id, event_id):
+    """The event with a client-supplied id, or None if it was never created."""
+    try:
+        return _execute(service.events().get(calendarId=calendar_id, eventId=event_id), "events.get")
+    except Exception as err:
+        if getattr(getattr(err, "resp", None), "status", None) == 404:
+            return None
+        raise
+
+@timed("create_event")
+def create_event(summary, start_time, end_time, client_email, description="", recurring=False,
+                 calendar_id=CALENDAR_ID, attendees=(), event_id=None):
+    """
+    Inserts the event and records the booking; returns the event's link.
+
+    With `event_id` (a client-side id, [a-v0-9]{5,1024}) the insert is
+    idempotent: a retry after a lost response finds the event created by the
+    earlier attempt instead of creating, and inviting to, a second one.
+    """
+    service = get_calendar_service()
+    event = _event_body(summary, start_time, end_time, client_email, description, attendees)
+    occurrences = [(start_time, end_time)]
+    created_event = None
+    if event_id:
+        event["id"] = event_id
+        if recurring:
+            # An earlier attempt's series would read as conflicting with itself
+            created_event = _existing_event(service, calendar_id, event_id)
     if recurring:
-        event["recurrence"] = ["RRULE:FREQ=WEEKLY;COUNT=10"]  # Example: weekly 10 times
+        if created_event is None:
+            conflicts = find_recurring_conflicts(start_time, end_time, calendar_id=calendar_id)
+            if conflicts:
+                raise RecurrenceConflict(conflicts)
+        occurrences = recurring_occurrences(start_time, end_time)
+        event["recurrence"] = [RECURRENCE_RULE]
+
+    if created_event is None:
+        try:
+            created_event = _execute(service.events().insert(
+                calendarId=calendar_id,
+                body=event,
+                sendUpdates="all"
+            ), "events.insert")
+        except Exception as err:
+            if not event_id or getattr(getattr(err, "resp", None), "status", None) != 409:
+                raise
+            # The id is taken: an earlier attempt went through but its response was lost
+            created_event = _existing_event(service, calendar_id, event_id)
+            if created_event is None:
+                raise
 
-    created_event = service.events().insert(
-        calendarId="primary",
-        body=event,
-        sendUpdates="all"
-    ).execute()
+    # Write-through so the new booking is visible before the cache/sync catches up
+    if _calendar_sync is not None and calendar_id == CALENDAR_ID:
+        if recurring:
+            # Instances under Google's own ids, so the next incremental sync replaces them
+            _calendar_sync.store.apply([instance_event(created_event, start, end) for start, end in occurrences])
+        else:
+            _calendar_sync.store.apply([created_event])
+    for start, end in occurrences:
+        _write_through(calendar_id, start, end)
 
     # Save locally
-    save_booking(client_email, start_time, end_time, description)
+    save_booking(client_email, start_time, end_time, description, calendar_id=calendar_id,
+                 event_id=created_event.get("id"))
 
     return created_event.get("htmlLink")
 
+# -----------------------------
+# Reserve + create (double-booking guard)
+# -----------------------------
+_reservations = ReservationTable(hold_ttl=SLOT_HOLD_TTL)
+
+def reservation_stats():
+    return _reservations.stats()
+
+REGISTRY.register_stats("calendar_service", calendar_service_stats)
+REGISTRY.register_stats("busy_cache", busy_cache_stats)
+REGISTRY.register_stats("recurrence_cache", recurrence_cache_stats)
+REGISTRY.register_stats("shared_cache", shared_cache_stats)
+REGISTRY.register_stats("single_flight", single_flight_stats)
+REGISTRY.register_stats("reservations", reservation_stats)
+
+def hold_slot(start_time, end_time, owner=None, calendar_id=CALENDAR_ID, hold_id=None):
+    """Holds (or renews the hold on) a slot while the user confirms; raises SlotConflict if taken."""
+    return _reservations.hold(calendar_id, start_time, end_time, owner=owner, reservation_id=hold_id)
+
+def release_slot(hold_id):
+    return _reservations.release(hold_id)
+
+def book_slot(summary, start_time, end_time, client_email, description="", recurring=False, hold_id=None,
+              calendar_id=CALENDAR_ID, attendees=(), event_id=None, release_on_error=True):
+    """
+    Creates the event under a local reservation, so two concurrent requests
+    for the same slot cannot both reach the Calendar insert.
+
+    Reservations live in this process's ReservationTable: the guard covers
+    the threads of one worker, and a `hold_id` taken in another process
+    is unknown here, so a fresh hold is taken instead. A caller that will
+    retry (the booking queue) passes release_on_error=False to keep the
+    hold across attempts and releases it itself once it gives up.
+
+    Raises:
+        SlotConflict: If another request holds or has booked the slot
+    """
+    hold_id = _reservations.hold(calendar_id, start_time, end_time, owner=client_email, reservation_id=hold_id)
+    try:
+        event_link = create_event(summary, start_time, end_time, client_email, description, recurring,
+                                  calendar_id=calendar_id, attendees=attendees, event_id=event_id)
+    except Exception:
+        if release_on_error:
+            _reservations.release(hold_id)
+        raise
+    _reservations.commit(hold_id)
+    return event_link
+
+# -----------------------------
+# Agents: pick who takes the booking
+# -----------------------------
+_agent_registry = None
+_agent_registry_lock = threading.Lock()
+
+def agents_enabled():
+    return bool(AGENTS_FILE)
+
+def get_agent_registry():
+    """Agents from AGENTS_FILE, or a single agent on the primary calendar."""
+    global _agent_registry
+    if _agent_registry is None:
+        with _agent_registry_lock:
+            if _agent_registry is None:
+                agents = load_agents(AGENTS_FILE) if AGENTS_FILE else [Agent(CALENDAR_ID)]
+                _agent_registry = AgentRegistry(
+                    agents,
+                    strategy=ASSIGNMENT_STRATEGY,
+                    tz=AVAILABILITY_RULES.tz,
+                    buffer=AVAILABILITY_RULES.buffer,
+                    ttl=BUSY_CACHE_TTL,
+                )
+    return _agent_registry
+
+def ensure_agents_loaded(registry, days):
+    """Refreshes stale agent-days in the registry with one concurrent fetch."""
+    stale = registry.stale_days(days)
+    if not stale:
+        return
+    calendars = {agent_id: registry.get(agent_id).calendar_id for agent_id in stale}
+    stale_days = sorted({day for agent_days in stale.values() for day in agent_days})
+    booked = get_booked_slots_many(sorted(set(calendars.values())), stale_days)
+    for agent_id, agent_days in stale.items():
+        for day in agent_days:
+            registry.load(agent_id, day, booked[(calendars[agent_id], day)])
+
+def get_team_available_slots_range(start_day, end_day):
+    """Returns {day: [(start, end), ...]} of slots where at least one active agent is free."""
+    days = [start_day + timedelta(days=n) for n in range((end_day - start_day).days + 1)]
+    calendar_ids = sorted({agent.calendar_id for agent in get_agent_registry().agents()})
+    free = get_available_slots_many(calendar_ids, days)
+    team = {day: set() for day in days}
+    for (_, day), slots in free.items():
+        team[day].update(slots)
+    return {day: sorted(slots) for day, slots in team.items()}
+
+def get_team_available_slots(day):
+    return get_team_available_slots_range(day, day)[day]
+
+def book_with_agent(summary, start_time, end_time, client_email, description="", recurring=False,
+                    strategy=None, event_id=None):
+    """
+    Assigns a free agent and books the slot on their calendar.
+
+    The choice is made from the registry's in-memory indexes; an agent that
+    loses the race for the slot (held locally or booked meanwhile) is
+    skipped and the next candidate tried.
+
+    Returns:
+        tuple: (Agent, event link)
+
+    Raises:
+        SlotConflict: If no agent is free for the slot
+    """
+    registry = get_agent_registry()
+    days = registry.days_spanned(start_time, end_time)
+    if (strategy or registry.strategy) == LEAST_LOADED:
+        days = registry.week_days(start_time)
+    ensure_agents_loaded(registry, list(days))
+
+    def not_held(agent):
+        return _reservations.is_free(agent.calendar_id, start_time, end_time)
+
+    tried = set()
+    while True:
+        agent = registry.assign(start_time, end_time, strategy=strategy, exclude=tried, is_available=not_held)
+        if agent is None:
+            raise SlotConflict("No agent is free for the requested slot")
+        try:
+            event_link = book_slot(summary, start_time, end_time, client_email, description, recurring,
+                                   event_id=event_id,
+                                   calendar_id=agent.calendar_id,
+                                   attendees=[agent.email] if agent.email else ())
+        except SlotConflict:
+            tried.add(agent.agent_id)
+            continue
+        registry.mark_busy(agent.agent_id, start_time, end_time)
+        return agent, event_link
+
+# -----------------------------
+# Signed slot offers
+# -----------------------------
+ANY_AGENT = "*"  # Token calendar for team availability; book_with_agent picks the calendar
+
+def _slot_token_secret():
+    """
+    SLOT_TOKEN_SECRET, required in production. Elsewhere a random key is
+    generated, so tokens only verify in the process that issued them.
+    """
+    if SLOT_TOKEN_SECRET:
+        return SLOT_TOKEN_SECRET
+    if PRODUCTION:
+        raise RuntimeError("SLOT_TOKEN_SECRET must be set in production so that every worker "
+                           "and replica accepts the slot tokens the others issue")
+    logging.getLogger(__name__).warning(
+        "SLOT_TOKEN_SECRET is not set; slot tokens will only verify in this process")
+    return secrets.token_bytes(32)
+
+_slot_signer = SlotTokenSigner(_slot_token_secret(), ttl=SLOT_TOKEN_TTL)
+
+# Slot rules and token key: a response cached under another configuration never revalidates
+_offers_fingerprint = hashlib.blake2b(repr((
+    sorted(AVAILABILITY_RULES.business_hours.items()), AVAILABILITY_RULES.slot, AVAILABILITY_RULES.step,
+    AVAILABILITY_RULES.buffer, str(AVAILABILITY_RULES.tz), _slot_signer.key_id,
+)).encode("utf-8"), digest_size=6).hexdigest()
+
+def _offers(calendar_id, slots, version="", expires_at=None):
+    expires_at = expires_at or _slot_signer.aligned_expiry()
+    return [(start, end, _slot_signer.issue(calendar_id, start, end, version, expires_at)) for start, end in slots]
+
+def get_slot_offers(day):
+    """Free slots of a day as (start, end, token); team slots when agents are configured."""
+    if agents_enabled():
+        return _offers(ANY_AGENT, get_team_available_slots(day))
+    busy = get_booked_slots(day)
+    return _offers(CALENDAR_ID, free_slots(day, busy, AVAILABILITY_RULES), availability_version(busy))
+
+def slot_offers_snapshot(start_day, end_day):
+    """
+    Returns (generation, build) for the offers of a date range without computing any slot.
+
+    The generation combines each day's availability version, the token
+    expiry window and the rules/key fingerprint, so every worker derives the
+    same one exactly when it would return the same offers. build() computes
+    {day: [(start, end, token), ...]} from the busy intervals the generation
+    was taken from. Team availability has no identity cheaper than its free
+    slots, so with agents those are computed up front.
+    """
+    expires_at = _slot_signer.aligned_expiry()
+    if agents_enabled():
+        team = get_team_available_slots_range(start_day, end_day)
+        versions = [availability_version(team[day]) for day in sorted(team)]
+
+        def build():
+            return {day: _offers(ANY_AGENT, slots, expires_at=expires_at) for day, slots in team.items()}
+    else:
+        booked = get_booked_slots_range(start_day, end_day)
+        day_versions = {day: availability_version(intervals) for day, intervals in booked.items()}
+        versions = [day_versions[day] for day in sorted(day_versions)]
+
+        def build():
+            busy = [interval for day_slots in booked.values() for interval in day_slots]
+            return {day: _offers(CALENDAR_ID, slots, day_versions[day], expires_at)
+                    for day, slots in free_slots_range(start_day, end_day, busy, AVAILABILITY_RULES).items()}
+    return "%s.%d.%s" % (_offers_fingerprint, expires_at, ",".join(versions)), build
+
+def get_slot_offers_range(start_day, end_day):
+    """{day: [(start, end, token), ...]} using one range fetch."""
+    return slot_offers_snapshot(start_day, end_day)[1]()
+
+def verify_slot_token(token):
+    """
+    The SlotToken of an offered slot, checked without a Calendar round-trip.
+
+    When the day's busy intervals (sync store or cache) still hash to the
+    token's version nothing has changed since the offer; otherwise the slot
+    is checked against them. Only a process that has neither re-fetches.
+
+    Raises:
+        InvalidSlotToken: If the token is malformed, forged or expired
+        SlotConflict: If the slot has been taken since it was offered
+    """
+    slot = _slot_signer.verify(token)
+    if slot.calendar_id == ANY_AGENT:
+        return slot
+    busy = get_booked_slots(_day_of(slot.start), calendar_id=slot.calendar_id)
+    if availability_version(busy) != slot.version:
+        buffer = AVAILABILITY_RULES.buffer
+        if any(start - buffer < slot.end and end + buffer > slot.start for start, end in busy):
+            raise SlotConflict("Slot was booked after it was offered")
+    return slot
+
 # -----------------------------
 # Save booking locally
 # -----------------------------
-def save_booking(email, start_time, end_time, description):
-    file_exists = os.path.exists(BOOKINGS_FILE)
-    with open(BOOKINGS_FILE, "a", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        if not file_exists:
-            writer.writerow(["Email", "Start Time", "End Time", "Description"])
-        writer.writerow([email, start_time.isoformat(), end_time.isoformat(), description])
+_booking_store = BookingStore(BOOKINGS_DB)
+
+def get_booking_store():
+    return _booking_store
+
+@timed("save_booking")
+def save_booking(email, start_time, end_time, description, calendar_id=CALENDAR_ID, event_id=None):
+    return _booking_store.add(email, start_time, end_time, description, calendar_id=calendar_id, event_id=event_id)
+
+# -----------------------------
+# Bulk booking (migrations, open-house schedules)
+# -----------------------------
+@timed("book_many")
+def book_many(bookings, calendar_id=CALENDAR_ID, batch_size=BATCH_SIZE, dry_run=False, send_updates="all",
+              max_attempts=4, backoff=1.0):
+    """
+    Creates many bookings with one availability fetch and batched inserts.
+
+    Every row is validated against a single range fetch covering the whole
+    file, against local holds and against earlier rows; the valid ones are
+    held, inserted through BatchHttpRequest (see bulk_booking.insert_events)
+    and saved to the booking store in one transaction.
+
+    Args:
+        bookings (list): bulk_booking.BulkBooking rows
+        dry_run (bool): Validate only
+
+    Returns:
+        list: One result dict per row (see bulk_booking.result)
+    """
+    if not bookings:
+        return []
+    first_day = min(_day_of(b.start_time) for b in bookings)
+    last_day = max(_day_of(b.end_time) for b in bookings)
+    booked = get_booked_slots_range(first_day, last_day, calendar_id=calendar_id)
+    busy = {interval for day_slots in booked.values() for interval in day_slots}
+    accepted, results = validate_bookings(bookings, busy, AVAILABILITY_RULES.buffer)
+
+    held = {}
+    for booking in accepted:
+        try:
+            held[str(booking.row)] = (booking, _reservations.hold(
+                calendar_id, booking.start_time, booking.end_time, owner=booking.email))
+        except SlotConflict as err:
+            results.append(bulk_result(booking, CONFLICT, err))
+    if dry_run:
+        for booking, hold_id in held.values():
+            _reservations.release(hold_id)
+            results.append(bulk_result(booking, VALID))
+        return sorted(results, key=lambda outcome: outcome["row"])
+
+    bodies = {}
+    for request_id, (booking, _) in held.items():
+        body = _event_body(booking.summary, booking.start_time, booking.end_time, booking.email,
+                           booking.description)
+        body["id"] = uuid.uuid4().hex  # Client-side id makes retried inserts idempotent
+        bodies[request_id] = body
+    created, failed = insert_events(get_calendar_service(), calendar_id, bodies, batch_size=batch_size,
+                                    max_attempts=max_attempts, backoff=backoff, send_updates=send_updates)
+
+    saved = []
+    for request_id, (booking, hold_id) in held.items():
+        event = created.get(request_id)
+        if event is None:
+            _reservations.release(hold_id)
+            results.append(bulk_result(booking, FAILED, failed.get(request_id)))
+            continue
+        _reservations.commit(hold_id)
+        _write_through(calendar_id, booking.start_time, booking.end_time)
+        saved.append({"email": booking.email, "start_time": booking.start_time, "end_time": booking.end_time,
+                      "description": booking.description, "calendar_id": calendar_id,
+                      "event_id": event.get("id")})
+        results.append(bulk_result(booking, CREATED, event=event))
+    if _calendar_sync is not None and calendar_id == CALENDAR_ID:
+        _calendar_sync.store.apply(list(created.values()))
+    _booking_store.add_many(saved)
+    return sorted(results, key=lambda outcome: outcome["row"])
 
 # -----------------------------
 # Main Booking Flow
@@ -1,17 +1,280 @@
+import asyncio
+import json
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+
+import httpx
 import requests
-from config import GROQ_API_KEY
+from requests.adapters import HTTPAdapter
+
+from backend.config import GROQ_API_KEY, LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_DB, LLM_CACHE_FUZZY
+from backend.llm_cache import LLMCache
+from backend.metrics import EXTERNAL_CALLS, EXTERNAL_RETRIES, REGISTRY, record_error, timed
 
 API_URL = "https://api.groq.com/openai/v1/chat/completions"
 MODEL_NAME = "mixtral-8x7b-32768"
 TIMEOUT = 30  # seconds
+CONNECT_TIMEOUT = 5  # seconds
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _retry_after(headers):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date), if any."""
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _sse_content(lines):
+    """Yields content deltas from OpenAI-style server-sent event lines."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        delta = json.loads(data)["choices"][0].get("delta", {})
+        if delta.get("content"):
+            yield delta["content"]
+
+
+class GroqClient:
+    """
+    Chat-completions client for Groq's OpenAI-compatible API.
+
+    Keeps HTTP connections alive in a pool instead of paying TCP+TLS setup on
+    every chatbot turn, retries 429/5xx and connection errors with exponential
+    backoff (honoring Retry-After), and can stream tokens as they arrive.
+    An asyncio variant shares the same settings.
+
+    Args:
+        api_key (str): Groq API key
+        api_url (str): Chat completions endpoint
+        model (str): Model name
+        timeout (float): Read timeout in seconds
+        max_retries (int): Retries after the first attempt
+        backoff (float): First retry delay in seconds, doubled each retry
+        max_backoff (float): Upper bound on any single delay
+        pool_size (int): Keep-alive connections kept per host
+    """
+
+    def __init__(self, api_key=GROQ_API_KEY, api_url=API_URL, model=MODEL_NAME, timeout=TIMEOUT,
+                 max_retries=3, backoff=0.5, max_backoff=20.0, pool_size=10):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self._headers())
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+        self._async_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0}
+
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+
+    def _payload(self, prompt, system_prompt, stream):
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        payload = {"model": self.model, "messages": messages}
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _delay(self, attempt, headers=None):
+        requested = _retry_after(headers) if headers is not None else None
+        if requested is None:
+            requested = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+        return min(requested, self.max_backoff)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+        if key == "requests":
+            EXTERNAL_CALLS.labels("groq", "chat.completions").inc()
+        else:
+            EXTERNAL_RETRIES.labels("groq").inc()
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    # -----------------------------
+    # Blocking API
+    # -----------------------------
+    def _post(self, payload, stream=False):
+        for attempt in range(self.max_retries + 1):
+            self._count("requests")
+            try:
+                response = self.session.post(self.api_url, json=payload, stream=stream,
+                                             timeout=(CONNECT_TIMEOUT, self.timeout))
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                time.sleep(self._delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._delay(attempt, response.headers)
+                response.close()
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            response.raise_for_status()
+            return response
+
+    def complete(self, prompt, system_prompt=None):
+        """Returns the full completion text; raises requests exceptions on failure."""
+        response = self._post(self._payload(prompt, system_prompt, stream=False))
+        return response.json()["choices"][0]["message"]["content"]
+
+    def stream(self, prompt, system_prompt=None):
+        """Yields completion text chunks as the server streams them (SSE)."""
+        response = self._post(self._payload(prompt, system_prompt, stream=True), stream=True)
+        with response:
+            yield from _sse_content(response.iter_lines())
 
-def ask_groq(prompt, system_prompt=None):
+    # -----------------------------
+    # Asyncio API
+    # -----------------------------
+    def _async_client(self):
+        # httpx async clients are bound to the event loop they were created on
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                self._forget_closed_loops()
+                client = httpx.AsyncClient(
+                    headers=self._headers(),
+                    timeout=httpx.Timeout(self.timeout, connect=CONNECT_TIMEOUT),
+                    limits=httpx.Limits(max_keepalive_connections=self.pool_size, max_connections=self.pool_size),
+                )
+                self._async_clients[loop] = client
+        return client
+
+    def _forget_closed_loops(self):
+        # A client whose loop has closed (e.g. after asyncio.run) cannot be closed any more;
+        # dropping it lets its connections be collected with the loop
+        for loop in [loop for loop in self._async_clients if loop.is_closed()]:
+            del self._async_clients[loop]
+
+    async def _apost(self, payload):
+        client = self._async_client()
+        for attempt in range(self.max_retries + 1):
+            self._count("requests")
+            try:
+                request = client.build_request("POST", self.api_url, json=payload)
+                response = await client.send(request, stream=bool(payload.get("stream")))
+            except (httpx.ConnectError, httpx.TimeoutException):
+                if attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                await asyncio.sleep(self._delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._delay(attempt, response.headers)
+                await response.aclose()
+                self._count("retries")
+                await asyncio.sleep(delay)
+                continue
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            return response
+
+    async def acomplete(self, prompt, system_prompt=None):
+        response = await self._apost(self._payload(prompt, system_prompt, stream=False))
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def astream(self, prompt, system_prompt=None):
+        response = await self._apost(self._payload(prompt, system_prompt, stream=True))
+        try:
+            async for line in response.aiter_lines():
+                for chunk in _sse_content([line]):
+                    yield chunk
+                if line.strip() == "data: [DONE]":
+                    break
+        finally:
+            await response.aclose()
+
+    async def aclose(self):
+        """Closes this event loop's async client and forgets those of closed loops."""
+        with self._async_lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+            self._forget_closed_loops()
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """Closes the session and every async client whose event loop is idle."""
+        self.session.close()
+        with self._async_lock:
+            clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        for loop, client in clients:
+            if not loop.is_closed() and not loop.is_running():
+                loop.run_until_complete(client.aclose())
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_groq_client():
+    """Returns the process-wide pooled client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GroqClient()
+    return _client
+
+
+# Repeated chatbot messages are answered locally; only successful answers are stored
+_llm_cache = LLMCache(max_entries=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL, path=LLM_CACHE_DB, fuzzy=LLM_CACHE_FUZZY)
+
+
+def llm_cache_stats():
+    return _llm_cache.stats()
+
+
+REGISTRY.register_stats("llm_cache", llm_cache_stats)
+
+
+@timed("ask_groq")
+def ask_groq(prompt, system_prompt=None, use_cache=True):
     """
     Sends a prompt to the Groq API and returns the AI response.
 
     Args:
         prompt (str): User input prompt
         system_prompt (str, optional): System-level instructions for the AI
+        use_cache (bool): Answer repeated prompts from the response cache
 
     Returns:
         str: AI response or error message
@@ -19,31 +282,34 @@ def ask_groq(prompt, system_prompt=None):
     if not GROQ_API_KEY:
         return "Error: GROQ API key is not set."
 
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    data = {
-        "model": MODEL_NAME,
-        "messages": []
-    }
-
-    if system_prompt:
-        data["messages"].append({"role": "system", "content": system_prompt})
-    
-    data["messages"].append({"role": "user", "content": prompt})
+    if use_cache:
+        cached = _llm_cache.get(system_prompt, prompt, MODEL_NAME)
+        if cached is not None:
+            return cached
 
     try:
-        response = requests.post(API_URL, headers=headers, json=data, timeout=TIMEOUT)
-        response.raise_for_status()  # Raise HTTPError for bad responses
-        result = response.json()
-        return result["choices"][0]["message"]["content"]
-    except requests.exceptions.Timeout:
+        answer = get_groq_client().complete(prompt, system_prompt)
+    except requests.exceptions.Timeout as err:
+        record_error("groq", err)
         return "Error: Request timed out. Please try again."
     except requests.exceptions.HTTPError as http_err:
+        record_error("groq", http_err)
         return f"HTTP error occurred: {http_err}"
     except requests.exceptions.RequestException as req_err:
+        record_error("groq", req_err)
         return f"Request error: {req_err}"
-    except KeyError:
+    except (KeyError, IndexError, ValueError) as err:
+        record_error("groq", err)
         return "Error: Unexpected response format from Groq API."
+
+    if use_cache:
+        _llm_cache.put(system_prompt, prompt, MODEL_NAME, answer)
+    return answer
+
+
+def stream_groq(prompt, system_prompt=None):
+    """Yields the AI response in chunks as they are generated."""
+    if not GROQ_API_KEY:
+        yield "Error: GROQ API key is not set."
+        return
+    yield from get_groq_client().stream(prompt, system_prompt)
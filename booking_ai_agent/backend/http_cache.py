@@ -0,0 +1,92 @@
+import base64
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+GZIP_MIN_BYTES = 1024  # Smaller bodies fit in a packet anyway; gzip would only cost CPU
+GZIP_LEVEL = 6
+
+
+def strong_etag(*parts):
+    """Unquoted strong ETag for a response identified by `parts` (e.g. endpoint key and generation)."""
+    digest = hashlib.blake2b("\0".join(map(str, parts)).encode("utf-8"), digest_size=12).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+
+class SerializedResponse:
+    """
+    A response body serialized once, with its gzip encoding made on first use.
+
+    Args:
+        body (bytes): Identity-encoded body
+    """
+
+    __slots__ = ("body", "_gzipped", "_lock")
+
+    def __init__(self, body):
+        self.body = body
+        self._gzipped = None
+        self._lock = threading.Lock()
+
+    @property
+    def compressible(self):
+        return len(self.body) >= GZIP_MIN_BYTES
+
+    def gzipped(self):
+        if self._gzipped is None:
+            with self._lock:
+                if self._gzipped is None:
+                    # mtime=0 keeps the bytes, and so the ETag, identical across workers
+                    self._gzipped = gzip.compress(self.body, GZIP_LEVEL, mtime=0)
+        return self._gzipped
+
+
+class ResponseCache:
+    """
+    LRU of pre-serialized response bodies keyed by (key, generation).
+
+    A generation changes whenever the underlying data does, so entries are
+    never invalidated: stale generations simply stop being requested and
+    fall out of the LRU.
+
+    Args:
+        max_entries (int): Maximum number of cached bodies
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_build(self, key, serialize):
+        """Returns the SerializedResponse for `key`, calling serialize() -> bytes on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry
+            self._stats["misses"] += 1
+
+        entry = SerializedResponse(serialize())
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["entries"] = len(self._entries)
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
@@ -0,0 +1,209 @@
+class _Node:
+    __slots__ = ("start", "end", "key", "max_end", "height", "left", "right")
+
+    def __init__(self, start, end, key):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.max_end = end
+        self.height = 1
+        self.left = None
+        self.right = None
+
+
+def _height(node):
+    return node.height if node is not None else 0
+
+
+def _update(node):
+    left, right = node.left, node.right
+    node.height = 1 + max(_height(left), _height(right))
+    max_end = node.end
+    if left is not None and left.max_end > max_end:
+        max_end = left.max_end
+    if right is not None and right.max_end > max_end:
+        max_end = right.max_end
+    node.max_end = max_end
+
+
+def _rotate_right(node):
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _rotate_left(node):
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _balance(node):
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+def _insert(node, new, item):
+    if node is None:
+        return new
+    if item < (node.start, node.end, node.key):
+        node.left = _insert(node.left, new, item)
+    else:
+        node.right = _insert(node.right, new, item)
+    return _balance(node)
+
+
+def _remove_min(node):
+    if node.left is None:
+        return node.right
+    node.left = _remove_min(node.left)
+    return _balance(node)
+
+
+def _remove(node, item):
+    """Returns (new subtree root, whether `item` was found)."""
+    if node is None:
+        return None, False
+    here = (node.start, node.end, node.key)
+    if item < here:
+        node.left, removed = _remove(node.left, item)
+    elif here < item:
+        node.right, removed = _remove(node.right, item)
+    else:
+        if node.left is None:
+            return node.right, True
+        if node.right is None:
+            return node.left, True
+        successor = node.right
+        while successor.left is not None:
+            successor = successor.left
+        successor.right = _remove_min(node.right)
+        successor.left = node.left
+        node, removed = successor, True
+    return (_balance(node), True) if removed else (node, False)
+
+
+def _collect(node, start, end, out, closed=False):
+    # In-order walk that skips subtrees ending at or before `start` and stops
+    # once nodes start at or after `end` (after `end` when closed)
+    while node is not None:
+        if node.max_end <= start:
+            return
+        _collect(node.left, start, end, out, closed)
+        if node.start > end or (node.start == end and not closed):
+            return
+        if node.end > start:
+            out.append((node.start, node.end, node.key))
+        node = node.right
+
+
+class IntervalTree:
+    """
+    Augmented AVL tree of half-open [start, end) intervals.
+
+    Nodes are ordered by (start, end, key) and carry the largest end in
+    their subtree, so insert, remove and "does anything overlap" are
+    O(log n), and listing overlaps is O(log n + k) for k results. Works on
+    any ordered values (datetimes, numbers); keys tell apart equal
+    intervals and must be mutually comparable (event ids, reservation ids).
+
+    Args:
+        intervals (iterable, optional): Initial (start, end) or (start, end, key) tuples
+    """
+
+    def __init__(self, intervals=()):
+        self._root = None
+        self._size = 0
+        for interval in intervals:
+            self.insert(*interval)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        """Yields (start, end, key) in order."""
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.start, node.end, node.key
+            node = node.right
+
+    def clear(self):
+        self._root = None
+        self._size = 0
+
+    @property
+    def max_end(self):
+        return self._root.max_end if self._root is not None else None
+
+    def insert(self, start, end, key=None):
+        if end < start:
+            raise ValueError(f"Interval ends before it starts: {start!r} - {end!r}")
+        self._root = _insert(self._root, _Node(start, end, key), (start, end, key))
+        self._size += 1
+
+    def remove(self, start, end, key=None):
+        """Removes one matching interval; returns False if there was none."""
+        self._root, removed = _remove(self._root, (start, end, key))
+        if removed:
+            self._size -= 1
+        return removed
+
+    def overlaps(self, start, end):
+        """True if any interval overlaps [start, end)."""
+        node = self._root
+        while node is not None:
+            if node.start < end and node.end > start:
+                return True
+            # If the left subtree reaches past `start` but has no overlap, its
+            # latest-ending interval starts at or after `end`, and so does
+            # everything to the right: the left side is the only candidate
+            if node.left is not None and node.left.max_end > start:
+                node = node.left
+            else:
+                node = node.right
+        return False
+
+    def overlapping(self, start, end):
+        """Sorted (start, end, key) of intervals overlapping [start, end)."""
+        out = []
+        _collect(self._root, start, end, out)
+        return out
+
+    def stab(self, point):
+        """Sorted (start, end, key) of intervals containing `point`."""
+        out = []
+        _collect(self._root, point, point, out, closed=True)
+        return out
+
+    def next_free(self, start, duration, until=None):
+        """
+        Earliest t >= start with [t, t + duration) overlapping nothing.
+
+        Returns None if no such gap ends by `until`.
+        """
+        moment = start
+        while until is None or moment + duration <= until:
+            blocking = self.overlapping(moment, moment + duration)
+            if not blocking:
+                return moment
+            moment = max(end for _, end, _ in blocking)
+        return None
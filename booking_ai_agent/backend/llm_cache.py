@@ -0,0 +1,233 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at);
+"""
+
+# -----------------------------
+# Prompt normalization
+# -----------------------------
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_WEEKDAY_ABBR = {name[:3]: n for n, name in enumerate(_WEEKDAYS)}
+_MONTHS = {name: n for n, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PUNCTUATION_RE = re.compile(r"[!?,;\"'()]+|\.(?=\s|$)")
+_RELATIVE_RE = re.compile(r"\b(today|tonight|tomorrow|day after tomorrow)\b")
+_WEEKDAY_RE = re.compile(
+    r"\b(?:(next|this)\s+)?(mon|tue|wed|thu|fri|sat|sun)(?:day|sday|nesday|rsday|urday)?\b"
+)
+_ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_MONTH_NAMES = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_MONTH_DAY_RE = re.compile(r"\b" + _MONTH_NAMES + r"\s+(\d{1,2})(?:st|nd|rd|th)?\b")
+_DAY_MONTH_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?" + _MONTH_NAMES + r"(?=\s|$)")
+_TIME_12H_RE = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*([ap])\.?m\.?(?=\W|$)")
+_TIME_24H_RE = re.compile(r"\b(\d{1,2}):(\d{2})\b")
+
+
+def normalize_text(text):
+    """Exact-match normalization: trims and collapses whitespace."""
+    return _WHITESPACE_RE.sub(" ", (text or "").strip())
+
+
+def _month_day(today, month, day):
+    try:
+        candidate = date(today.year, month, day)
+    except ValueError:
+        return None
+    # A month/day that has already passed this year means next year
+    if candidate < today:
+        try:
+            candidate = date(today.year + 1, month, day)
+        except ValueError:
+            return None
+    return candidate.isoformat()
+
+
+def fuzzy_text(text, today=None):
+    """
+    Embedding-free fuzzy normalization for near-identical chat messages.
+
+    Lowercases, drops punctuation and resolves relative and spelled-out dates
+    and times against `today`, so "Book tomorrow at 3 PM!" and
+    "book 2025-10-02 at 15:00" (asked on 2025-10-01) share one key. Because
+    dates are resolved, a cached answer mentioning "tomorrow" is never reused
+    on a different day.
+
+    Args:
+        text (str): Prompt text
+        today (date, optional): Reference date, defaults to date.today()
+
+    Returns:
+        str: Canonical text
+    """
+    today = today or date.today()
+    text = normalize_text(text).lower()
+    text = _PUNCTUATION_RE.sub(" ", text)
+
+    offsets = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}
+    text = _RELATIVE_RE.sub(lambda m: (today + timedelta(days=offsets[m.group(1)])).isoformat(), text)
+
+    def weekday(match):
+        ahead = (_WEEKDAY_ABBR[match.group(2)] - today.weekday()) % 7
+        if match.group(1) == "next" and ahead == 0:
+            ahead = 7
+        # Keep "next" so "monday" and "next monday" stay distinct where models disagree
+        prefix = "next " if match.group(1) == "next" else ""
+        return prefix + (today + timedelta(days=ahead)).isoformat()
+
+    text = _WEEKDAY_RE.sub(weekday, text)
+    text = _ISO_DATE_RE.sub(
+        lambda m: _month_day(date(int(m.group(1)), 1, 1), int(m.group(2)), int(m.group(3))) or m.group(0), text
+    )
+    text = _MONTH_DAY_RE.sub(lambda m: _month_day(today, _MONTHS[m.group(1)], int(m.group(2))) or m.group(0), text)
+    text = _DAY_MONTH_RE.sub(lambda m: _month_day(today, _MONTHS[m.group(2)], int(m.group(1))) or m.group(0), text)
+
+    def twelve_hour(match):
+        hour, minute = int(match.group(1)) % 12, int(match.group(2) or 0)
+        if match.group(3) == "p":
+            hour += 12
+        return f"{hour:02d}:{minute:02d}"
+
+    text = _TIME_12H_RE.sub(twelve_hour, text)
+    text = _TIME_24H_RE.sub(lambda m: f"{int(m.group(1)):02d}:{m.group(2)}", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+# -----------------------------
+# Cache
+# -----------------------------
+class LLMCache:
+    """
+    Two-tier response cache for LLM completions.
+
+    Keys are a hash of the normalized (system_prompt, prompt, model); with
+    `fuzzy=True` the prompt goes through fuzzy_text first. Lookups hit an
+    in-memory LRU, then the optional SQLite tier, which survives restarts and
+    is shared between worker processes. Both tiers expire entries after `ttl`.
+
+    Args:
+        max_entries (int): In-memory LRU size
+        ttl (float): Seconds an answer stays valid
+        path (str, optional): SQLite file for the on-disk tier
+        fuzzy (bool): Use the fuzzy prompt key
+        clock (callable, optional): Wall-clock time source, overridable in tests
+        today (callable, optional): Returns the reference date for fuzzy keys
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, path=None, fuzzy=False, clock=time.time, today=date.today):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.fuzzy = fuzzy
+        self._clock = clock
+        self._today = today
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def key(self, system_prompt, prompt, model):
+        prompt = fuzzy_text(prompt, self._today()) if self.fuzzy else normalize_text(prompt)
+        material = json.dumps([model, normalize_text(system_prompt), prompt])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, expires_at, value):
+        # Caller holds self._lock
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, system_prompt, prompt, model):
+        """Returns the cached answer, or None."""
+        key = self.key(system_prompt, prompt, model)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.path:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is not None:
+                with self._lock:
+                    self._remember(key, row[1], row[0])
+                    self._stats["disk_hits"] += 1
+                return row[0]
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, system_prompt, prompt, model, value):
+        key = self.key(system_prompt, prompt, model)
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._stats["stores"] += 1
+        if self.path:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at),
+                )
+
+    def purge(self):
+        """Deletes expired entries from both tiers."""
+        now = self._clock()
+        with self._lock:
+            for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[key]
+        if self.path:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
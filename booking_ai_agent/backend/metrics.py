@@ -0,0 +1,277 @@
+import functools
+import math
+import threading
+from bisect import bisect_left
+from time import perf_counter_ns
+
+# Seconds; covers cache hits (~µs) through slow Google/LLM round-trips
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# -----------------------------
+# Metric types
+# -----------------------------
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)  # First bucket with le >= value
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("_child", "_started")
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._started = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._child.observe((perf_counter_ns() - self._started) / 1e9)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """The child for one combination of label values (bind it once on hot paths)."""
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._samples():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class Counter(_Metric):
+    """
+    Monotonic count, e.g. Google API calls or retries.
+
+    Args:
+        name (str): Metric name, ending in _total
+        documentation (str): HELP text
+        labelnames (tuple): Label names; pass values positionally to labels()
+    """
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values (latencies in seconds) over fixed buckets.
+
+    Args:
+        name (str): Metric name, ending in _seconds for latencies
+        documentation (str): HELP text
+        labelnames (tuple): Label names; pass values positionally to labels()
+        buckets (tuple): Sorted upper bounds; +Inf is implied
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _render_child(self, values, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, values, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+class Registry:
+    """
+    Metrics of this process plus stats callbacks, rendered in the Prometheus
+    text exposition format (version 0.0.4).
+
+    Each gunicorn worker keeps its own registry, so a scrape reports the
+    worker that answered it; Prometheus sums the series per instance.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._stats = []  # [(prefix, callable returning a dict of numbers)]
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def register_stats(self, prefix, stats):
+        """Exposes every numeric value of stats() as a gauge named {prefix}_{key}."""
+        with self._lock:
+            self._stats.append((prefix, stats))
+
+    def render(self):
+        with self._lock:
+            metrics, stats = list(self._metrics), list(self._stats)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for prefix, collect in stats:
+            try:
+                values = collect()
+            except Exception:
+                continue  # A broken stats source must not take /metrics down
+            for key, value in sorted(values.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {prefix}_{key} gauge")
+                lines.append(f"{prefix}_{key} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render():
+    return REGISTRY.render()
+
+
+# -----------------------------
+# Booking-path metrics
+# -----------------------------
+STAGE_SECONDS = Histogram(
+    "booking_stage_seconds", "Time spent in each stage of the booking path.", ("stage",))
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Flask request latency by endpoint.", ("endpoint", "method", "status"))
+EXTERNAL_CALLS = Counter(
+    "external_api_calls_total", "Requests sent to Google and Groq APIs.", ("service", "method"))
+EXTERNAL_ERRORS = Counter(
+    "external_api_errors_total", "Failed external API requests by status (or exception name).",
+    ("service", "status"))
+EXTERNAL_RETRIES = Counter(
+    "external_api_retries_total", "External API requests retried after 429/5xx or connection errors.",
+    ("service",))
+
+
+def timed(stage, histogram=STAGE_SECONDS):
+    """
+    Decorator recording the wall time of every call (including failed ones)
+    in `histogram` under stage=`stage`. Costs about 1 µs per call.
+    """
+    child = histogram.labels(stage)
+
+    def decorate(fn):
+        observe = child.observe
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe((perf_counter_ns() - started) / 1e9)
+        return wrapper
+    return decorate
+
+
+def stage(name):
+    """Context manager form of timed(), for blocks inside a function."""
+    return STAGE_SECONDS.labels(name).time()
+
+
+def record_error(service, error):
+    """Counts a failed external call, labelled by HTTP status when there is one."""
+    status = getattr(getattr(error, "resp", None), "status", None)       # googleapiclient HttpError
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)  # requests / httpx
+    EXTERNAL_ERRORS.labels(service, status if status is not None else type(error).__name__).inc()
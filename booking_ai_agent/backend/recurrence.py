@@ -0,0 +1,358 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8
+    from backports.zoneinfo import ZoneInfo
+
+from backend.calendar_sync import event_interval
+from backend.reservations import SlotConflict
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+
+
+class UnsupportedRecurrence(ValueError):
+    """Raised for RRULE parts this engine does not expand (BYSETPOS, BYMONTHDAY, RDATE, ...)."""
+
+
+class RecurrenceConflict(SlotConflict):
+    """Raised when occurrences of a recurring booking overlap busy time."""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        dates = ", ".join(start.date().isoformat() for start, _ in conflicts)
+        super().__init__(f"{len(conflicts)} occurrence(s) conflict with existing bookings: {dates}")
+
+
+# -----------------------------
+# Rule parsing
+# -----------------------------
+def _parse_until(value, tz):
+    if "T" not in value:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    moment = datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+    return moment.replace(tzinfo=timezone.utc if value.endswith("Z") else tz)
+
+
+class RecurrenceRule:
+    """
+    The subset of RFC 5545 RRULEs that bookings use: FREQ (DAILY, WEEKLY,
+    MONTHLY, YEARLY), INTERVAL, COUNT, UNTIL and plain weekly BYDAY.
+
+    Args:
+        freq (str): One of FREQUENCIES
+        interval (int): Step between periods
+        count (int, optional): Number of occurrences
+        until (date or datetime, optional): Last possible occurrence (inclusive)
+        byday (tuple, optional): Weekday numbers (Monday = 0) for weekly rules
+    """
+
+    __slots__ = ("freq", "interval", "count", "until", "byday")
+
+    def __init__(self, freq, interval=1, count=None, until=None, byday=None):
+        if freq not in FREQUENCIES:
+            raise UnsupportedRecurrence(f"Unsupported FREQ {freq!r}")
+        if byday and freq != "WEEKLY":
+            raise UnsupportedRecurrence("BYDAY is only supported on weekly rules")
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.byday = tuple(sorted(byday)) if byday else None
+
+    @classmethod
+    def parse(cls, text, tz=None):
+        """Parses "RRULE:FREQ=WEEKLY;COUNT=10"; `tz` applies to a floating UNTIL."""
+        if text.startswith("RRULE:"):
+            text = text[len("RRULE:"):]
+        parts = dict(part.split("=", 1) for part in text.split(";") if part)
+        options = {}
+        for name, value in parts.items():
+            if name == "FREQ":
+                continue
+            if name == "INTERVAL":
+                options["interval"] = int(value)
+            elif name == "COUNT":
+                options["count"] = int(value)
+            elif name == "UNTIL":
+                options["until"] = _parse_until(value, tz)
+            elif name == "BYDAY":
+                if any(day not in WEEKDAYS for day in value.split(",")):
+                    raise UnsupportedRecurrence(f"Unsupported BYDAY {value!r}")  # e.g. 2MO, -1FR
+                options["byday"] = [WEEKDAYS.index(day) for day in value.split(",")]
+            elif name != "WKST":
+                raise UnsupportedRecurrence(f"Unsupported RRULE part {name}")
+        return cls(parts.get("FREQ"), **options)
+
+    def __str__(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if isinstance(self.until, datetime):
+            parts.append("UNTIL=" + self.until.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ"))
+        elif self.until is not None:
+            parts.append("UNTIL=" + self.until.strftime("%Y%m%d"))
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.byday))
+        return "RRULE:" + ";".join(parts)
+
+    def _candidates(self, dtstart):
+        # Wall-clock stepping: aware datetime + timedelta keeps the local time across DST changes
+        if self.freq == "DAILY":
+            step = 0
+            while True:
+                yield dtstart + timedelta(days=step)
+                step += self.interval
+        elif self.freq == "WEEKLY" and self.byday:
+            monday = dtstart - timedelta(days=dtstart.weekday())
+            week = 0
+            while True:
+                for weekday in self.byday:
+                    candidate = monday + timedelta(days=7 * week + weekday)
+                    if candidate >= dtstart:
+                        yield candidate
+                week += self.interval
+        elif self.freq == "WEEKLY":
+            step = 0
+            while True:
+                yield dtstart + timedelta(days=7 * step)
+                step += self.interval
+        else:
+            months = 12 * self.interval if self.freq == "YEARLY" else self.interval
+            step = 0
+            while True:
+                month_index = dtstart.month - 1 + step
+                try:
+                    yield dtstart.replace(year=dtstart.year + month_index // 12, month=month_index % 12 + 1)
+                except ValueError:
+                    pass  # No such day in that month (the 31st, Feb 29): RFC 5545 skips it
+                step += months
+
+    def starts(self, dtstart):
+        """Lazily yields occurrence starts, honoring COUNT and UNTIL."""
+        until = self.until
+        if isinstance(until, datetime) and dtstart.tzinfo is None:
+            until = until.astimezone().replace(tzinfo=None)  # Floating (all-day) series run on local time
+        emitted = 0
+        for candidate in self._candidates(dtstart):
+            if until is not None:
+                if isinstance(until, datetime) and candidate > until:
+                    return
+                if not isinstance(until, datetime) and candidate.date() > until:
+                    return
+            yield candidate
+            emitted += 1
+            if self.count is not None and emitted >= self.count:
+                return
+
+
+def _parse_exdates(line, tz):
+    # EXDATE;TZID=Asia/Kolkata:20300107T100000,20300114T100000 | EXDATE:20300107T043000Z | EXDATE;VALUE=DATE:20300107
+    head, _, values = line.partition(":")
+    params = dict(param.split("=", 1) for param in head.split(";")[1:])
+    zone = ZoneInfo(params["TZID"]) if "TZID" in params else tz
+    return {_parse_until(value, zone) for value in values.split(",")}
+
+
+def _event_start(event):
+    start = event["start"]
+    if "dateTime" in start:
+        moment = datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00"))
+        if start.get("timeZone"):
+            moment = moment.astimezone(ZoneInfo(start["timeZone"]))
+        return moment
+    # All-day series repeat local midnights; converted like event_interval does
+    return datetime.combine(date.fromisoformat(start["date"]), datetime.min.time())
+
+
+def _to_utc(moment):
+    return moment.astimezone(timezone.utc)
+
+
+# -----------------------------
+# Expanded series
+# -----------------------------
+class _Series:
+    """Occurrences of one recurring event, expanded on demand and kept for reuse."""
+
+    __slots__ = ("_starts", "_duration", "_excluded", "occurrences", "exhausted", "_lock")
+
+    def __init__(self, event):
+        dtstart = _event_start(event)
+        first = event_interval(dict(event, status="confirmed", transparency="opaque"))
+        self._duration = first[1] - first[0]
+        tz = dtstart.tzinfo
+        self._excluded = set()
+        rules = []
+        for line in event.get("recurrence", []):
+            if line.startswith("RRULE"):
+                rules.append(RecurrenceRule.parse(line, tz))
+            elif line.startswith("EXDATE"):
+                self._excluded |= _parse_exdates(line, tz)
+            else:
+                raise UnsupportedRecurrence(f"Unsupported recurrence line {line.split(':')[0]}")
+        if len(rules) != 1:
+            raise UnsupportedRecurrence("Expected exactly one RRULE")
+        self._starts = rules[0].starts(dtstart)
+        self.occurrences = []  # [(start_utc, end_utc)], sorted
+        self.exhausted = False
+        self._lock = threading.Lock()
+
+    def _excludes(self, start):
+        return start in self._excluded or start.date() in self._excluded
+
+    def between(self, time_min, time_max):
+        """Occurrences overlapping [time_min, time_max), expanding no further than needed."""
+        with self._lock:
+            while not self.exhausted and (not self.occurrences or self.occurrences[-1][0] < time_max):
+                start = next(self._starts, None)
+                if start is None:
+                    self.exhausted = True
+                elif not self._excludes(start):
+                    utc_start = _to_utc(start)
+                    self.occurrences.append((utc_start, utc_start + self._duration))
+            occurrences = self.occurrences
+            i = bisect_left(occurrences, (time_min - self._duration,))
+            j = bisect_left(occurrences, (time_max,))
+            return [(start, end) for start, end in occurrences[i:j] if end > time_min]
+
+
+class SeriesCache:
+    """
+    LRU of expanded recurring series, so busy time for weeks or months ahead
+    comes from local expansion of the master events instead of asking
+    Google to expand every instance (singleEvents=True) on each list call.
+
+    Entries are keyed by event id plus its etag/updated stamp, so an edited
+    series is expanded afresh.
+
+    Args:
+        max_series (int): Series kept before the least recently used is dropped
+    """
+
+    def __init__(self, max_series=512):
+        self.max_series = max_series
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def series(self, event):
+        key = (event.get("id"), event.get("etag") or event.get("updated"), tuple(event.get("recurrence", ())),
+               event["start"].get("dateTime") or event["start"].get("date"),
+               event["end"].get("dateTime") or event["end"].get("date"))
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+                self._stats["hits"] += 1
+                return series
+            self._stats["misses"] += 1
+        series = _Series(event)
+        with self._lock:
+            series = self._series.setdefault(key, series)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+                self._stats["evictions"] += 1
+        return series
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["series"] = len(self._series)
+            return stats
+
+
+def busy_from_events(events, time_min, time_max, cache):
+    """
+    Busy intervals in [time_min, time_max) from an events.list made with
+    singleEvents=False: plain events as-is, recurring masters expanded
+    locally, moved or cancelled instances applied as exceptions.
+
+    Args:
+        events (list): Event resources
+        time_min (datetime): Window start (aware)
+        time_max (datetime): Window end (aware)
+        cache (SeriesCache): Expanded series
+
+    Returns:
+        list: Sorted (start, end) tuples in UTC
+
+    Raises:
+        UnsupportedRecurrence: If a series needs Google's expansion (singleEvents=True)
+    """
+    overridden = {}  # master id -> original starts replaced by exceptions
+    for event in events:
+        if event.get("recurringEventId") and event.get("originalStartTime"):
+            original = event["originalStartTime"]
+            moment = (_to_utc(datetime.fromisoformat(original["dateTime"].replace("Z", "+00:00")))
+                      if "dateTime" in original else
+                      _to_utc(datetime.combine(date.fromisoformat(original["date"]), datetime.min.time())))
+            overridden.setdefault(event["recurringEventId"], set()).add(moment)
+
+    busy = []
+    for event in events:
+        if not event.get("recurrence"):
+            interval = event_interval(event)
+            if interval is not None and interval[0] < time_max and interval[1] > time_min:
+                busy.append(interval)
+            continue
+        if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+            continue
+        occurrences = cache.series(event).between(time_min, time_max)
+        skip = overridden.get(event.get("id"), ())
+        busy.extend(occurrence for occurrence in occurrences if occurrence[0] not in skip)
+    return sorted(busy)
+
+
+def instance_event(master, start, end):
+    """One occurrence of `master` shaped like Google's singleEvents instances."""
+    start_utc = _to_utc(start)
+    return dict(
+        {key: value for key, value in master.items() if key != "recurrence"},
+        id=f"{master['id']}_{start_utc.strftime('%Y%m%dT%H%M%SZ')}",
+        recurringEventId=master["id"],
+        originalStartTime={"dateTime": start_utc.isoformat()},
+        start={"dateTime": start_utc.isoformat()},
+        end={"dateTime": _to_utc(end).isoformat()},
+    )
+
+
+# -----------------------------
+# Conflict check before insert
+# -----------------------------
+def expand(rule, start, end, horizon=None):
+    """
+    Occurrences (start, end) of a new series starting at [start, end).
+
+    Args:
+        rule (str or RecurrenceRule): e.g. "RRULE:FREQ=WEEKLY;COUNT=10"
+        horizon (datetime, optional): Stop here for open-ended rules
+    """
+    if isinstance(rule, str):
+        rule = RecurrenceRule.parse(rule, start.tzinfo)
+    duration = end - start
+    for occurrence in rule.starts(start):
+        if horizon is not None and occurrence >= horizon:
+            return
+        yield occurrence, occurrence + duration
+
+
+def find_conflicts(occurrences, busy_index, buffer=timedelta(0)):
+    """
+    Occurrences overlapping busy time, checked in one pass over an IntervalTree.
+
+    Args:
+        occurrences (iterable): (start, end) tuples
+        busy_index (IntervalTree): Busy intervals
+        buffer (timedelta): Free time required around busy intervals
+    """
+    return [(start, end) for start, end in occurrences if busy_index.overlaps(start - buffer, end + buffer)]
@@ -0,0 +1,161 @@
+import heapq
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from backend.interval_tree import IntervalTree
+
+
+class SlotConflict(Exception):
+    """Raised when a slot overlaps an active hold or a committed booking."""
+
+
+class _Reservation:
+    __slots__ = ("id", "calendar_id", "start", "end", "owner", "expires_at", "committed")
+
+    def __init__(self, reservation_id, calendar_id, start, end, owner, expires_at):
+        self.id = reservation_id
+        self.calendar_id = calendar_id
+        self.start = start
+        self.end = end
+        self.owner = owner
+        self.expires_at = expires_at
+        self.committed = False
+
+
+class ReservationTable:
+    """
+    Atomic local interval locks that stop concurrent requests from booking
+    the same slot.
+
+    A hold reserves [start, end) on a calendar for `hold_ttl` seconds while
+    the booking is confirmed and the Calendar insert runs. Committing turns
+    it into a permanent lock, kept until the slot is over, so the slot stays
+    blocked even before caches or sync catch up. Conflicts are detected with
+    a per-calendar interval tree lookup, without any remote call. Lapsed
+    holds and past bookings are swept from expiry heaps on every call, so
+    the table only holds what can still conflict.
+
+    Args:
+        hold_ttl (float): Seconds an uncommitted hold lasts
+        clock (callable, optional): Monotonic time source, overridable in tests
+    """
+
+    def __init__(self, hold_ttl=300, clock=time.monotonic):
+        self.hold_ttl = hold_ttl
+        self._clock = clock
+        self._by_id = {}          # reservation_id -> _Reservation
+        self._by_calendar = {}    # calendar_id -> IntervalTree of (start, end, reservation_id)
+        self._hold_expiry = []    # heap of (expires_at, reservation_id); renewals leave stale entries
+        self._booking_ends = []   # heap of (end, reservation_id) for committed reservations
+        self._lock = threading.Lock()
+        self._stats = {"holds": 0, "conflicts": 0, "commits": 0, "releases": 0, "expired": 0}
+
+    def _is_live(self, reservation, now, utc_now):
+        if reservation.committed:
+            return reservation.end > utc_now
+        return reservation.expires_at > now
+
+    def _drop(self, reservation):
+        del self._by_id[reservation.id]
+        self._by_calendar[reservation.calendar_id].remove(reservation.start, reservation.end, reservation.id)
+
+    def _sweep(self, now, utc_now):
+        while self._hold_expiry and self._hold_expiry[0][0] <= now:
+            _, reservation_id = heapq.heappop(self._hold_expiry)
+            reservation = self._by_id.get(reservation_id)
+            if reservation is None or reservation.committed:
+                continue
+            if reservation.expires_at > now:  # Renewed since this entry was pushed
+                heapq.heappush(self._hold_expiry, (reservation.expires_at, reservation_id))
+                continue
+            self._drop(reservation)
+            self._stats["expired"] += 1
+        while self._booking_ends and self._booking_ends[0][0] <= utc_now:
+            _, reservation_id = heapq.heappop(self._booking_ends)
+            reservation = self._by_id.get(reservation_id)
+            if reservation is not None:
+                self._drop(reservation)
+                self._stats["expired"] += 1
+
+    def _conflicts(self, calendar_id, start, end, now, utc_now):
+        intervals = self._by_calendar.get(calendar_id)
+        if not intervals:
+            return []
+        overlapping = [self._by_id[reservation_id] for _, _, reservation_id in intervals.overlapping(start, end)]
+
+        live = []
+        for reservation in overlapping:
+            if self._is_live(reservation, now, utc_now):
+                live.append(reservation)
+            else:
+                self._drop(reservation)
+                self._stats["expired"] += 1
+        return live
+
+    def hold(self, calendar_id, start, end, owner=None, ttl=None, reservation_id=None):
+        """
+        Reserves [start, end) and returns the reservation id.
+
+        Passing the id of an existing hold on the same interval renews it.
+
+        Raises:
+            SlotConflict: If the interval overlaps another live reservation
+        """
+        now = self._clock()
+        utc_now = datetime.now(timezone.utc)
+        expires_at = now + (self.hold_ttl if ttl is None else ttl)
+        with self._lock:
+            self._sweep(now, utc_now)
+            existing = self._by_id.get(reservation_id) if reservation_id else None
+            if existing is not None and (existing.calendar_id, existing.start, existing.end) == (calendar_id, start, end):
+                if self._is_live(existing, now, utc_now):
+                    if not existing.committed:
+                        existing.expires_at = expires_at
+                    return existing.id
+                self._drop(existing)
+
+            if self._conflicts(calendar_id, start, end, now, utc_now):
+                self._stats["conflicts"] += 1
+                raise SlotConflict(f"{start.isoformat()} - {end.isoformat()} is already reserved")
+
+            reservation = _Reservation(uuid.uuid4().hex, calendar_id, start, end, owner, expires_at)
+            self._by_id[reservation.id] = reservation
+            self._by_calendar.setdefault(calendar_id, IntervalTree()).insert(start, end, reservation.id)
+            heapq.heappush(self._hold_expiry, (expires_at, reservation.id))
+            self._stats["holds"] += 1
+            return reservation.id
+
+    def commit(self, reservation_id):
+        """Makes a hold permanent. Returns False if it had already expired."""
+        with self._lock:
+            reservation = self._by_id.get(reservation_id)
+            if reservation is None or not self._is_live(reservation, self._clock(), datetime.now(timezone.utc)):
+                return False
+            reservation.committed = True
+            heapq.heappush(self._booking_ends, (reservation.end, reservation.id))
+            self._stats["commits"] += 1
+            return True
+
+    def release(self, reservation_id):
+        with self._lock:
+            reservation = self._by_id.get(reservation_id)
+            if reservation is None:
+                return False
+            self._drop(reservation)
+            self._stats["releases"] += 1
+            return True
+
+    def is_free(self, calendar_id, start, end):
+        now, utc_now = self._clock(), datetime.now(timezone.utc)
+        with self._lock:
+            self._sweep(now, utc_now)
+            return not self._conflicts(calendar_id, start, end, now, utc_now)
+
+    def stats(self):
+        with self._lock:
+            self._sweep(self._clock(), datetime.now(timezone.utc))
+            stats = dict(self._stats)
+            stats["active"] = len(self._by_id)
+            return stats
@@ -0,0 +1,115 @@
+import threading
+from datetime import datetime, timedelta
+
+# The google-auth / googleapiclient imports below are deferred to first use:
+# together they take ~100ms, which every process start (and every gunicorn
+# worker boot) would otherwise pay before it can answer a health check.
+
+# -----------------------------
+# Configuration
+# -----------------------------
+REFRESH_MARGIN = timedelta(minutes=5)  # Refresh tokens this long before they expire
+
+
+class GoogleServiceManager:
+    """
+    Long-lived, thread-safe holder for an authorized Google API client.
+
+    Credentials are loaded once per process and refreshed proactively shortly
+    before they expire. Each worker thread gets its own service object because
+    the underlying httplib2 transport is not thread-safe.
+
+    Args:
+        api (str): API name, e.g. "calendar"
+        version (str): API version, e.g. "v3"
+        load_credentials (callable): Returns a credentials object
+        save_credentials (callable, optional): Persists credentials after a refresh
+        reauthorize (callable, optional): Returns fresh credentials when a refresh fails
+        build_service (callable, optional): Replaces googleapiclient's build (used by fakes)
+    """
+
+    def __init__(self, api, version, load_credentials, save_credentials=None, reauthorize=None,
+                 build_service=None):
+        self.api = api
+        self.version = version
+        self._load_credentials = load_credentials
+        self._save_credentials = save_credentials
+        self._reauthorize = reauthorize or load_credentials
+        self._build_service = build_service or self._build_static
+        self._creds = None
+        self._generation = 0
+        self._creds_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0, "credential_loads": 0}
+
+    def _build_static(self, creds):
+        # The static discovery document ships with google-api-python-client,
+        # so no HTTP round-trip or disk cache lookup happens on build.
+        from googleapiclient.discovery import build
+
+        return build(self.api, self.version, credentials=creds, static_discovery=True, cache_discovery=False)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    @staticmethod
+    def _needs_refresh(creds):
+        if not creds.valid:
+            return True
+        expiry = getattr(creds, "expiry", None)
+        return expiry is not None and expiry - datetime.utcnow() < REFRESH_MARGIN
+
+    def _refresh(self, creds):
+        from google.auth.transport.requests import Request
+
+        creds.refresh(Request())
+        self._count("refreshes")
+        if self._save_credentials:
+            self._save_credentials(creds)
+
+    def get_credentials(self):
+        creds = self._creds
+        if creds is not None and not self._needs_refresh(creds):
+            return creds
+
+        with self._creds_lock:
+            if self._creds is None:
+                self._creds = self._load_credentials()
+                self._generation += 1
+                self._count("credential_loads")
+
+            if self._needs_refresh(self._creds):
+                from google.auth.exceptions import RefreshError
+
+                try:
+                    self._refresh(self._creds)
+                except RefreshError:
+                    # Refresh token revoked or expired: authorize from scratch
+                    self._creds = self._reauthorize()
+                    self._generation += 1
+                    self._count("credential_loads")
+            return self._creds
+
+    def get_service(self):
+        creds = self.get_credentials()
+        local = self._local
+        if getattr(local, "service", None) is not None and local.generation == self._generation:
+            self._count("hits")
+            return local.service
+
+        self._count("misses")
+        local.service = self._build_service(creds)
+        local.generation = self._generation
+        return local.service
+
+    def reset(self):
+        """Drops cached credentials so the next call reloads them."""
+        with self._creds_lock:
+            self._creds = None
+            self._generation += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
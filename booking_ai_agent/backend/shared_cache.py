@@ -0,0 +1,335 @@
+import json
+import sys
+import threading
+import time
+import uuid
+from array import array
+from datetime import date, datetime, timezone
+
+from backend.fake_redis import FakeRedis
+
+DEFAULT_PREFIX = "booking:busy:"
+DEFAULT_CHANNEL = "booking:busy:invalidate"
+
+
+# -----------------------------
+# Packed interval encoding
+# -----------------------------
+def pack_intervals(intervals):
+    """
+    Encodes [(start, end), ...] as little-endian int64 Unix seconds, 16 bytes
+    per interval. An empty day packs to b"", which Redis still stores, so a
+    free day is a cache hit rather than a miss.
+    """
+    values = array("q")
+    for start, end in intervals:
+        values.append(int(start.timestamp()))
+        values.append(int(end.timestamp()))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack_intervals(data):
+    """Inverse of pack_intervals; returns UTC-aware datetimes."""
+    values = array("q")
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    stamps = [datetime.fromtimestamp(value, timezone.utc) for value in values]
+    return list(zip(stamps[::2], stamps[1::2]))
+
+
+# -----------------------------
+# Request coalescing
+# -----------------------------
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the
+    function, everyone arriving while it runs waits and gets its result (or
+    its exception). Nothing is remembered once the call returns.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["calls"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return list(call.result) if isinstance(call.result, list) else call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
+
+
+# -----------------------------
+# Shared busy-interval tier
+# -----------------------------
+# Check-and-set in one round-trip: a store racing an invalidate() either lands
+# before the INCR (and is deleted by it) or sees the new generation and skips.
+_PUT_IF_GENERATION = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+return 1
+"""
+
+# Releases a fetch lock only if it is still ours, not one taken after ours expired
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@FakeRedis.script(_PUT_IF_GENERATION)
+def _fake_put_if_generation(redis, keys, args):
+    if int(redis.get(keys[1]) or 0) != int(args[0]):
+        return 0
+    redis.set(keys[0], args[1], px=int(args[2]))
+    return 1
+
+
+@FakeRedis.script(_RELEASE_LOCK)
+def _fake_release_lock(redis, keys, args):
+    return redis.delete(keys[0]) if redis.get(keys[0]) == args[0] else 0
+
+
+def connect(url):
+    """
+    Client for SHARED_CACHE_URL: redis://host:port/db (or rediss://) through
+    redis-py, or fake:// for an in-process FakeRedis.
+    """
+    if url.startswith("fake://"):
+        return FakeRedis()
+    try:
+        import redis
+    except ImportError as err:
+        raise RuntimeError("SHARED_CACHE_URL needs the redis package: pip install redis") from err
+    return redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0, health_check_interval=30)
+
+
+class SharedBusyCache:
+    """
+    Busy intervals per (calendar_id, day) kept in Redis, shared by every
+    worker and container, in front of each process's BusyIntervalCache.
+
+    Values are pack_intervals() bytes with a TTL. Each key has a generation
+    counter that invalidate() bumps before publishing the change on
+    `channel`, so a fetch that started before a booking does not store its
+    stale result (put() compares and sets in one Lua script), and other
+    processes drop their local copies (see listen).
+    get_or_fetch() takes a short NX lock per key so that only one process
+    calls Google for a cold day while the others poll for its result.
+
+    Redis errors never fail a request: they are counted and treated as a
+    miss, leaving each process on its local cache.
+
+    Args:
+        client: redis.Redis or FakeRedis
+        ttl (float): Seconds a day stays in the shared tier
+        prefix (str): Key prefix
+        channel (str): Pub/sub channel for invalidations
+        lock_timeout (float): Longest a process waits on another's fetch
+        poll_interval (float): Seconds between polls while waiting
+    """
+
+    def __init__(self, client, ttl=60, prefix=DEFAULT_PREFIX, channel=DEFAULT_CHANNEL, lock_timeout=10.0,
+                 poll_interval=0.02):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.channel = channel
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.origin = uuid.uuid4().hex  # Tells our own broadcasts apart
+        self._stats = {"hits": 0, "misses": 0, "fetches": 0, "waited": 0, "stale_skips": 0,
+                       "invalidations_sent": 0, "invalidations_received": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listener = None
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _call(self, default, method, *args, **kwargs):
+        try:
+            return getattr(self.client, method)(*args, **kwargs)
+        except Exception:
+            self._count("errors")
+            return default
+
+    def _key(self, calendar_id, day):
+        return f"{self.prefix}{calendar_id}|{day.isoformat()}"
+
+    def generation(self, calendar_id, day):
+        """Times the day has been invalidated since Redis last lost the counter."""
+        value = self._call(None, "get", self._key(calendar_id, day) + ":gen")
+        return int(value) if value is not None else 0
+
+    def get(self, calendar_id, day):
+        data = self._call(None, "get", self._key(calendar_id, day))
+        self._count("misses" if data is None else "hits")
+        return None if data is None else unpack_intervals(data)
+
+    def get_many(self, calendar_id, days):
+        """Returns {day: intervals} for the days present in the shared tier."""
+        if not days:
+            return {}
+        values = self._call([None] * len(days), "mget", [self._key(calendar_id, day) for day in days])
+        found = {day: unpack_intervals(data) for day, data in zip(days, values) if data is not None}
+        self._count("hits", len(found))
+        self._count("misses", len(days) - len(found))
+        return found
+
+    def put(self, calendar_id, day, intervals, generation=None):
+        """Stores a day unless it was invalidated since `generation` was read."""
+        key = self._key(calendar_id, day)
+        data = pack_intervals(sorted(intervals))
+        if generation is None:
+            return bool(self._call(False, "set", key, data, px=int(self.ttl * 1000)))
+        stored = self._call(None, "eval", _PUT_IF_GENERATION, 2, key, key + ":gen", generation, data,
+                            int(self.ttl * 1000))
+        if stored == 0:
+            self._count("stale_skips")
+        return bool(stored)
+
+    def get_or_fetch(self, calendar_id, day, fetch):
+        """
+        The day's intervals from Redis, or from fetch() run by exactly one
+        process at a time per key; the others wait up to lock_timeout for its
+        result and fetch themselves only if it never arrives.
+        """
+        intervals = self.get(calendar_id, day)
+        if intervals is not None:
+            return intervals
+
+        key = self._key(calendar_id, day)
+        lock_key = key + ":lock"
+        generation = self.generation(calendar_id, day)
+        token = uuid.uuid4().hex
+        if self._call(True, "set", lock_key, token, px=int(self.lock_timeout * 1000), nx=True):
+            try:
+                self._count("fetches")
+                intervals = fetch()
+                self.put(calendar_id, day, intervals, generation)
+                return intervals
+            finally:
+                self._call(0, "eval", _RELEASE_LOCK, 1, lock_key, token)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            data = self._call(None, "get", key)
+            if data is not None:
+                self._count("waited")
+                return unpack_intervals(data)
+            if not self._call(0, "exists", lock_key):
+                break  # The holder failed or stored nothing; fetch ourselves
+        self._count("fetches")
+        intervals = fetch()
+        self.put(calendar_id, day, intervals, generation)
+        return intervals
+
+    def invalidate(self, calendar_id, day):
+        """Drops a day everywhere: bumps its generation, deletes it, tells the other processes."""
+        key = self._key(calendar_id, day)
+        self._call(None, "incr", key + ":gen")
+        self._call(0, "delete", key)
+        message = json.dumps([self.origin, calendar_id, day.isoformat()])
+        self._call(0, "publish", self.channel, message)
+        self._count("invalidations_sent")
+
+    # -----------------------------
+    # Invalidation listener
+    # -----------------------------
+    def listen(self, on_invalidate, on_reconnect=None):
+        """
+        Calls on_invalidate(calendar_id, day) on a daemon thread for every day
+        another process invalidates. Messages sent while the subscription was
+        down are lost, so on_reconnect() is called after it is re-established
+        (e.g. to clear the local cache).
+        """
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._listen, args=(on_invalidate, on_reconnect),
+                                              name="shared-cache-listener", daemon=True)
+            self._listener.start()
+        return self._listener
+
+    def _listen(self, on_invalidate, on_reconnect):
+        reconnecting = False
+        while not self._stop.is_set():
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if reconnecting and on_reconnect is not None:
+                    on_reconnect()
+                while not self._stop.is_set():
+                    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        self._handle(message["data"], on_invalidate)
+                pubsub.close()
+            except Exception:
+                self._count("errors")
+                reconnecting = True
+                self._stop.wait(1.0)
+
+    def _handle(self, data, on_invalidate):
+        try:
+            origin, calendar_id, day = json.loads(data)
+            day = date.fromisoformat(day)
+        except (TypeError, ValueError):
+            return
+        if origin != self.origin:
+            self._count("invalidations_received")
+            on_invalidate(calendar_id, day)
+
+    def close(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=2.0)
+            self._listener = None
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,125 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+from datetime import datetime, timezone
+
+MAX_TOKEN_LENGTH = 512  # Reject oversized input before doing any work
+SIGNATURE_BYTES = 16    # Truncated HMAC-SHA256; 128 bits is plenty against forgery
+
+
+class InvalidSlotToken(ValueError):
+    """Raised for a slot token that is malformed, forged or expired."""
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def availability_version(busy):
+    """
+    Short digest of a day's busy intervals. A slot offered under one version
+    is still free if the day's busy list hashes to the same version later.
+    """
+    digest = hashlib.blake2b(digest_size=6)
+    for start, end in busy:
+        digest.update(b"%d-%d;" % (start.timestamp(), end.timestamp()))
+    return _b64encode(digest.digest())
+
+
+class SlotToken:
+    """
+    A verified slot offer.
+
+    Args:
+        calendar_id (str): Calendar the slot was computed for
+        start (datetime): Slot start (UTC)
+        end (datetime): Slot end (UTC)
+        version (str): availability_version() of the day when it was offered
+        expires_at (float): Unix time after which the offer is void
+    """
+
+    __slots__ = ("calendar_id", "start", "end", "version", "expires_at")
+
+    def __init__(self, calendar_id, start, end, version, expires_at):
+        self.calendar_id = calendar_id
+        self.start = start
+        self.end = end
+        self.version = version
+        self.expires_at = expires_at
+
+
+class SlotTokenSigner:
+    """
+    Issues and verifies opaque, stateless slot tokens.
+
+    A token is base64url("start|end|version|expires|calendar_id") plus a
+    truncated HMAC-SHA256 of it, so any worker sharing the secret can trust
+    the slot it names without re-fetching availability or keeping state.
+    Signatures are compared in constant time.
+
+    Args:
+        secret (bytes or str): HMAC key, shared by every worker
+        ttl (float): Seconds a token stays valid
+        clock (callable, optional): Unix time source, overridable in tests
+    """
+
+    def __init__(self, secret, ttl=900, clock=time.time):
+        self._key = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self._clock = clock
+        # Non-secret identifier of the key; changes when the secret is rotated
+        self.key_id = _b64encode(hashlib.blake2b(self._key, digest_size=6).digest())
+
+    def _sign(self, body):
+        return hmac.new(self._key, body.encode("ascii"), hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+    def aligned_expiry(self):
+        """
+        Expiry shared by every token issued in the current half-TTL window.
+        Signing is deterministic, so with it equal offers sign to equal tokens
+        in every worker; such a token stays valid for between ttl/2 and ttl.
+        """
+        half = self.ttl / 2
+        return (self._clock() // half + 2) * half
+
+    def issue(self, calendar_id, start, end, version="", expires_at=None):
+        if expires_at is None:
+            expires_at = self._clock() + self.ttl
+        payload = "%d|%d|%s|%d|%s" % (start.timestamp(), end.timestamp(), version, expires_at, calendar_id)
+        body = _b64encode(payload.encode("utf-8"))
+        return body + "." + _b64encode(self._sign(body))
+
+    def verify(self, token):
+        """
+        Returns the SlotToken a token names.
+
+        Raises:
+            InvalidSlotToken: If the token is malformed, its signature does not
+                match or it has expired
+        """
+        if not isinstance(token, str) or len(token) > MAX_TOKEN_LENGTH or token.count(".") != 1:
+            raise InvalidSlotToken("malformed slot token")
+        body, signature = token.split(".")
+        try:
+            expected = self._sign(body)
+            valid = hmac.compare_digest(_b64decode(signature), expected)
+        except (UnicodeEncodeError, binascii.Error, ValueError):
+            valid = False
+        if not valid:
+            raise InvalidSlotToken("bad slot token signature")
+
+        try:
+            start, end, version, expires_at, calendar_id = _b64decode(body).decode("utf-8").split("|", 4)
+            start, end, expires_at = int(start), int(end), int(expires_at)
+        except ValueError:
+            raise InvalidSlotToken("malformed slot token") from None
+        if expires_at < self._clock():
+            raise InvalidSlotToken("slot token expired")
+        return SlotToken(calendar_id, datetime.fromtimestamp(start, timezone.utc),
+                         datetime.fromtimestamp(end, timezone.utc), version, expires_at)
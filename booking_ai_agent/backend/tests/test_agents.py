@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import google_calendar
+from backend.agents import Agent, AgentRegistry, LEAST_LOADED, PRIORITY, load_agents
+from backend.async_calendar import AsyncCalendarClient
+from backend.booking_store import BookingStore
+from backend.fake_calendar import FakeCalendar
+from backend.fake_google_server import FakeGoogleServer
+from backend.reservations import ReservationTable, SlotConflict
+
+DAY = date(2030, 1, 9)  # A Wednesday
+
+
+def at(day, hour, minute=0):
+    return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).replace(hour=hour, minute=minute)
+
+
+def registry(count=3, **kwargs):
+    kwargs.setdefault("tz", timezone.utc)
+    return AgentRegistry([Agent(f"a{n}", priority=n) for n in range(count)], **kwargs)
+
+
+class TestAgentRegistry(unittest.TestCase):
+
+    def test_round_robin_skips_busy_agents(self):
+        """Round-robin rotates through agents and passes over busy ones"""
+        agents = registry()
+        agents.load("a1", DAY, [(at(DAY, 10), at(DAY, 11))])
+        picks = [agents.assign(at(DAY, 10), at(DAY, 10, 30)).agent_id for _ in range(4)]
+        self.assertEqual(picks, ["a0", "a2", "a0", "a2"])
+
+    def test_priority_and_least_loaded(self):
+        """Priority prefers high priority; least-loaded prefers the emptiest week"""
+        agents = registry()
+        self.assertEqual(agents.assign(at(DAY, 9), at(DAY, 10), strategy=PRIORITY).agent_id, "a2")
+
+        agents.load("a0", DAY - timedelta(days=1), [(at(DAY, 0) - timedelta(hours=3), at(DAY, 0) - timedelta(hours=1))])
+        agents.load("a2", DAY + timedelta(days=2), [(at(DAY, 13), at(DAY, 14))])
+        self.assertEqual(agents.assign(at(DAY, 9), at(DAY, 10), strategy=LEAST_LOADED).agent_id, "a1")
+        agents.mark_busy("a1", at(DAY, 9), at(DAY, 13))
+        self.assertEqual(agents.assign(at(DAY, 15), at(DAY, 16), strategy=LEAST_LOADED).agent_id, "a2")
+
+    def test_index_merges_and_respects_buffer(self):
+        """New bookings merge into the index and the buffer keeps a gap around them"""
+        agents = registry(1, buffer=timedelta(minutes=15))
+        agents.load("a0", DAY, [(at(DAY, 9), at(DAY, 10)), (at(DAY, 12), at(DAY, 13))])
+        agents.mark_busy("a0", at(DAY, 10, 30), at(DAY, 11, 30))
+        self.assertEqual(len(agents._days["a0"][DAY].starts), 1)  # All three now touch
+        self.assertFalse(agents.is_free("a0", at(DAY, 13), at(DAY, 13, 30)))
+        self.assertTrue(agents.is_free("a0", at(DAY, 13, 15), at(DAY, 13, 45)))
+        self.assertIsNone(agents.assign(at(DAY, 11), at(DAY, 11, 30)))
+
+    def test_stale_days_follow_ttl(self):
+        """Loaded days become stale after ttl; inactive agents are ignored"""
+        now = [0.0]
+        agents = AgentRegistry([Agent("a0"), Agent("a1", active=False)], ttl=60, clock=lambda: now[0])
+        self.assertEqual(agents.stale_days([DAY]), {"a0": [DAY]})
+        agents.load("a0", DAY, [])
+        self.assertEqual(agents.stale_days([DAY]), {})
+        now[0] = 61
+        self.assertEqual(agents.stale_days([DAY]), {"a0": [DAY]})
+
+    def test_assignment_among_hundreds_is_sub_millisecond(self):
+        """Picking from 500 mostly-busy agents takes well under a millisecond"""
+        agents = registry(500, strategy=LEAST_LOADED)
+        for n in range(500):
+            busy = [(at(DAY, hour), at(DAY, hour, 45)) for hour in range(9, 18)]
+            agents.load(f"a{n}", DAY, busy if n < 450 else busy[1:])
+        started = time.perf_counter()
+        for _ in range(100):
+            agent = agents.assign(at(DAY, 9), at(DAY, 9, 30))
+        self.assertGreaterEqual(int(agent.agent_id[1:]), 450)
+        self.assertLess((time.perf_counter() - started) / 100, 0.001)
+
+    def test_load_agents(self):
+        """Agents are read from a JSON file"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            f.write('[{"id": "ana", "calendar_id": "ana@example.com", "priority": 2}, {"id": "raj", "active": false}]')
+        self.addCleanup(os.unlink, f.name)
+        ana, raj = load_agents(f.name)
+        self.assertEqual((ana.calendar_id, ana.priority, raj.calendar_id, raj.active),
+                         ("ana@example.com", 2, "raj", False))
+
+
+class TestBookWithAgent(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calendar = FakeCalendar()
+        self.server = FakeGoogleServer(self.calendar).start()
+        self.addCleanup(self.server.stop)
+        self.registry = AgentRegistry([Agent("ana", "ana@example.com"), Agent("raj", "raj@example.com")],
+                                      tz=google_calendar.AVAILABILITY_RULES.tz)
+        for target, value in [
+            ("get_calendar_service", lambda: self.calendar),
+            ("_async_calendar", AsyncCalendarClient(lambda: "token", base_url=self.server.base_url)),
+            ("_agent_registry", self.registry),
+            ("_booking_store", BookingStore(os.path.join(self.tmp.name, "bookings.db"))),
+            ("_reservations", ReservationTable()),
+        ]:
+            patcher = mock.patch.object(google_calendar, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+        self.addCleanup(google_calendar._busy_cache.invalidate)
+
+    def test_books_free_agents_until_none_left(self):
+        """Busy agents are skipped, the index is updated and a full slot raises SlotConflict"""
+        tz = google_calendar.AVAILABILITY_RULES.tz
+        start = datetime.combine(DAY, datetime.min.time(), tzinfo=tz).replace(hour=11).astimezone(timezone.utc)
+        end = start + timedelta(minutes=30)
+        self.calendar.add_event(start, end, calendar_id="ana@example.com")
+
+        agent, _ = google_calendar.book_with_agent("Consultation", start, end, "c@example.com")
+        self.assertEqual(agent.agent_id, "raj")
+        self.assertEqual(len(self.calendar.all_events("raj@example.com")), 1)
+        with self.assertRaises(SlotConflict):
+            google_calendar.book_with_agent("Consultation", start, end, "d@example.com")
+        self.assertEqual(self.server.requests, 2)  # One fetch per agent-day, then the index answers
+
+        team_slots = google_calendar.get_team_available_slots(DAY)
+        self.assertNotIn((start, end), team_slots)
+        self.assertIn((end, end + timedelta(minutes=30)), team_slots)
+
+
+if __name__ == '__main__':
+    unittest.main()
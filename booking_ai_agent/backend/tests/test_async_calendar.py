@@ -0,0 +1,142 @@
+import unittest
+import sys
+import os
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import google_calendar
+from backend.async_calendar import AsyncCalendarClient
+from backend.fake_calendar import FakeCalendar
+from backend.fake_google_server import FakeGoogleServer
+
+DAY = date(2030, 1, 7)
+
+
+def at(day, hour, minute=0):
+    return datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc).replace(hour=hour, minute=minute)
+
+
+class TestAsyncCalendarClient(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = FakeCalendar(page_size=2)
+        self.server = FakeGoogleServer(self.calendar, latency=0.02).start()
+        self.addCleanup(self.server.stop)
+        self.client = AsyncCalendarClient(lambda: "token", base_url=self.server.base_url, max_concurrency=3,
+                                          backoff=0)
+
+    def run_client(self, coro):
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.client.aclose()
+        return asyncio.run(run())
+
+    def test_busy_intervals_follow_paging(self):
+        """All pages are read and parsed into sorted intervals"""
+        for hour in (15, 9, 11, 13, 10):
+            self.calendar.add_event(at(DAY, hour), at(DAY, hour, 30), calendar_id="agent@example.com")
+        intervals = self.run_client(
+            self.client.busy_intervals("agent@example.com", at(DAY, 0), at(DAY + timedelta(days=1), 0)))
+        self.assertEqual([start.hour for start, _ in intervals], [9, 10, 11, 13, 15])
+        self.assertEqual(self.server.requests, 3)
+
+    def test_fan_out_is_bounded(self):
+        """Windows are fetched concurrently, but never more than max_concurrency at once"""
+        windows = {n: ("primary", at(DAY + timedelta(days=n), 0), at(DAY + timedelta(days=n), 23))
+                   for n in range(12)}
+        result = self.run_client(self.client.busy_many(windows))
+        self.assertEqual(sorted(result), list(range(12)))
+        self.assertEqual(self.server.max_in_flight, 3)
+
+    def test_retries_rate_limits(self):
+        """429 and 503 answers are retried"""
+        self.server.fail_next(429)
+        self.server.fail_next(503)
+        self.calendar.add_event(at(DAY, 9), at(DAY, 10))
+        intervals = self.run_client(self.client.busy_intervals("primary", at(DAY, 0), at(DAY, 23)))
+        self.assertEqual(len(intervals), 1)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_retries_transport_errors(self):
+        """A dropped connection is retried like a 503"""
+        real_get = httpx.AsyncClient.get
+        attempts = []
+
+        async def flaky_get(client, *args, **kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise httpx.ConnectError("connection reset")
+            return await real_get(client, *args, **kwargs)
+
+        self.calendar.add_event(at(DAY, 9), at(DAY, 10))
+        with mock.patch.object(httpx.AsyncClient, "get", flaky_get):
+            intervals = self.run_client(self.client.busy_intervals("primary", at(DAY, 0), at(DAY, 23)))
+        self.assertEqual((len(intervals), len(attempts), self.server.requests), (1, 2, 1))
+
+    def test_retry_after_is_capped(self):
+        """Retry-After, in seconds or as an HTTP date, never exceeds the longest backoff delay"""
+        client = AsyncCalendarClient(lambda: "token", backoff=0.5, max_retries=3)
+        self.assertEqual(client._delay(0, {"Retry-After": "3600"}), 4.0)
+        self.assertEqual(client._delay(0, {"Retry-After": "1"}), 1.0)
+        soon = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=2), usegmt=True)
+        self.assertTrue(0 < client._delay(0, {"Retry-After": soon}) <= 2)
+        later = format_datetime(datetime.now(timezone.utc) + timedelta(hours=1), usegmt=True)
+        self.assertEqual(client._delay(0, {"Retry-After": later}), 4.0)
+
+    def test_pools_of_finished_loops_do_not_accumulate(self):
+        """A pool left behind by a finished asyncio.run is dropped when the next loop creates one"""
+        window = ("primary", at(DAY, 0), at(DAY, 23))
+        for _ in range(3):
+            asyncio.run(self.client.busy_intervals(*window))
+        self.assertEqual(len(self.client._per_loop), 1)
+        self.run_client(self.client.busy_intervals(*window))
+        self.assertEqual(len(self.client._per_loop), 0)
+
+
+class TestAvailableSlotsMany(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = FakeCalendar()
+        self.server = FakeGoogleServer(self.calendar, latency=0.01).start()
+        self.addCleanup(self.server.stop)
+        client = AsyncCalendarClient(lambda: "token", base_url=self.server.base_url)
+        patches = [
+            mock.patch.object(google_calendar, "_async_calendar", client),
+            mock.patch.object(google_calendar, "get_calendar_service", return_value=self.calendar),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+        self.addCleanup(google_calendar._busy_cache.invalidate)
+
+    def test_matches_serial_results_and_caches(self):
+        """Concurrent results equal the per-day sync results and fill the cache"""
+        days = [DAY + timedelta(days=n) for n in range(3)]
+        tz = google_calendar.AVAILABILITY_RULES.tz
+        for n, day in enumerate(days):
+            start = datetime.combine(day, datetime.min.time(), tzinfo=tz).replace(hour=10 + n)
+            self.calendar.add_event(start, start + timedelta(hours=1), calendar_id="primary")
+            self.calendar.add_event(start, start + timedelta(minutes=30), calendar_id="agent@example.com")
+
+        many = google_calendar.get_available_slots_many(["primary", "agent@example.com"], days)
+        self.assertEqual(len(many), 6)
+        requests = self.server.requests
+        google_calendar._busy_cache.invalidate("primary")
+        for day in days:
+            self.assertEqual(many[("primary", day)], google_calendar.get_available_slots(day))
+
+        google_calendar.get_available_slots_many(["agent@example.com"], days)
+        self.assertEqual(self.server.requests, requests)  # Served from the cache
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import random
+from datetime import date, datetime, time, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.availability import AvailabilityRules, free_slots, free_slots_range, merge_intervals
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def naive_slots(day, booked_slots, rules):
+    """Reference: the original fixed-step loop that rescans every booked interval."""
+    slots = []
+    for window_start, window_end in rules.windows(day):
+        start_time = window_start
+        while start_time + rules.slot <= window_end:
+            slot_start, slot_end = start_time, start_time + rules.slot
+            overlap = False
+            for booked_start, booked_end in booked_slots:
+                if slot_start < booked_end + rules.buffer and slot_end > booked_start - rules.buffer:
+                    overlap = True
+                    break
+            if not overlap:
+                slots.append((slot_start, slot_end))
+            start_time += rules.step
+    return slots
+
+
+def random_busy(rng, day, count):
+    base = datetime.combine(day, time(0, 0), tzinfo=IST).astimezone(timezone.utc)
+    busy = []
+    for _ in range(count):
+        start = base + timedelta(minutes=rng.randrange(0, 24 * 60, rng.choice([1, 5, 15, 30])))
+        busy.append((start, start + timedelta(minutes=rng.randrange(0, 240))))
+    return busy
+
+
+class TestAvailabilityProperties(unittest.TestCase):
+    """Randomized comparisons against the naive loop (fixed seeds keep runs reproducible)."""
+
+    def random_rules(self, rng):
+        hours = {}
+        for weekday in range(7):
+            if rng.random() < 0.8:
+                open_at = rng.randrange(6, 12)
+                windows = [(time(open_at, rng.choice([0, 15, 30])), time(open_at + rng.randrange(2, 6), 0))]
+                if rng.random() < 0.5:
+                    windows.append((time(14, 0), time(rng.randrange(15, 21), rng.choice([0, 30]))))
+                hours[weekday] = windows
+        return AvailabilityRules(
+            business_hours=hours,
+            slot_minutes=rng.choice([15, 30, 45, 60]),
+            step_minutes=rng.choice([None, 15, 30]),
+            buffer_minutes=rng.choice([0, 0, 5, 15]),
+            tz=IST,
+        )
+
+    def test_matches_naive_loop(self):
+        """Sweep output equals the naive loop for random calendars and rules"""
+        rng = random.Random(1234)
+        for _ in range(500):
+            rules = self.random_rules(rng)
+            day = date(2025, 10, 1) + timedelta(days=rng.randrange(14))
+            busy = random_busy(rng, day, rng.randrange(0, 25))
+            self.assertEqual(free_slots(day, busy, rules), naive_slots(day, busy, rules))
+
+    def test_range_matches_per_day(self):
+        """One multi-day sweep equals computing each day separately"""
+        rng = random.Random(99)
+        for _ in range(100):
+            rules = self.random_rules(rng)
+            start_day = date(2025, 10, 1)
+            busy = []
+            for offset in range(7):
+                busy += random_busy(rng, start_day + timedelta(days=offset), rng.randrange(0, 10))
+            ranged = free_slots_range(start_day, start_day + timedelta(days=6), busy, rules)
+            for day, slots in ranged.items():
+                self.assertEqual(slots, naive_slots(day, busy, rules))
+
+    def test_merge_intervals(self):
+        """Overlapping and touching intervals collapse into one"""
+        t = datetime(2025, 10, 1, tzinfo=timezone.utc)
+        m = timedelta(minutes=1)
+        merged = merge_intervals([(t + 30 * m, t + 40 * m), (t, t + 10 * m), (t + 10 * m, t + 20 * m)])
+        self.assertEqual(merged, [(t, t + 20 * m), (t + 30 * m, t + 40 * m)])
+
+    def test_closed_day(self):
+        """Weekdays without business hours have no slots"""
+        rules = AvailabilityRules(business_hours={0: [(time(9), time(17))]}, tz=IST)
+        self.assertEqual(free_slots(date(2025, 10, 5), [], rules), [])
+        self.assertEqual(len(free_slots(date(2025, 10, 6), [], rules)), 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
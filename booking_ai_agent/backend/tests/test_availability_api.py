@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import app as booking_app
+from backend import google_calendar
+from backend.fake_calendar import FakeCalendar
+
+
+class TestAvailabilityRange(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = FakeCalendar(page_size=5)
+        google_calendar._busy_cache.invalidate()
+        patcher = mock.patch.object(google_calendar, "get_calendar_service", return_value=self.calendar)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = booking_app.app.test_client()
+
+    def test_one_fetch_for_whole_range(self):
+        """A week of availability costs a single list call (plus paging)"""
+        busy_start = datetime.combine(date(2030, 1, 8), datetime.strptime("09:00", "%H:%M").time()).astimezone(timezone.utc)
+        self.calendar.add_event(busy_start, busy_start + timedelta(minutes=30))
+
+        response = self.client.get('/api/availability?from=2030-01-07&to=2030-01-13')
+        days = response.get_json()['days']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(days), 7)
+        self.assertEqual(len(days[0]['slots']), 16)
+        self.assertEqual(len(days[1]['slots']), 15)
+        self.assertEqual(self.calendar.calls["list"], 1)
+
+        # Per-day lookups are now served from the cache
+        self.client.get('/api/available_slots/2030-01-09')
+        self.assertEqual(self.calendar.calls["list"], 1)
+
+    def test_range_matches_per_day(self):
+        """Range results equal the per-day computation"""
+        start = datetime(2030, 1, 7, 2, 0, tzinfo=timezone.utc)
+        for i in range(12):
+            self.calendar.add_event(start + timedelta(hours=7 * i), start + timedelta(hours=7 * i, minutes=45))
+        ranged = google_calendar.get_available_slots_range(date(2030, 1, 7), date(2030, 1, 10))
+        google_calendar._busy_cache.invalidate()
+        for day, slots in ranged.items():
+            self.assertEqual(slots, google_calendar.get_available_slots(day))
+
+    def test_rejects_bad_range(self):
+        """Reversed or oversized ranges are rejected"""
+        self.assertEqual(self.client.get('/api/availability?from=2030-01-07&to=2030-01-01').status_code, 400)
+        self.assertEqual(self.client.get('/api/availability?from=2030-01-01&to=2030-03-01').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.availability import AvailabilityRules, free_slots_range
+from backend.availability_grid import OccupancyGrid
+
+IST = timezone(timedelta(hours=5, minutes=30))
+START = date(2025, 10, 1)
+
+
+class TestOccupancyGrid(unittest.TestCase):
+
+    def test_matches_scalar_engine(self):
+        """Free resources per slot agree with the sweep engine"""
+        rng = random.Random(5)
+        rules = AvailabilityRules(tz=IST, buffer_minutes=5)
+        calendars = {}
+        for resource in range(12):
+            intervals = []
+            for _ in range(20):
+                start = datetime.combine(START, datetime.min.time(), tzinfo=IST) + \
+                    timedelta(minutes=rng.randrange(0, 5 * 24 * 60, 5))
+                intervals.append((start, start + timedelta(minutes=rng.randrange(5, 180, 5))))
+            calendars[resource] = intervals
+
+        expected = {}
+        for resource, intervals in calendars.items():
+            for slots in free_slots_range(START, START + timedelta(days=4), intervals, rules).values():
+                for slot in slots:
+                    expected.setdefault(slot, set()).add(resource)
+
+        grid = OccupancyGrid(calendars, START, 5, resolution_minutes=5, rules=rules)
+        grid.paint(calendars)
+        actual = {(start, end): free for start, end, free in grid.free_resources_by_slot()}
+        self.assertEqual(actual, expected)
+
+    def test_free_resources(self):
+        """Only resources without overlapping busy time are returned"""
+        rules = AvailabilityRules(tz=IST)
+        grid = OccupancyGrid(["a", "b"], START, 1, rules=rules)
+        ten = datetime.combine(START, datetime.min.time(), tzinfo=IST) + timedelta(hours=10)
+        grid.paint({"a": [(ten, ten + timedelta(hours=1))]})
+        self.assertEqual(grid.free_resources(ten, ten + timedelta(minutes=30)), {"b"})
+        self.assertEqual(grid.free_resources(ten + timedelta(hours=1), ten + timedelta(hours=2)), {"a", "b"})
+        # Outside business hours nobody is free
+        self.assertEqual(grid.free_resources(ten - timedelta(hours=4), ten - timedelta(hours=3)), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
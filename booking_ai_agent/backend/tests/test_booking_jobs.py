@@ -0,0 +1,169 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import google_calendar
+from backend.booking_jobs import JobQueue, PermanentJobError, _release_hold, process_booking
+from backend.booking_store import BookingStore
+from backend.fake_calendar import FakeCalendar, _http_error
+from backend.reservations import ReservationTable
+
+START = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=30)
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "jobs.db")
+        self.calls = []
+
+    def make_queue(self, handler, **kwargs):
+        kwargs.setdefault("base_delay", 0)
+        return JobQueue(self.path, handler, **kwargs)
+
+    def test_retry_then_succeed(self):
+        """Failures are retried and checkpointed state is kept"""
+        def handler(job):
+            self.calls.append(job.attempts)
+            if "step" not in job.state:
+                job.state["step"] = "inserted"
+                job.save_state()
+            if job.attempts < 2:
+                raise RuntimeError("temporary")
+
+        queue = self.make_queue(handler)
+        job_id = queue.enqueue({"email": "a@example.com"})
+        while queue.run_once():
+            pass
+        status = queue.status(job_id)
+        self.assertEqual(status["status"], "done")
+        self.assertEqual(status["attempts"], 3)
+        self.assertEqual(status["state"], {"step": "inserted"})
+        self.assertEqual(self.calls, [0, 1, 2])
+
+    def test_jobs_survive_restart(self):
+        """A job queued by one process is run by the next"""
+        first = self.make_queue(lambda job: None)
+        job_id = first.enqueue({"n": 1})
+        second = self.make_queue(lambda job: self.calls.append(job.payload))
+        self.assertTrue(second.run_once())
+        self.assertEqual(self.calls, [{"n": 1}])
+        self.assertEqual(first.status(job_id)["status"], "done")
+
+    def test_expired_lease_is_reclaimed(self):
+        """Jobs left running by a crashed worker are picked up again"""
+        queue = self.make_queue(lambda job: self.calls.append(job.id), lease=0.01)
+        job_id = queue.enqueue({})
+        queue._claim()  # Simulates a worker that died mid-job
+        time.sleep(0.02)
+        self.assertTrue(queue.run_once())
+        self.assertEqual(self.calls, [job_id])
+
+    def test_permanent_error_and_max_attempts(self):
+        """Permanent errors fail at once; others fail after max_attempts"""
+        failed = []
+
+        def handler(job):
+            if job.payload["permanent"]:
+                raise PermanentJobError("slot taken")
+            raise RuntimeError("down")
+
+        queue = self.make_queue(handler, max_attempts=3, on_failure=lambda job: failed.append(job.id))
+        permanent = queue.enqueue({"permanent": True})
+        transient = queue.enqueue({"permanent": False})
+        while queue.run_once():
+            pass
+        self.assertEqual(queue.status(permanent)["attempts"], 1)
+        self.assertEqual(queue.status(transient)["attempts"], 3)
+        self.assertEqual(queue.status(transient)["status"], "failed")
+        self.assertEqual(sorted(failed), sorted([permanent, transient]))
+
+    def test_affinity_keeps_job_in_enqueuing_process(self):
+        """Other processes only claim a job once its affinity has lapsed"""
+        owner = self.make_queue(lambda job: self.calls.append("owner"))
+        other = self.make_queue(lambda job: self.calls.append("other"))
+        owner.enqueue({}, affinity_ttl=0.5)
+        self.assertFalse(other.run_once())
+        time.sleep(0.5)
+        self.assertTrue(other.run_once())
+        self.assertEqual(self.calls, ["other"])
+
+    def test_worker_threads(self):
+        """Started workers drain the queue in the background"""
+        queue = self.make_queue(lambda job: self.calls.append(job.id), workers=2, poll_interval=0.05)
+        queue.start()
+        self.addCleanup(queue.stop)
+        job_ids = [queue.enqueue({}) for _ in range(10)]
+        deadline = time.time() + 5
+        while len(self.calls) < 10 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(sorted(self.calls), sorted(job_ids))
+
+
+class TestProcessBooking(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calendar = FakeCalendar()
+        self.reservations = ReservationTable()
+        for target, value in [
+            ("get_calendar_service", lambda: self.calendar),
+            ("_booking_store", BookingStore(os.path.join(self.tmp.name, "bookings.db"))),
+            ("_reservations", self.reservations),
+        ]:
+            patcher = mock.patch.object(google_calendar, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+        self.addCleanup(google_calendar._busy_cache.invalidate)
+        self.queue = JobQueue(os.path.join(self.tmp.name, "jobs.db"), process_booking, base_delay=0,
+                              max_attempts=3, on_failure=_release_hold)
+
+    def enqueue(self):
+        hold_id = google_calendar.hold_slot(START, START + timedelta(minutes=30), owner="c@example.com")
+        return self.queue.enqueue({"email": "c@example.com", "start_time": START.isoformat(),
+                                   "end_time": (START + timedelta(minutes=30)).isoformat(),
+                                   "hold_id": hold_id, "event_id": "evt0booking0001"}, affinity_ttl=300)
+
+    def test_lost_insert_response_does_not_duplicate(self):
+        """A retry after an insert whose response was lost reuses the event"""
+        insert = self.calendar._insert
+
+        def insert_then_lose_response(calendar_id, body, count=True):
+            insert(calendar_id, body, count)
+            raise _http_error(503, "Backend Error")
+
+        with mock.patch.object(self.calendar, "_insert", side_effect=insert_then_lose_response):
+            job_id = self.enqueue()
+            self.assertTrue(self.queue.run_once())
+        while self.queue.run_once():
+            pass
+        self.assertEqual(self.queue.status(job_id)["status"], "done")
+        self.assertEqual(len(self.calendar.all_events()), 1)
+        self.assertEqual(self.calendar.calls["insert"], 2)
+
+    def test_hold_survives_retries_and_is_released_on_failure(self):
+        """Transient failures keep the slot held; giving up releases it"""
+        self.calendar.fail_inserts(503, times=3)
+        job_id = self.enqueue()
+        self.assertTrue(self.queue.run_once())
+        self.assertEqual(self.queue.status(job_id)["status"], "queued")
+        self.assertFalse(self.reservations.is_free("primary", START, START + timedelta(minutes=30)))
+
+        while self.queue.run_once():
+            pass
+        self.assertEqual(self.queue.status(job_id)["status"], "failed")
+        self.assertTrue(self.reservations.is_free("primary", START, START + timedelta(minutes=30)))
+
+
+if __name__ == '__main__':
+    unittest.main()
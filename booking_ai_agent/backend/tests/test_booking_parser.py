@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import json
+from datetime import date, datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.booking_parser import parse_booking, parse_fast
+
+NOW = datetime(2025, 10, 1, 9, 0)  # A Wednesday
+
+
+class TestFastPath(unittest.TestCase):
+
+    def test_common_forms(self):
+        """Common date/time forms are answered by the regex tier"""
+        cases = {
+            "tomorrow 3pm": datetime(2025, 10, 2, 15, 0),
+            "next Monday 10:30": datetime(2025, 10, 6, 10, 30),
+            "2025-10-01 14:00": datetime(2025, 10, 1, 14, 0),
+            "Site visit on Oct 5th at 4 pm": datetime(2025, 10, 5, 16, 0),
+            "the 5th of November 4 pm": datetime(2025, 11, 5, 16, 0),
+            "call next wednesday at noon": datetime(2025, 10, 8, 12, 0),
+            "today at 12am": datetime(2025, 10, 1, 0, 0),
+            "Meeting in 2 days at 10am": datetime(2025, 10, 3, 10, 0),
+            "the 5th at 4pm": datetime(2025, 10, 5, 16, 0),
+        }
+        for text, expected in cases.items():
+            parsed = parse_fast(text, NOW)
+            self.assertIsNotNone(parsed, text)
+            self.assertEqual(parsed.start, expected, text)
+            self.assertEqual(parsed.tier, "regex")
+
+    def test_structured_fields(self):
+        """Intent, duration, email and summary are extracted"""
+        parsed = parse_fast("Book a site visit tomorrow at 3:30 pm for 45 minutes, ana@example.com", NOW)
+        self.assertEqual(parsed.intent, "book")
+        self.assertEqual(parsed.duration, 45)
+        self.assertEqual(parsed.email, "ana@example.com")
+        self.assertEqual(parsed.summary, "Book a site visit")
+        self.assertEqual(parse_fast("cancel friday 10am for an hour", NOW).intent, "cancel")
+        self.assertEqual(parse_fast("cancel friday 10am for 1.5 hours", NOW).duration, 90)
+
+    def test_date_without_time(self):
+        """A date with no time of day gives its day and no start; no date falls through"""
+        cases = {
+            "show slots friday": date(2025, 10, 3),
+            "please book a visit in 2 days": date(2025, 10, 3),
+            "visit in 3 weeks": date(2025, 10, 22),
+            "schedule viewing the day after tomorrow": date(2025, 10, 3),
+            "book a visit on the 5th": date(2025, 10, 5),
+            "viewing on the 1st": date(2025, 10, 1),
+        }
+        for text, expected in cases.items():
+            parsed = parse_booking(text, now=NOW, use_llm=False)
+            self.assertEqual((parsed.start, parsed.day, parsed.tier), (None, expected, "regex"), text)
+        self.assertEqual(parse_fast("book a visit on the 5th", datetime(2025, 12, 20, 9, 0)).day, date(2026, 1, 5))
+        self.assertIsNone(parse_fast("meet at 3pm", NOW))
+
+
+class TestTiers(unittest.TestCase):
+
+    def test_dateparser_tier(self):
+        """Relative phrases the grammar skips go to dateparser"""
+        parsed = parse_booking("Meeting in two days at 10am", now=NOW, use_llm=False)
+        self.assertEqual(parsed.tier, "dateparser")
+        self.assertEqual(parsed.start, datetime(2025, 10, 3, 10, 0))
+
+    def test_dateparser_never_uses_clock_time(self):
+        """Without a time of day dateparser results carry only the day"""
+        now = datetime(2025, 10, 1, 16, 41)
+        parsed = parse_booking("Meeting in two days", now=now, use_llm=False)
+        self.assertEqual((parsed.tier, parsed.start, parsed.day), ("dateparser", None, date(2025, 10, 3)))
+
+    def test_llm_is_last_resort(self):
+        """The LLM is only asked when both local tiers fail"""
+        prompts = []
+
+        def llm(prompt, system_prompt):
+            prompts.append(prompt)
+            return 'Sure: {"intent": "book", "start": "2025-10-03T11:00", "duration_minutes": 30, "email": null}'
+
+        self.assertEqual(parse_booking("tomorrow 3pm", now=NOW, llm=llm).tier, "regex")
+        parsed = parse_booking("whenever the agent is back from lunch on the third", now=NOW, llm=llm)
+        self.assertEqual(parsed.tier, "llm")
+        self.assertEqual((parsed.start, parsed.duration), (datetime(2025, 10, 3, 11, 0), 30))
+        self.assertEqual(len(prompts), 1)
+
+    def test_nothing_parsed(self):
+        """Unparseable text returns an empty result instead of raising"""
+        parsed = parse_booking("hello there", now=NOW, llm=lambda prompt, system: json.dumps({"start": "soon"}))
+        self.assertEqual((parsed.tier, parsed.start), ("none", None))
+
+
+if __name__ == '__main__':
+    unittest.main()
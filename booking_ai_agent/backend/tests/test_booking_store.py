@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.booking_store import BookingStore
+
+BASE = datetime(2025, 9, 15, 3, 30, tzinfo=timezone.utc)
+
+
+class TestBookingStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = BookingStore(os.path.join(self.tmp.name, "bookings.db"))
+
+    def test_queries_by_email_and_day(self):
+        """Bookings can be looked up per client and per day"""
+        self.store.add("a@example.com", BASE, BASE + timedelta(minutes=30), "first")
+        self.store.add("b@example.com", BASE + timedelta(days=1), BASE + timedelta(days=1, minutes=30))
+        self.store.add("a@example.com", BASE + timedelta(days=1), BASE + timedelta(days=1, minutes=30))
+
+        self.assertEqual([b["start_time"] for b in self.store.for_email("a@example.com")],
+                         [BASE, BASE + timedelta(days=1)])
+        self.assertEqual(len(self.store.on_day(date(2025, 9, 16), tz=timezone.utc)), 2)
+
+        plan = self.store._connect().execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM bookings WHERE email = ? ORDER BY start_time", ("x",)
+        ).fetchall()
+        self.assertIn("idx_bookings_email", " ".join(row[-1] for row in plan))
+
+    def test_import_csv_is_idempotent(self):
+        """Re-importing a legacy CSV does not duplicate rows"""
+        csv_path = os.path.join(self.tmp.name, "bookings.csv")
+        with open(csv_path, "w") as f:
+            f.write("Email,Start Time,End Time,Description\n")
+            f.write("a@example.com,2025-09-15T03:30:00+00:00,2025-09-15T04:00:00+00:00,note\n")
+            f.write("b@example.com,2025-09-14T10:30:00+00:00,2025-09-14T11:00:00+00:00,\n")
+            f.write("b@example.com,2025-09-14T10:30:00+00:00,2025-09-14T11:00:00+00:00,\n")
+        self.assertEqual(self.store.import_csv(csv_path), 2)
+        self.assertEqual(self.store.import_csv(csv_path), 0)
+        self.assertEqual(self.store.count(), 2)
+
+    def test_rebooking_same_slot_keeps_new_event(self):
+        """Booking a slot again after cancelling in Google stores the new event, not the old row"""
+        end = BASE + timedelta(minutes=30)
+        first = self.store.add("a@example.com", BASE, end, calendar_id="primary", event_id="old")
+        second = self.store.add("a@example.com", BASE, end, calendar_id="team", event_id="new")
+        self.assertNotEqual(first, second)
+        self.assertEqual([(b["event_id"], b["calendar_id"]) for b in self.store.for_email("a@example.com")],
+                         [("old", "primary"), ("new", "team")])
+
+    def test_concurrent_writers(self):
+        """Writes from many threads are all stored"""
+        def write(worker):
+            for i in range(25):
+                start = BASE + timedelta(hours=worker, minutes=i)
+                self.store.add("w%d@example.com" % worker, start, start + timedelta(minutes=30))
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.store.count(), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import google_calendar
+from backend.booking_store import BookingStore
+from backend.bulk_booking import (
+    CONFLICT, CREATED, FAILED, INVALID, VALID, BulkBooking, load_bookings, validate_bookings,
+)
+from backend.fake_calendar import FakeCalendar
+from backend.reservations import ReservationTable
+
+START = datetime(2030, 1, 7, 10, 0, tzinfo=timezone.utc)
+
+
+def bookings(count, minutes=30, start=START):
+    return [BulkBooking(n + 1, f"client{n}@example.com", start + timedelta(minutes=minutes * n),
+                        start + timedelta(minutes=minutes * (n + 1)))
+            for n in range(count)]
+
+
+class TestLoadAndValidate(unittest.TestCase):
+
+    def test_load_csv_and_jsonl(self):
+        """CSV and JSONL rows load alike; bad rows become per-row INVALID results"""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "bookings.csv")
+            with open(csv_path, "w") as handle:
+                handle.write("email,start,end,duration_minutes,summary\n"
+                             "a@example.com,2030-01-07T10:00:00+00:00,2030-01-07T10:30:00+00:00,,Open house\n"
+                             "b@example.com,2030-01-07T11:00:00Z,,45,\n"
+                             "nobody,2030-01-07T12:00:00Z,,30,\n")
+            jsonl_path = os.path.join(tmp, "bookings.jsonl")
+            with open(jsonl_path, "w") as handle:
+                handle.write(json.dumps({"email": "c@example.com", "start": "2030-01-07T10:00:00",
+                                         "duration_minutes": 30}) + "\n\nnot json\n")
+
+            rows, invalid = load_bookings(csv_path)
+            self.assertEqual([row.email for row in rows], ["a@example.com", "b@example.com"])
+            self.assertEqual(rows[0].summary, "Open house")
+            self.assertEqual(rows[1].end_time - rows[1].start_time, timedelta(minutes=45))
+            self.assertEqual([(r["row"], r["status"]) for r in invalid], [(3, INVALID)])
+
+            rows, invalid = load_bookings(jsonl_path, tz=timezone.utc)
+            self.assertEqual(rows[0].start_time, START)
+            self.assertEqual([r["row"] for r in invalid], [3])
+
+    def test_validate_against_calendar_and_earlier_rows(self):
+        """Rows clashing with busy time, the buffer or an earlier row are rejected"""
+        rows = bookings(3) + [BulkBooking(4, "dup@example.com", START, START + timedelta(minutes=30))]
+        busy = [(START + timedelta(minutes=75), START + timedelta(minutes=90))]
+        accepted, rejected = validate_bookings(rows, busy, buffer=timedelta(minutes=10),
+                                               now=START - timedelta(days=1))
+        self.assertEqual([row.row for row in accepted], [1, 2])
+        self.assertEqual({r["row"]: r["error"] for r in rejected}, {3: "overlaps calendar", 4: "overlaps row 1"})
+
+        _, rejected = validate_bookings(rows[:1], [], now=START + timedelta(hours=1))
+        self.assertEqual(rejected[0]["status"], INVALID)
+
+
+class TestBookMany(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calendar = FakeCalendar()
+        self.store = BookingStore(os.path.join(self.tmp.name, "bookings.db"))
+        for target, value in [
+            ("get_calendar_service", lambda: self.calendar),
+            ("_booking_store", self.store),
+            ("_reservations", ReservationTable()),
+        ]:
+            patcher = mock.patch.object(google_calendar, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+        self.addCleanup(google_calendar._busy_cache.invalidate)
+
+    def test_batches_of_fifty_with_one_fetch(self):
+        """120 bookings take one list call and three batches, and land in the store"""
+        results = google_calendar.book_many(bookings(120))
+        self.assertEqual({r["status"] for r in results}, {CREATED})
+        self.assertEqual(self.calendar.calls["list"], 1)
+        self.assertEqual(self.calendar.calls["batch"], 3)
+        self.assertEqual(len(self.calendar.all_events()), 120)
+        self.assertEqual(self.store.count(), 120)
+        self.assertEqual(results[0]["event_id"], self.store.for_email("client0@example.com")[0]["event_id"])
+        # Written through: the new bookings are busy without another fetch
+        day = START.astimezone(google_calendar.AVAILABILITY_RULES.tz).date()
+        self.assertIn((START, START + timedelta(minutes=30)), google_calendar.get_booked_slots(day))
+        self.assertEqual(self.calendar.calls["list"], 1)
+
+    def test_partial_failure_is_retried(self):
+        """Rate-limited items are retried; permanent errors are reported per row"""
+        self.calendar.fail_inserts(429, times=2)
+        results = google_calendar.book_many(bookings(5), backoff=0)
+        self.assertEqual([r["status"] for r in results], [CREATED] * 5)
+        self.assertEqual(self.calendar.calls["batch"], 2)
+
+        self.calendar.fail_inserts(400)
+        results = google_calendar.book_many(bookings(2, start=START + timedelta(days=1)), backoff=0)
+        self.assertEqual([r["status"] for r in results], [FAILED, CREATED])
+        self.assertTrue(google_calendar._reservations.is_free(
+            "primary", START + timedelta(days=1), START + timedelta(days=1, minutes=30)))
+
+    def test_lost_batch_response_does_not_duplicate(self):
+        """A batch whose response is lost is resent, and the 409s count as created"""
+        self.calendar.fail_batches(ConnectionError("reset"), after_running=True)
+        results = google_calendar.book_many(bookings(3), backoff=0)
+        self.assertEqual([r["status"] for r in results], [CREATED] * 3)
+        self.assertEqual(len(self.calendar.all_events()), 3)
+        self.assertEqual(self.store.count(), 3)
+
+    def test_dry_run_and_holds(self):
+        """Dry runs create nothing; rows held by another request conflict"""
+        google_calendar.hold_slot(START, START + timedelta(minutes=30))
+        results = google_calendar.book_many(bookings(2), dry_run=True)
+        self.assertEqual([r["status"] for r in results], [CONFLICT, VALID])
+        self.assertEqual(self.calendar.calls["insert"], 0)
+        self.assertEqual(self.store.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+from datetime import date, datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.busy_cache import BusyIntervalCache
+
+DAY = date(2025, 10, 1)
+SLOT = (datetime(2025, 10, 1, 4, 0, tzinfo=timezone.utc), datetime(2025, 10, 1, 4, 30, tzinfo=timezone.utc))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBusyIntervalCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = BusyIntervalCache(ttl=60, max_entries=2, clock=self.clock)
+
+    def test_hit_then_expiry(self):
+        """Entries are served until the TTL elapses"""
+        self.cache.put("primary", DAY, [SLOT])
+        self.clock.now = 30
+        self.assertEqual(self.cache.get("primary", DAY), [SLOT])
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get("primary", DAY))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expired"]), (1, 1, 1))
+        self.assertEqual(stats["max_age_served"], 30)
+
+    def test_lru_eviction(self):
+        """Least recently used day is evicted first"""
+        self.cache.put("primary", date(2025, 10, 1), [])
+        self.cache.put("primary", date(2025, 10, 2), [])
+        self.cache.get("primary", date(2025, 10, 1))
+        self.cache.put("primary", date(2025, 10, 3), [])
+        self.assertIsNone(self.cache.get("primary", date(2025, 10, 2)))
+        self.assertEqual(self.cache.get("primary", date(2025, 10, 1)), [])
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_write_through_patch(self):
+        """New bookings are patched into cached days only"""
+        self.cache.put("primary", DAY, [])
+        self.assertTrue(self.cache.add_interval("primary", DAY, *SLOT))
+        self.assertFalse(self.cache.add_interval("primary", date(2025, 10, 2), *SLOT))
+        self.assertEqual(self.cache.get("primary", DAY), [SLOT])
+
+    def test_invalidate_calendar(self):
+        """Invalidation drops every day of a calendar"""
+        self.cache.put("primary", DAY, [SLOT])
+        self.cache.invalidate("primary")
+        self.assertIsNone(self.cache.get("primary", DAY))
+
+    def test_put_skipped_after_invalidation(self):
+        """A fetch that started before an invalidation or patch does not overwrite it"""
+        for change in (lambda: self.cache.invalidate("primary", DAY),
+                       lambda: self.cache.add_interval("primary", DAY, *SLOT),
+                       lambda: self.cache.invalidate("primary"),
+                       lambda: self.cache.invalidate()):
+            generation = self.cache.generation("primary", DAY)
+            change()
+            self.assertFalse(self.cache.put("primary", DAY, [], generation))
+            self.assertIsNone(self.cache.get("primary", DAY))
+        other = self.cache.generation("primary", date(2025, 10, 2))
+        self.cache.invalidate("primary", DAY)
+        self.assertTrue(self.cache.put("primary", date(2025, 10, 2), [], other))
+        self.assertEqual(self.cache.stats()["stale_skips"], 4)
+
+    def test_pruned_generations_still_reject_stale_puts(self):
+        """Dropping old per-day counters cannot make an outdated generation match again"""
+        generation = self.cache.generation("primary", DAY)
+        self.cache.invalidate("primary", DAY)
+        for n in range(2, 12):
+            self.cache.invalidate("primary", date(2025, 10, n))
+        self.assertFalse(self.cache.put("primary", DAY, [], generation))
+
+
+if __name__ == '__main__':
+    unittest.main()
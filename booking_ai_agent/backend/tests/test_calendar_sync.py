@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.calendar_sync import BusyStore, CalendarSync, GoogleEventsFetcher
+from backend.fake_calendar import FakeCalendar
+
+BASE = datetime(2025, 10, 1, 4, 0, tzinfo=timezone.utc)
+
+
+def at(minutes):
+    return BASE + timedelta(minutes=minutes)
+
+
+class TestCalendarSync(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = FakeCalendar(page_size=2)
+        self.sync = CalendarSync(GoogleEventsFetcher(lambda: self.calendar))
+
+    def test_full_then_incremental(self):
+        """First sync lists everything, later syncs only apply changes"""
+        for i in range(5):
+            self.calendar.add_event(at(60 * i), at(60 * i + 30))
+        self.sync.sync()
+        self.assertEqual(len(self.sync.store), 5)
+
+        self.calendar.add_event(at(600), at(630))
+        self.calendar.events().delete(calendarId="primary", eventId="evt1").execute()
+        self.sync.sync()
+
+        self.assertEqual(len(self.sync.store), 5)
+        self.assertEqual(self.sync.store.busy_between(at(590), at(700)), [(at(600), at(630))])
+        self.assertEqual(self.sync.store.busy_between(at(0), at(30)), [])
+        stats = self.sync.stats()
+        self.assertEqual((stats["full_syncs"], stats["incremental_syncs"]), (1, 1))
+
+    def test_resync_on_gone(self):
+        """An expired sync token triggers a full resync"""
+        self.calendar.add_event(at(0), at(30))
+        self.sync.sync()
+        self.calendar.add_event(at(60), at(90))
+        self.calendar.expire_sync_tokens()
+        self.sync.sync()
+        self.assertEqual(self.sync.stats()["resyncs"], 1)
+        self.assertEqual(len(self.sync.store), 2)
+
+    def test_store_ignores_free_events(self):
+        """Transparent events do not block time"""
+        store = BusyStore()
+        store.apply([
+            {"id": "a", "start": {"dateTime": at(0).isoformat()}, "end": {"dateTime": at(30).isoformat()}},
+            {"id": "b", "transparency": "transparent",
+             "start": {"dateTime": at(0).isoformat()}, "end": {"dateTime": at(30).isoformat()}},
+        ])
+        self.assertEqual(store.busy_between(at(-60), at(60)), [(at(0), at(30))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import requests
+
+from backend import gmail_service
+from backend.fake_google_server import FakeGoogleServer
+from backend.groq_provider import GroqClient
+
+START = datetime(2030, 1, 7, tzinfo=timezone.utc)
+
+
+class TestFakeGoogleServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeGoogleServer(
+            chat_reply=lambda payload: "echo: " + payload["messages"][-1]["content"]).start()
+        self.addCleanup(self.server.stop)
+
+    def test_calendar_through_googleapiclient(self):
+        """The real Calendar client lists, inserts and queries freeBusy against the fake"""
+        self.server.populate(days=3, per_day=4, start=START.date())
+        service = self.server.build_service("calendar", "v3")
+        window = {"timeMin": START.isoformat(), "timeMax": (START + timedelta(days=1)).isoformat()}
+        events = service.events().list(calendarId="primary", singleEvents=True, **window).execute()
+        self.assertEqual(len(events["items"]), 4)
+
+        service.events().insert(calendarId="primary", sendUpdates="all", body={
+            "start": {"dateTime": (START + timedelta(hours=20)).isoformat()},
+            "end": {"dateTime": (START + timedelta(hours=21)).isoformat()},
+        }).execute()
+        busy = service.freebusy().query(body=dict(window, items=[{"id": "primary"}])).execute()
+        self.assertEqual(len(busy["calendars"]["primary"]["busy"]), 5)
+
+    def test_gmail_send_and_chat(self):
+        """send_email and GroqClient work unchanged against the fake endpoints"""
+        with mock.patch.object(gmail_service, "get_gmail_service",
+                               lambda: self.server.build_service("gmail", "v1")):
+            self.assertIn("ID: msg", gmail_service.send_email("a@example.com", "Hi", "Body"))
+        self.assertEqual(len(self.server.sent_messages), 1)
+
+        client = GroqClient(api_key="test", api_url=self.server.chat_url, backoff=0)
+        self.addCleanup(client.close)
+        self.assertEqual(client.complete("hello"), "echo: hello")
+        self.assertEqual("".join(client.stream("two words")), "echo: two words")
+        self.assertEqual(self.server.stats()["chat_requests"], 2)
+
+    def test_error_rate_and_latency(self):
+        """Per-service latency applies and error_rate fails that share of requests"""
+        server = FakeGoogleServer(latencies={"chat": 0.05}, error_rate=1.0, error_statuses=(503,)).start()
+        self.addCleanup(server.stop)
+        started = datetime.now()
+        response = requests.post(server.chat_url, json={"messages": [{"role": "user", "content": "hi"}]})
+        self.assertGreaterEqual(datetime.now() - started, timedelta(seconds=0.05))
+        self.assertEqual(response.status_code, 503)
+
+
+if __name__ == '__main__':
+    unittest.main()
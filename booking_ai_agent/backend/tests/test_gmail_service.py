@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import gmail_service
+from backend.gmail_service import EmailTemplate, send_emails_batch
+
+
+class FakeSend:
+    def __init__(self, body):
+        self.body = body
+
+
+class FakeBatch:
+    def __init__(self, gmail, callback):
+        self.gmail = gmail
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.gmail.batches.append(len(self.requests))
+        for request_id, request in self.requests:
+            if request_id in self.gmail.reject:
+                self.callback(request_id, None, RuntimeError("rejected"))
+            else:
+                self.callback(request_id, {"id": "msg-" + request_id}, None)
+
+
+class FakeGmail:
+    def __init__(self):
+        self.batches = []
+        self.reject = set()
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def send(self, userId, body):
+        return FakeSend(body)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+
+class TestSendEmailsBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.gmail = FakeGmail()
+        patcher = mock.patch.object(gmail_service, "get_gmail_service", return_value=self.gmail)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_chunks_and_results(self):
+        """Messages are sent 100 per batch with per-message results in order"""
+        messages = [{"to": "u%d@example.com" % i, "subject": "Hi", "body": "Hello"} for i in range(250)]
+        results = send_emails_batch(messages)
+        self.assertEqual(self.gmail.batches, [100, 100, 50])
+        self.assertEqual([r["to"] for r in results], [m["to"] for m in messages])
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual(results[7]["id"], "msg-7")
+
+    def test_template_rendered_per_message(self):
+        """Templates fill each message's own context; unknown placeholders are left as-is"""
+        template = EmailTemplate("Reminder for $date", "See you on $date, $name $unknown")
+        results = send_emails_batch([
+            {"to": "u%d@example.com" % i, "template": template, "context": {"date": "Oct 01", "name": "u%d" % i}}
+            for i in range(20)
+        ])
+        self.assertTrue(all(r["ok"] for r in results))
+        self.assertEqual(template.render(date="Oct 02", name="Ann"),
+                         ("Reminder for Oct 02", "See you on Oct 02, Ann $unknown"))
+
+    def test_partial_failure(self):
+        """A rejected message does not fail the rest of the batch"""
+        self.gmail.reject = {"1"}
+        results = send_emails_batch([
+            {"to": "ok@example.com", "subject": "s", "body": "fine"},
+            {"to": "bad@example.com", "subject": "s", "body": "fine"},
+        ])
+        self.assertEqual([r["ok"] for r in results], [True, False])
+        self.assertEqual(results[1]["error"], "rejected")
+
+
+if __name__ == '__main__':
+    unittest.main()
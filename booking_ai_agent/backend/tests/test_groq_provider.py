@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import requests
+
+from backend.groq_provider import GroqClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is observable
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.ports.add(self.client_address[1])
+        server.requests += 1
+
+        if server.failures:
+            status = server.failures.pop(0)
+            return self._send(status, b"{}", {"Retry-After": "0"})
+
+        if payload.get("stream"):
+            events = "".join(
+                "data: %s\n\n" % json.dumps({"choices": [{"delta": {"content": word}}]})
+                for word in ["Hello", " there"]
+            ) + "data: [DONE]\n\n"
+            return self._send(200, events.encode(), {"Content-Type": "text/event-stream"})
+
+        body = {"choices": [{"message": {"content": "echo: " + payload["messages"][-1]["content"]}}]}
+        self._send(200, json.dumps(body).encode(), {"Content-Type": "application/json"})
+
+
+class TestGroqClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.ports = set()
+        self.server.requests = 0
+        self.server.failures = []
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        url = "http://127.0.0.1:%d/openai/v1/chat/completions" % self.server.server_address[1]
+        self.client = GroqClient(api_key="test", api_url=url, backoff=0)
+        self.addCleanup(self.client.close)
+
+    def test_connection_reused(self):
+        """Sequential completions share one pooled connection"""
+        for n in range(5):
+            self.assertEqual(self.client.complete("hi %d" % n), "echo: hi %d" % n)
+        self.assertEqual(len(self.server.ports), 1)
+
+    def test_retries_rate_limit_and_server_errors(self):
+        """429 and 5xx responses are retried until a success"""
+        self.server.failures = [429, 503]
+        self.assertEqual(self.client.complete("hi"), "echo: hi")
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(self.client.stats()["retries"], 2)
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent errors raise once retries are exhausted"""
+        self.server.failures = [500] * 10
+        self.client.max_retries = 2
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.complete("hi")
+        self.assertEqual(self.server.requests, 3)
+
+    def test_stream(self):
+        """Streaming yields content deltas in order"""
+        self.assertEqual(list(self.client.stream("hi")), ["Hello", " there"])
+
+    def test_async(self):
+        """The asyncio variant completes, retries and streams"""
+        self.server.failures = [429]
+
+        async def run():
+            text = await self.client.acomplete("hi")
+            chunks = [chunk async for chunk in self.client.astream("hi")]
+            await self.client.aclose()
+            return text, chunks
+
+        text, chunks = asyncio.run(run())
+        self.assertEqual(text, "echo: hi")
+        self.assertEqual(chunks, ["Hello", " there"])
+
+    def test_async_clients_do_not_accumulate(self):
+        """Clients of finished event loops are dropped; close() closes the rest"""
+        for n in range(3):
+            self.assertEqual(asyncio.run(self.client.acomplete("hi %d" % n)), "echo: hi %d" % n)
+        self.assertEqual(len(self.client._async_clients), 1)
+
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        loop.run_until_complete(self.client.acomplete("hi"))
+        client = self.client._async_clients[loop]
+        self.client.close()
+        self.assertTrue(client.is_closed)
+        self.assertEqual(len(self.client._async_clients), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import gzip
+import json
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import app as booking_app
+from backend import google_calendar
+from backend.booking_store import BookingStore
+from backend.fake_calendar import FakeCalendar
+from backend.http_cache import ResponseCache
+
+DAY = '2030-01-07'
+START = datetime(2030, 1, 7, 10, 0, tzinfo=timezone.utc)
+
+
+class TestConditionalAvailability(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calendar = FakeCalendar()
+        for target, value in [
+            ("get_calendar_service", lambda: self.calendar),
+            ("_booking_store", BookingStore(os.path.join(self.tmp.name, "bookings.db"))),
+        ]:
+            patcher = mock.patch.object(google_calendar, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(booking_app, "_responses", ResponseCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+        self.addCleanup(google_calendar._busy_cache.invalidate)
+        self.client = booking_app.app.test_client()
+
+    def test_not_modified_skips_slot_computation(self):
+        """A matching If-None-Match gets 304 without computing slots or calling Google again"""
+        response = self.client.get(f'/api/available_slots/{DAY}')
+        etag = response.headers['ETag']
+        self.assertIn('stale-while-revalidate=', response.headers['Cache-Control'])
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+
+        with mock.patch.object(google_calendar, "free_slots_range",
+                               side_effect=AssertionError("slots recomputed")):
+            response = self.client.get(f'/api/available_slots/{DAY}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(self.calendar.calls["list"], 1)
+
+    def test_booking_changes_etag(self):
+        """A new booking on the day yields a new ETag and a full response"""
+        first = self.client.get(f'/api/available_slots/{DAY}')
+        google_calendar.create_event("Consultation", START, START + timedelta(minutes=30), "c@example.com")
+
+        second = self.client.get(f'/api/available_slots/{DAY}', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(len(second.get_json()['slots']), len(first.get_json()['slots']) - 1)
+
+    def test_serialized_once_per_generation(self):
+        """Repeated polls reuse the serialized bytes, tokens included"""
+        first = self.client.get(f'/api/available_slots/{DAY}')
+        second = self.client.get(f'/api/available_slots/{DAY}')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(booking_app._responses.stats()["hits"], 1)
+
+    def test_large_ranges_are_gzipped(self):
+        """Range responses are gzip-encoded for clients that accept it, under their own ETag"""
+        url = '/api/availability?from=2030-01-07&to=2030-01-20'
+        plain = self.client.get(url)
+        zipped = self.client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(zipped.headers['Content-Encoding'], 'gzip')
+        self.assertLess(len(zipped.data), len(plain.data))
+        self.assertEqual(json.loads(gzip.decompress(zipped.data)), plain.get_json())
+        self.assertNotEqual(zipped.headers['ETag'], plain.headers['ETag'])
+
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': zipped.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], zipped.headers['ETag'])
+
+    def test_available_dates_revalidates(self):
+        """The date list answers If-None-Match with 304 until the day changes"""
+        etag = self.client.get('/api/available_dates').headers['ETag']
+        response = self.client.get('/api/available_dates', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.interval_tree import IntervalTree
+
+BASE = datetime(2030, 1, 7, tzinfo=timezone.utc)
+
+
+def at(minutes):
+    return BASE + timedelta(minutes=minutes)
+
+
+class TestIntervalTree(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        """Overlap, stab and overlaps() agree with a linear scan through inserts and removes"""
+        rng = random.Random(11)
+        tree, intervals = IntervalTree(), []
+        for n in range(2000):
+            start = rng.randrange(10000)
+            interval = (start, start + rng.choice((0, 5, 30, 60, 600, 4000)), n)
+            tree.insert(*interval)
+            intervals.append(interval)
+            if rng.random() < 0.3:
+                victim = intervals.pop(rng.randrange(len(intervals)))
+                self.assertTrue(tree.remove(*victim))
+
+        self.assertEqual(len(tree), len(intervals))
+        self.assertEqual(list(tree), sorted(intervals))
+        for _ in range(300):
+            lo = rng.randrange(-100, 15000)
+            hi = lo + rng.randrange(1, 200)
+            expected = sorted(i for i in intervals if i[0] < hi and i[1] > lo)
+            self.assertEqual(tree.overlapping(lo, hi), expected)
+            self.assertEqual(tree.overlaps(lo, hi), bool(expected))
+            self.assertEqual(tree.stab(lo), sorted(i for i in intervals if i[0] <= lo < i[1]))
+
+    def test_stays_balanced(self):
+        """Sorted inserts keep the height logarithmic"""
+        tree = IntervalTree((n, n + 1) for n in range(4096))
+        self.assertLessEqual(tree._root.height, 1.45 * math.log2(4096 + 2))
+        for n in range(0, 4096, 2):
+            tree.remove(n, n + 1)
+        self.assertLessEqual(tree._root.height, 1.45 * math.log2(2048 + 2))
+        self.assertFalse(tree.remove(0, 1))
+
+    def test_next_free_gap(self):
+        """next_free skips chains of touching and overlapping intervals"""
+        tree = IntervalTree([(at(0), at(30), "a"), (at(30), at(60), "b"), (at(45), at(120), "c"),
+                             (at(150), at(180), "d")])
+        self.assertEqual(tree.next_free(at(10), timedelta(minutes=30)), at(120))
+        self.assertEqual(tree.next_free(at(10), timedelta(minutes=40)), at(180))
+        self.assertEqual(tree.next_free(at(10), timedelta(minutes=40), until=at(220)), at(180))
+        self.assertIsNone(tree.next_free(at(10), timedelta(minutes=40), until=at(219)))
+        self.assertEqual(tree.stab(at(50)), [(at(30), at(60), "b"), (at(45), at(120), "c")])
+
+
+if __name__ == '__main__':
+    unittest.main()
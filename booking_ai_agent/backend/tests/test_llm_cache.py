@@ -0,0 +1,102 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import date
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import groq_provider
+from backend.llm_cache import LLMCache, fuzzy_text
+
+TODAY = date(2025, 10, 1)  # A Wednesday
+
+
+class TestFuzzyText(unittest.TestCase):
+
+    def test_relative_and_absolute_dates_match(self):
+        """Relative, weekday and spelled-out dates resolve to the same key text"""
+        expected = "book 2025-10-02 at 15:00"
+        for text in ["Book tomorrow at 3 PM!", "book  thursday at 3pm", "book Oct 2nd at 15:00",
+                     "book 2nd October at 3:00 p.m.", "book 2025-10-2 at 15:00"]:
+            self.assertEqual(fuzzy_text(text, TODAY), expected, text)
+
+    def test_next_weekday_kept_distinct(self):
+        """'next' weekdays keep their qualifier"""
+        self.assertEqual(fuzzy_text("show slots next wednesday", TODAY), "show slots next 2025-10-08")
+        self.assertEqual(fuzzy_text("show slots wednesday", TODAY), "show slots 2025-10-01")
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = [1000.0]
+        self.clock = lambda: self.now[0]
+
+    def test_lru_and_ttl(self):
+        """Entries expire after ttl and the least recently used is evicted"""
+        cache = LLMCache(max_entries=2, ttl=10, clock=self.clock)
+        cache.put(None, "a", "m", "A")
+        cache.put(None, "b", "m", "B")
+        self.assertEqual(cache.get(None, " a ", "m"), "A")
+        cache.put(None, "c", "m", "C")
+        self.assertIsNone(cache.get(None, "b", "m"))
+        self.assertIsNone(cache.get(None, "a", "other-model"))
+        self.now[0] += 11
+        self.assertIsNone(cache.get(None, "a", "m"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 3, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 0.25)
+
+    def test_disk_tier_survives_restart(self):
+        """A new cache over the same file answers from disk"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "llm.db")
+            LLMCache(path=path, ttl=10, clock=self.clock).put("sys", "hello", "m", "hi")
+            cache = LLMCache(path=path, ttl=10, clock=self.clock)
+            self.assertEqual(cache.get("sys", "hello", "m"), "hi")
+            self.assertEqual(cache.get("sys", "hello", "m"), "hi")
+            self.assertEqual((cache.stats()["disk_hits"], cache.stats()["memory_hits"]), (1, 1))
+            self.now[0] += 11
+            self.assertIsNone(LLMCache(path=path, ttl=10, clock=self.clock).get("sys", "hello", "m"))
+
+    def test_fuzzy_key(self):
+        """Fuzzy keys match near-identical prompts"""
+        cache = LLMCache(fuzzy=True, today=lambda: TODAY)
+        cache.put(None, "book tomorrow at 3pm", "m", "answer")
+        self.assertEqual(cache.get(None, "Book Thursday at 15:00.", "m"), "answer")
+
+
+class TestAskGroqCache(unittest.TestCase):
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(groq_provider, "GROQ_API_KEY", "test"),
+            mock.patch.object(groq_provider, "_llm_cache", LLMCache()),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = mock.Mock()
+        patcher = mock.patch.object(groq_provider, "get_groq_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeat_prompt_skips_api(self):
+        """A repeated prompt is answered from the cache"""
+        self.client.complete.return_value = "sure"
+        self.assertEqual(groq_provider.ask_groq("hello"), "sure")
+        self.assertEqual(groq_provider.ask_groq("hello"), "sure")
+        self.assertEqual(self.client.complete.call_count, 1)
+        self.assertEqual(groq_provider.llm_cache_stats()["hits"], 1)
+
+    def test_errors_not_cached(self):
+        """Failed calls are not stored"""
+        self.client.complete.side_effect = [groq_provider.requests.exceptions.Timeout(), "ok"]
+        self.assertTrue(groq_provider.ask_groq("hello").startswith("Error"))
+        self.assertEqual(groq_provider.ask_groq("hello"), "ok")
+
+
+if __name__ == '__main__':
+    unittest.main()
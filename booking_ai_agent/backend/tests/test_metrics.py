@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import app as booking_app
+from backend.metrics import Counter, Histogram, Registry, timed
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_prometheus_text_format(self):
+        """Counters and cumulative histogram buckets render in the exposition format"""
+        calls = Counter("calls_total", "Calls.", ("service",), registry=self.registry)
+        latency = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=self.registry)
+        calls.labels("calendar").inc()
+        calls.labels("calendar").inc(2)
+        calls.labels('we"ird').inc()
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+        self.registry.register_stats("cache", lambda: {"hits": 4, "hit_rate": 0.5, "name": "x"})
+
+        text = self.registry.render()
+        self.assertIn('calls_total{service="calendar"} 3\n', text)
+        self.assertIn('calls_total{service="we\\"ird"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 2\n', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 3\n', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4\n', text)
+        self.assertIn('latency_seconds_count 4\n', text)
+        self.assertIn('cache_hit_rate 0.5\n', text)
+        self.assertNotIn('cache_name', text)
+
+    def test_timed_records_failures(self):
+        """timed() observes failing calls too (its overhead is measured in benchmarks/test_hot_paths.py)"""
+        stages = Histogram("stage_seconds", "Stages.", ("stage",), registry=self.registry)
+
+        @timed("boom", stages)
+        def boom():
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            boom()
+        self.assertEqual(stages.labels("boom").count, 1)
+
+    def test_metrics_endpoint(self):
+        """/metrics reports request latency by endpoint and registered stats"""
+        client = booking_app.app.test_client()
+        client.get('/health')
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain; version=0.0.4'))
+        text = response.get_data(as_text=True)
+        self.assertIn('http_request_duration_seconds_count{endpoint="health",method="GET",status="200"}', text)
+        self.assertIn('# TYPE booking_stage_seconds histogram', text)
+        self.assertIn('busy_cache_hits ', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python 3.8
+    from backports.zoneinfo import ZoneInfo
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import google_calendar
+from backend.booking_store import BookingStore
+from backend.fake_calendar import FakeCalendar
+from backend.recurrence import (
+    RecurrenceConflict, RecurrenceRule, SeriesCache, UnsupportedRecurrence, busy_from_events, expand,
+)
+from backend.reservations import ReservationTable
+
+NEW_YORK = ZoneInfo("America/New_York")
+START = datetime(2030, 1, 7, 10, 0, tzinfo=timezone.utc)  # A Monday
+
+
+def master(event_id, start, minutes, rule, **extra):
+    return dict({
+        "id": event_id,
+        "status": "confirmed",
+        "start": {"dateTime": start.isoformat()},
+        "end": {"dateTime": (start + timedelta(minutes=minutes)).isoformat()},
+        "recurrence": [rule],
+    }, **extra)
+
+
+class TestRecurrenceRule(unittest.TestCase):
+
+    def test_weekly_count_and_round_trip(self):
+        """Weekly COUNT rules yield that many occurrences and print back unchanged"""
+        rule = RecurrenceRule.parse("RRULE:FREQ=WEEKLY;COUNT=10")
+        starts = list(rule.starts(START))
+        self.assertEqual(len(starts), 10)
+        self.assertEqual(starts[-1], START + timedelta(weeks=9))
+        self.assertEqual(str(rule), "RRULE:FREQ=WEEKLY;COUNT=10")
+
+    def test_byday_interval_and_until(self):
+        """BYDAY picks weekdays, INTERVAL skips weeks and UNTIL is inclusive"""
+        rule = RecurrenceRule.parse("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;UNTIL=20300121T100000Z")
+        self.assertEqual([start.date() for start in rule.starts(START)],
+                         [date(2030, 1, 7), date(2030, 1, 10), date(2030, 1, 21)])
+
+    def test_monthly_skips_missing_days(self):
+        """A series on the 31st skips shorter months"""
+        rule = RecurrenceRule.parse("FREQ=MONTHLY;COUNT=3")
+        starts = list(rule.starts(datetime(2030, 1, 31, 9, tzinfo=timezone.utc)))
+        self.assertEqual([start.month for start in starts], [1, 3, 5])
+
+    def test_keeps_wall_clock_across_dst(self):
+        """Occurrences stay at 9:00 local time when daylight saving starts"""
+        start = datetime(2030, 3, 4, 9, tzinfo=NEW_YORK)
+        occurrences = list(expand("RRULE:FREQ=WEEKLY;COUNT=3", start, start + timedelta(hours=1)))
+        self.assertEqual([s.astimezone(timezone.utc).hour for s, _ in occurrences], [14, 13, 13])
+
+    def test_unsupported_parts_raise(self):
+        """Rules the engine cannot expand are reported, not guessed"""
+        for rule in ("FREQ=MONTHLY;BYDAY=2MO", "FREQ=WEEKLY;BYSETPOS=1", "FREQ=HOURLY"):
+            with self.assertRaises(UnsupportedRecurrence):
+                RecurrenceRule.parse(rule)
+
+
+class TestBusyFromEvents(unittest.TestCase):
+
+    def test_expands_masters_with_exceptions(self):
+        """EXDATEs, moved and cancelled instances are applied to the local expansion"""
+        series = master("m1", START, 60, "RRULE:FREQ=DAILY", recurrence=[
+            "RRULE:FREQ=DAILY", "EXDATE:20300109T100000Z"])
+        moved = {"id": "m1_x", "status": "confirmed", "recurringEventId": "m1",
+                 "originalStartTime": {"dateTime": (START + timedelta(days=3)).isoformat()},
+                 "start": {"dateTime": (START + timedelta(days=3, hours=4)).isoformat()},
+                 "end": {"dateTime": (START + timedelta(days=3, hours=5)).isoformat()}}
+        cancelled = {"id": "m1_y", "status": "cancelled", "recurringEventId": "m1",
+                     "originalStartTime": {"dateTime": (START + timedelta(days=4)).isoformat()}}
+        cache = SeriesCache()
+
+        busy = busy_from_events([series, moved, cancelled], START, START + timedelta(days=6), cache)
+        self.assertEqual([start - START for start, _ in busy],
+                         [timedelta(days=0), timedelta(days=1), timedelta(days=3, hours=4), timedelta(days=5)])
+
+        busy_from_events([series], START + timedelta(days=30), START + timedelta(days=31), cache)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "evictions": 0, "series": 1})
+
+
+class TestRecurringBookings(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calendar = FakeCalendar()
+        for target, value in [
+            ("get_calendar_service", lambda: self.calendar),
+            ("_booking_store", BookingStore(os.path.join(self.tmp.name, "bookings.db"))),
+            ("_reservations", ReservationTable()),
+            ("_series_cache", SeriesCache()),
+        ]:
+            patcher = mock.patch.object(google_calendar, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+        self.addCleanup(google_calendar._busy_cache.invalidate)
+
+    def test_conflicting_occurrence_blocks_insert(self):
+        """A clash in week 4 is reported before anything is inserted"""
+        clash = START + timedelta(weeks=3)
+        self.calendar.add_event(clash, clash + timedelta(minutes=30))
+        with self.assertRaises(RecurrenceConflict) as raised:
+            google_calendar.book_slot("Consultation", START, START + timedelta(minutes=30), "c@example.com",
+                                      recurring=True)
+        self.assertEqual(raised.exception.conflicts, [(clash, clash + timedelta(minutes=30))])
+        self.assertEqual(self.calendar.calls["insert"], 0)
+        self.assertEqual(self.calendar.calls["list"], 1)  # One range fetch for all ten weeks
+
+    def test_series_is_busy_months_ahead(self):
+        """After booking, later occurrences are busy from local expansion of the master"""
+        google_calendar.book_slot("Consultation", START, START + timedelta(minutes=30), "c@example.com",
+                                  recurring=True)
+        google_calendar._busy_cache.invalidate()
+        week_nine = START + timedelta(weeks=8)
+        day = week_nine.astimezone(google_calendar.AVAILABILITY_RULES.tz).date()
+        self.assertIn((week_nine, week_nine + timedelta(minutes=30)), google_calendar.get_booked_slots(day))
+        self.assertEqual(google_calendar.get_booked_slots(day + timedelta(weeks=2)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import google_calendar
+from backend.booking_store import BookingStore
+from backend.fake_calendar import FakeCalendar
+from backend.reservations import ReservationTable, SlotConflict
+
+# Far enough ahead that committed reservations stay live during the test
+BASE = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=30)
+
+
+def slot(n):
+    return BASE + timedelta(minutes=30 * n), BASE + timedelta(minutes=30 * (n + 1))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestReservationTable(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.table = ReservationTable(hold_ttl=60, clock=self.clock)
+
+    def test_overlapping_hold_rejected(self):
+        """A second hold on an overlapping interval conflicts"""
+        self.table.hold("primary", *slot(0))
+        with self.assertRaises(SlotConflict):
+            self.table.hold("primary", BASE + timedelta(minutes=15), BASE + timedelta(minutes=45))
+        self.table.hold("primary", *slot(1))
+        self.table.hold("other", *slot(0))
+
+    def test_hold_expires(self):
+        """Uncommitted holds lapse after the TTL"""
+        self.table.hold("primary", *slot(0))
+        self.clock.now = 61
+        self.table.hold("primary", *slot(0))
+        self.assertEqual(self.table.stats()["expired"], 1)
+
+    def test_commit_outlives_ttl(self):
+        """Committed reservations stay until the slot is over"""
+        hold_id = self.table.hold("primary", *slot(0))
+        self.assertTrue(self.table.commit(hold_id))
+        self.clock.now = 10_000
+        self.assertFalse(self.table.is_free("primary", *slot(0)))
+
+    def test_lapsed_entries_are_swept(self):
+        """Expired holds and past bookings leave the table without a query touching them"""
+        for n in range(5):
+            self.table.hold("primary", *slot(n))
+        past = datetime.now(timezone.utc) - timedelta(hours=2)
+        self.assertTrue(self.table.commit(self.table.hold("primary", past, past + timedelta(minutes=30))))
+        renewed = self.table.hold("other", *slot(0))
+        self.clock.now = 50
+        self.table.hold("other", *slot(0), reservation_id=renewed)
+
+        self.clock.now = 61
+        self.table.hold("third", *slot(0))
+        self.assertEqual(self.table.stats()["active"], 2)
+        self.assertFalse(self.table.is_free("other", *slot(0)))
+        self.assertEqual(len(self.table._by_calendar["primary"]), 0)
+
+    def test_release_and_renew(self):
+        """Released slots are free again; renewing keeps the same id"""
+        hold_id = self.table.hold("primary", *slot(0))
+        self.assertEqual(self.table.hold("primary", *slot(0), reservation_id=hold_id), hold_id)
+        self.assertTrue(self.table.release(hold_id))
+        self.assertTrue(self.table.is_free("primary", *slot(0)))
+
+
+class TestConcurrentBookings(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calendar = FakeCalendar(latency=0.002)
+        for target, value in [
+            ("get_calendar_service", lambda: self.calendar),
+            ("_booking_store", BookingStore(os.path.join(self.tmp.name, "bookings.db"))),
+            ("_reservations", ReservationTable()),
+        ]:
+            patcher = mock.patch.object(google_calendar, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+
+    def test_no_double_booking_under_contention(self):
+        """Hundreds of concurrent requests for 10 slots create exactly 10 events"""
+        rng = random.Random(3)
+        requests = [rng.randrange(10) for _ in range(400)]
+
+        def book(n):
+            try:
+                google_calendar.book_slot("Consultation", *slot(n), client_email="c%d@example.com" % n)
+                return "booked"
+            except SlotConflict:
+                return "conflict"
+
+        with ThreadPoolExecutor(max_workers=64) as pool:
+            outcomes = Counter(pool.map(book, requests))
+
+        events = Counter(e["start"]["dateTime"] for e in self.calendar.all_events())
+        self.assertEqual(outcomes["booked"], len(set(requests)))
+        self.assertEqual(outcomes["conflict"], len(requests) - len(set(requests)))
+        self.assertTrue(all(count == 1 for count in events.values()))
+        self.assertEqual(self.calendar.calls["insert"], len(set(requests)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import threading
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.service_manager import GoogleServiceManager
+
+
+class FakeCredentials:
+    def __init__(self, expires_in):
+        self.expiry = datetime.utcnow() + expires_in
+        self.refreshed = 0
+
+    @property
+    def valid(self):
+        return self.expiry > datetime.utcnow()
+
+    def refresh(self, request):
+        self.refreshed += 1
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+class TestGoogleServiceManager(unittest.TestCase):
+
+    def make_manager(self, creds):
+        return GoogleServiceManager(
+            "calendar", "v3",
+            load_credentials=lambda: creds,
+            build_service=lambda c: object(),
+        )
+
+    def test_service_reused_within_thread(self):
+        """Repeated calls on one thread return the same service"""
+        manager = self.make_manager(FakeCredentials(timedelta(hours=1)))
+        first = manager.get_service()
+        self.assertIs(manager.get_service(), first)
+        self.assertEqual(manager.stats()["hits"], 1)
+        self.assertEqual(manager.stats()["misses"], 1)
+        self.assertEqual(manager.stats()["credential_loads"], 1)
+
+    def test_one_service_per_thread(self):
+        """Each worker thread builds its own service"""
+        manager = self.make_manager(FakeCredentials(timedelta(hours=1)))
+        services = []
+        threads = [threading.Thread(target=lambda: services.append(manager.get_service())) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len({id(s) for s in services}), 4)
+        self.assertEqual(manager.stats()["credential_loads"], 1)
+
+    def test_proactive_refresh(self):
+        """Credentials close to expiry are refreshed, not reloaded"""
+        creds = FakeCredentials(timedelta(minutes=1))
+        manager = self.make_manager(creds)
+        manager.get_service()
+        self.assertEqual(creds.refreshed, 1)
+        self.assertEqual(manager.stats()["refreshes"], 1)
+        manager.get_service()
+        self.assertEqual(creds.refreshed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import google_calendar
+from backend.booking_store import BookingStore
+from backend.busy_cache import BusyIntervalCache
+from backend.fake_calendar import FakeCalendar
+from backend.fake_redis import FakeRedis
+from backend.shared_cache import SharedBusyCache, SingleFlight, pack_intervals, unpack_intervals
+
+DAY = date(2030, 1, 7)
+START = datetime(2030, 1, 7, 10, 0, tzinfo=timezone.utc)
+
+
+class _BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("redis is down")
+        return fail
+
+
+class TestPackingAndSingleFlight(unittest.TestCase):
+
+    def test_pack_round_trip(self):
+        """Intervals pack to 16 bytes each and unpack to the same instants"""
+        busy = [(START, START + timedelta(minutes=30)), (START + timedelta(hours=2), START + timedelta(hours=3))]
+        data = pack_intervals(busy)
+        self.assertEqual(len(data), 32)
+        self.assertEqual(unpack_intervals(data), busy)
+        self.assertEqual(pack_intervals([]), b"")
+        self.assertEqual(unpack_intervals(b""), [])
+
+    def test_single_flight_shares_result_and_error(self):
+        """Overlapping calls with one key run the function once"""
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            release.wait(2)
+            return [1, 2]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        while flight.stats()["coalesced"] < 9:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(calls), results), (1, [[1, 2]] * 10))
+
+        with self.assertRaises(ZeroDivisionError):
+            flight.do("k", lambda: 1 / 0)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+
+class TestSharedBusyCache(unittest.TestCase):
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.worker_a = SharedBusyCache(self.redis, poll_interval=0.005)
+        self.worker_b = SharedBusyCache(self.redis, poll_interval=0.005)
+        self.addCleanup(self.worker_a.close)
+        self.addCleanup(self.worker_b.close)
+
+    def test_cold_day_fetched_once_across_workers(self):
+        """Two processes missing the same day make one fetch; the other waits for it"""
+        fetches = []
+
+        def fetch():
+            fetches.append(1)
+            time.sleep(0.05)
+            return [(START, START + timedelta(hours=1))]
+
+        results = []
+        threads = [threading.Thread(target=lambda w=worker: results.append(w.get_or_fetch("primary", DAY, fetch)))
+                   for worker in (self.worker_a, self.worker_b)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(self.worker_b.get_many("primary", [DAY, DAY + timedelta(days=1)]), {DAY: results[0]})
+
+    def test_invalidate_broadcasts_and_blocks_stale_puts(self):
+        """Invalidation reaches other workers and discards fetches that started before it"""
+        received = []
+        heard = threading.Event()
+        self.worker_b.listen(lambda calendar_id, day: (received.append((calendar_id, day)), heard.set()))
+        self.worker_a.listen(lambda calendar_id, day: received.append("own"))
+        time.sleep(0.05)
+
+        self.worker_a.put("primary", DAY, [])
+        generation = self.worker_b.generation("primary", DAY)
+        self.worker_a.invalidate("primary", DAY)
+        self.assertTrue(heard.wait(2))
+        self.assertEqual(received, [("primary", DAY)])
+        self.assertIsNone(self.worker_b.get("primary", DAY))
+
+        self.assertFalse(self.worker_b.put("primary", DAY, [], generation))
+        self.assertEqual(self.worker_b.stats()["stale_skips"], 1)
+
+    def test_lock_taken_over_is_not_released(self):
+        """A holder whose lock expired mid-fetch leaves the new holder's lock alone"""
+        lock_key = self.worker_a._key("primary", DAY) + ":lock"
+
+        def fetch():
+            self.redis.set(lock_key, "another-worker")  # Ours expired and someone else took it
+            return []
+
+        self.worker_a.get_or_fetch("primary", DAY, fetch)
+        self.assertEqual(self.redis.get(lock_key), b"another-worker")
+
+    def test_redis_errors_are_misses(self):
+        """A Redis outage falls back to fetching instead of failing"""
+        cache = SharedBusyCache(_BrokenRedis())
+        self.assertEqual(cache.get_or_fetch("primary", DAY, lambda: []), [])
+        cache.invalidate("primary", DAY)
+        self.assertGreater(cache.stats()["errors"], 0)
+
+
+class TestGoogleCalendarSharedTier(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calendar = FakeCalendar(latency=0.05)
+        self.redis = FakeRedis()
+        self.shared = SharedBusyCache(self.redis)
+        self.addCleanup(self.shared.close)
+        for target, value in [
+            ("get_calendar_service", lambda: self.calendar),
+            ("_booking_store", BookingStore(os.path.join(self.tmp.name, "bookings.db"))),
+            ("_shared_cache", self.shared),
+        ]:
+            patcher = mock.patch.object(google_calendar, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+        self.addCleanup(google_calendar._busy_cache.invalidate)
+
+    def test_hundred_concurrent_requests_one_fetch(self):
+        """100 simultaneous misses for one day make exactly one Calendar call"""
+        barrier = threading.Barrier(100)
+        results = []
+
+        def request():
+            barrier.wait()
+            results.append(google_calendar.get_booked_slots(DAY))
+
+        threads = [threading.Thread(target=request) for _ in range(100)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calendar.calls["list"], 1)
+        self.assertEqual(len(results), 100)
+        self.assertIsNotNone(self.shared.get("primary", DAY))
+
+    def test_other_worker_reads_shared_tier(self):
+        """A worker with a cold local cache is served from Redis, not Google"""
+        self.calendar.add_event(START, START + timedelta(hours=1))
+        google_calendar.get_booked_slots_range(DAY, DAY + timedelta(days=2))
+        google_calendar._busy_cache.invalidate()  # A freshly started worker
+
+        self.assertEqual(google_calendar.get_booked_slots(DAY), [(START, START + timedelta(hours=1))])
+        google_calendar.get_booked_slots_range(DAY, DAY + timedelta(days=2))
+        self.assertEqual(self.calendar.calls["list"], 1)
+
+    def test_invalidation_during_fetch_is_not_cached(self):
+        """Another worker's booking made while we fetch is not overwritten by our stale result"""
+        def booked_elsewhere():
+            self.shared.invalidate("primary", DAY)
+            google_calendar._busy_cache.invalidate("primary", DAY)  # What its broadcast does here
+
+        list_busy, fetch_range = google_calendar._list_busy, google_calendar._fetch_busy_range
+        with mock.patch.object(google_calendar, "_list_busy",
+                               lambda *args: (list_busy(*args), booked_elsewhere())[0]):
+            google_calendar.get_booked_slots(DAY)
+        with mock.patch.object(google_calendar, "_fetch_busy_range",
+                               lambda *args: (fetch_range(*args), booked_elsewhere())[0]):
+            google_calendar.get_booked_slots_range(DAY, DAY + timedelta(days=1))
+        self.assertIsNone(google_calendar._busy_cache.get("primary", DAY))
+        self.assertIsNone(self.shared.get("primary", DAY))
+        self.assertIsNotNone(google_calendar._busy_cache.get("primary", DAY + timedelta(days=1)))
+        self.assertEqual(google_calendar._busy_cache.stats()["stale_skips"], 2)
+
+    def test_create_event_invalidates_other_workers(self):
+        """A booking drops the day from Redis and from other workers' local caches"""
+        other_local = BusyIntervalCache()
+        other = SharedBusyCache(self.redis)
+        self.addCleanup(other.close)
+        dropped = threading.Event()
+
+        def on_invalidate(calendar_id, day):
+            other_local.invalidate(calendar_id, day)
+            dropped.set()
+
+        other.listen(on_invalidate)
+        time.sleep(0.05)
+        other_local.put("primary", DAY, other.get_or_fetch("primary", DAY, lambda: []))
+
+        google_calendar.create_event("Consultation", START, START + timedelta(minutes=30), "c@example.com")
+        self.assertTrue(dropped.wait(2))
+        self.assertIsNone(other_local.get("primary", DAY))
+        self.assertIsNone(self.shared.get("primary", DAY))
+        self.assertEqual(len(google_calendar.get_booked_slots(DAY)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import app as booking_app
+from backend import google_calendar
+from backend.booking_store import BookingStore
+from backend.fake_calendar import FakeCalendar
+from backend.reservations import ReservationTable
+from backend.slot_tokens import InvalidSlotToken, SlotTokenSigner, availability_version
+
+START = datetime(2030, 1, 7, 10, 0, tzinfo=timezone.utc)
+END = START + timedelta(minutes=30)
+
+
+class TestSlotTokenSigner(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1_000_000.0
+        self.signer = SlotTokenSigner(b"secret", ttl=60, clock=lambda: self.now)
+
+    def test_round_trip(self):
+        """A token names its calendar, slot and availability version"""
+        slot = self.signer.verify(self.signer.issue("agent|1@example.com", START, END, "v1"))
+        self.assertEqual((slot.calendar_id, slot.start, slot.end, slot.version),
+                         ("agent|1@example.com", START, END, "v1"))
+
+    def test_rejects_forged_tampered_and_expired(self):
+        """Other keys, edited payloads, garbage and old tokens do not verify"""
+        token = self.signer.issue("primary", START, END)
+        forged = SlotTokenSigner(b"other").issue("primary", START, END)
+        body, signature = token.split(".")
+        tampered = self.signer.issue("primary", START, END + timedelta(hours=1)).split(".")[0] + "." + signature
+        for bad in (forged, tampered, "", "no-dot", "a.b.c", "é.é", body + ".", "x" * 600):
+            with self.assertRaises(InvalidSlotToken):
+                self.signer.verify(bad)
+
+        self.now += 61
+        with self.assertRaises(InvalidSlotToken):
+            self.signer.verify(token)
+
+    def test_aligned_expiry_makes_tokens_deterministic(self):
+        """Tokens issued in the same half-TTL window are identical and live ttl/2 to ttl"""
+        self.now = 1_000_020.0
+        first = self.signer.issue("primary", START, END, "v1", self.signer.aligned_expiry())
+        self.now += 5
+        self.assertEqual(self.signer.issue("primary", START, END, "v1", self.signer.aligned_expiry()), first)
+        self.assertTrue(30 <= self.signer.verify(first).expires_at - self.now <= 60)
+
+    def test_missing_secret_fails_in_production(self):
+        """Without SLOT_TOKEN_SECRET, production refuses to start and elsewhere a per-process key is logged"""
+        with mock.patch.object(google_calendar, "SLOT_TOKEN_SECRET", None):
+            with mock.patch.object(google_calendar, "PRODUCTION", True):
+                with self.assertRaises(RuntimeError):
+                    google_calendar._slot_token_secret()
+            with self.assertLogs(google_calendar.__name__, "WARNING"):
+                self.assertEqual(len(google_calendar._slot_token_secret()), 32)
+        with mock.patch.object(google_calendar, "SLOT_TOKEN_SECRET", "shared"):
+            self.assertEqual(google_calendar._slot_token_secret(), "shared")
+
+    def test_version_tracks_busy_intervals(self):
+        """The availability version changes when the day's busy list does"""
+        busy = [(START, END)]
+        self.assertEqual(availability_version(busy), availability_version(list(busy)))
+        later = busy + [(END, END + timedelta(hours=1))]
+        self.assertNotEqual(availability_version(busy), availability_version(later))
+
+
+class TestSlotTokenBooking(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.calendar = FakeCalendar()
+        for target, value in [
+            ("get_calendar_service", lambda: self.calendar),
+            ("_booking_store", BookingStore(os.path.join(self.tmp.name, "bookings.db"))),
+            ("_reservations", ReservationTable()),
+        ]:
+            patcher = mock.patch.object(google_calendar, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(booking_app, "ASYNC_BOOKINGS", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        google_calendar._busy_cache.invalidate()
+        self.addCleanup(google_calendar._busy_cache.invalidate)
+        self.client = booking_app.app.test_client()
+
+    def offers(self):
+        data = self.client.get('/api/available_slots/2030-01-07').get_json()
+        self.assertEqual(len(data['slots']), len(data['tokens']))
+        return dict(zip(data['slots'], data['tokens']))
+
+    def test_booking_with_token_skips_availability_fetch(self):
+        """Booking by token needs no list call beyond the one that offered the slot"""
+        offers = self.offers()
+        label, token = next(iter(offers.items()))
+        response = self.client.post('/api/create_booking', json={'email': 'c@example.com', 'slot_token': token})
+        self.assertEqual(response.status_code, 200, response.get_json())
+        self.assertEqual(response.get_json()['time_slot'], label)
+        self.assertEqual(self.calendar.calls["list"], 1)
+        self.assertEqual(self.calendar.calls["insert"], 1)
+
+    def test_slot_taken_after_offer_conflicts(self):
+        """A token for a slot that became busy is refused; unaffected slots still book"""
+        tokens = list(self.offers().values())
+        first = google_calendar._slot_signer.verify(tokens[0])
+        self.calendar.add_event(first.start, first.end)
+        google_calendar._busy_cache.invalidate()
+
+        response = self.client.post('/api/create_booking', json={'email': 'c@example.com', 'slot_token': tokens[0]})
+        self.assertEqual(response.status_code, 409)
+        response = self.client.post('/api/create_booking', json={'email': 'c@example.com', 'slot_token': tokens[-1]})
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_token_and_legacy_label(self):
+        """Forged tokens get 400; clients without tokens still book by date and label"""
+        response = self.client.post('/api/hold_slot', json={'slot_token': 'forged.token'})
+        self.assertEqual(response.status_code, 400)
+
+        label = next(iter(self.offers()))
+        response = self.client.post('/api/create_booking',
+                                    json={'email': 'c@example.com', 'date': '2030-01-07', 'time': label})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+import subprocess
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend import warmup
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_heavy_modules_deferred(self):
+        """Importing the app and agent loads no Google client or dateparser modules"""
+        script = (
+            "import sys, app, backend.agent\n"
+            "heavy = ['googleapiclient.discovery', 'google_auth_oauthlib', 'google.oauth2.service_account',"
+            " 'dateparser']\n"
+            "print(','.join(m for m in heavy if m in sys.modules))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True,
+                                env=dict(os.environ, GOOGLE_CREDENTIALS_FILE="/nonexistent.json"))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_health(self):
+        """/health answers without touching Google"""
+        import app
+
+        with mock.patch.object(app, "get_available_slots", side_effect=AssertionError("no Google calls")):
+            response = app.app.test_client().get('/health')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["status"], "ok")
+
+    def test_warm_up_skips_failing_steps(self):
+        """A failing warm-up step is reported and the rest still run"""
+        ran = []
+
+        def broken():
+            raise FileNotFoundError("no token")
+
+        steps = [("broken", broken), ("ok", lambda: ran.append(True))]
+        with mock.patch.object(warmup, "STEPS", steps):
+            timings = warmup.warm_up()
+        self.assertEqual(timings["broken"], "skipped: no token")
+        self.assertIsInstance(timings["ok"], float)
+        self.assertEqual(ran, [True])
+        self.assertTrue(warmup.is_warm())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+# -----------------------------
+# Warm-up steps
+# -----------------------------
+# Heavy imports and client construction are deferred so a process can answer
+# /health right after start; these steps pay those costs in the background
+# instead of on the first real request.
+
+
+def _import_google_clients():
+    import google.auth.transport.requests  # noqa: F401
+    import googleapiclient.discovery  # noqa: F401
+    import googleapiclient.errors  # noqa: F401
+
+
+def _calendar_service():
+    from backend import google_calendar
+
+    # Without a saved token, loading credentials would start the interactive OAuth flow
+    if not os.path.exists(google_calendar.TOKEN_FILE):
+        raise FileNotFoundError(f"{google_calendar.TOKEN_FILE} not found")
+    google_calendar.get_calendar_service()
+
+
+def _date_parser():
+    from backend.booking_parser import _get_date_parser
+
+    _get_date_parser(None)
+
+
+def _groq_client():
+    from backend.groq_provider import get_groq_client
+
+    get_groq_client()
+
+
+STEPS = [
+    ("google_clients", _import_google_clients),
+    ("calendar_service", _calendar_service),
+    ("date_parser", _date_parser),
+    ("groq_client", _groq_client),
+]
+
+_warm = threading.Event()
+_thread = None
+_thread_lock = threading.Lock()
+_timings = {}
+
+
+def warm_up():
+    """
+    Runs every warm-up step, skipping the ones that fail (e.g. no credentials).
+
+    Returns:
+        dict: step name -> milliseconds taken, or "skipped: <reason>"
+    """
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            _timings[name] = f"skipped: {e}"
+        else:
+            _timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    _warm.set()
+    return dict(_timings)
+
+
+def start_warm_up():
+    """Starts warm_up in a daemon thread, once per process. Call after fork."""
+    global _thread
+    with _thread_lock:
+        if _thread is None or (not _thread.is_alive() and not _warm.is_set()):
+            _thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def is_warm():
+    return _warm.is_set()
+
+
+def warm_up_timings():
+    return dict(_timings)
@@ -0,0 +1,62 @@
+"""
+Agent assignment latency from the in-memory per-agent indexes.
+
+Builds a registry of N agents with a realistic busy week each and times
+assign() for random slots under every strategy, including the write-through
+mark_busy that follows a successful booking.
+
+Usage:
+    python benchmarks/bench_agent_assignment.py [agents] [assignments]
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.agents import STRATEGIES, Agent, AgentRegistry
+
+
+def build(agent_count, week, rng):
+    registry = AgentRegistry([Agent(f"agent{n}", priority=rng.randrange(5)) for n in range(agent_count)],
+                             tz=timezone.utc, buffer=timedelta(minutes=10))
+    for agent in registry.agents():
+        for day in week:
+            opening = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+            busy = [(opening + timedelta(minutes=30 * n), opening + timedelta(minutes=30 * n + 30))
+                    for n in range(18) if rng.random() < 0.6]
+            registry.load(agent.agent_id, day, busy)
+    return registry
+
+
+def main():
+    agent_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    assignments = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(7)
+    monday = date.today() - timedelta(days=date.today().weekday())
+    week = [monday + timedelta(days=n) for n in range(5)]
+
+    print(f"{agent_count} agents, {assignments} assignments per strategy")
+    for strategy in STRATEGIES:
+        registry = build(agent_count, week, rng)
+        slots = []
+        for _ in range(assignments):
+            start = (datetime.combine(rng.choice(week), datetime.min.time(), tzinfo=timezone.utc)
+                     + timedelta(hours=9, minutes=30 * rng.randrange(18)))
+            slots.append((start, start + timedelta(minutes=30)))
+
+        assigned = 0
+        started = time.perf_counter()
+        for start, end in slots:
+            agent = registry.assign(start, end, strategy=strategy)
+            if agent is not None:
+                registry.mark_busy(agent.agent_id, start, end)
+                assigned += 1
+        per_call = (time.perf_counter() - started) / assignments
+        print(f"{strategy:13} {per_call * 1e6:8.1f} µs/assignment  ({assigned} assigned)")
+
+
+if __name__ == "__main__":
+    main()
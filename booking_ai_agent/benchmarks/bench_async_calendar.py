@@ -0,0 +1,95 @@
+"""
+Serial vs concurrent busy-interval fetch for many calendars and days,
+against the local mock Calendar server (FakeGoogleServer).
+
+The serial loop issues one events.list per (calendar, day) over a keep-alive
+requests.Session, like calling get_booked_slots in a loop; the async layer
+fans the same requests out with bounded concurrency.
+
+Usage:
+    python benchmarks/bench_async_calendar.py [calendars] [days] [latency_ms] [concurrency]
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.async_calendar import AsyncCalendarClient
+from backend.calendar_sync import event_interval
+from backend.fake_google_server import FakeGoogleServer
+
+
+def bounds(day):
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def populate(calendar, calendar_ids, days):
+    for calendar_id in calendar_ids:
+        for day in days:
+            start = bounds(day)[0] + timedelta(hours=9)
+            for n in range(4):
+                calendar.add_event(start + timedelta(hours=2 * n), start + timedelta(hours=2 * n, minutes=45),
+                                   calendar_id=calendar_id)
+
+
+def serial(base_url, calendar_ids, days):
+    session = requests.Session()
+    result = {}
+    for calendar_id in calendar_ids:
+        for day in days:
+            time_min, time_max = bounds(day)
+            response = session.get(
+                f"{base_url}/calendar/v3/calendars/{calendar_id}/events",
+                params={"timeMin": time_min.isoformat(), "timeMax": time_max.isoformat(), "singleEvents": "true"},
+                headers={"Authorization": "Bearer token"},
+            )
+            response.raise_for_status()
+            result[(calendar_id, day)] = sorted(filter(None, map(event_interval, response.json()["items"])))
+    return result
+
+
+async def concurrent(base_url, calendar_ids, days, concurrency):
+    client = AsyncCalendarClient(lambda: "token", base_url=base_url, max_concurrency=concurrency)
+    try:
+        return await client.busy_many({
+            (calendar_id, day): (calendar_id, *bounds(day)) for calendar_id in calendar_ids for day in days
+        })
+    finally:
+        await client.aclose()
+
+
+def main():
+    calendars = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    days_count = int(sys.argv[2]) if len(sys.argv) > 2 else 14
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 80) / 1000
+    concurrency = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+
+    calendar_ids = [f"agent{n}@example.com" for n in range(calendars)]
+    days = [date.today() + timedelta(days=n) for n in range(days_count)]
+
+    with FakeGoogleServer(latency=latency) as server:
+        populate(server.calendar, calendar_ids, days)
+
+        started = time.perf_counter()
+        expected = serial(server.base_url, calendar_ids, days)
+        serial_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = asyncio.run(concurrent(server.base_url, calendar_ids, days, concurrency))
+        concurrent_seconds = time.perf_counter() - started
+
+    assert result == expected
+    print(f"{calendars} calendars x {days_count} days = {len(expected)} requests, "
+          f"{latency * 1000:.0f} ms latency, concurrency {concurrency}")
+    print(f"serial loop   {serial_seconds * 1000:9.1f} ms")
+    print(f"async fan-out {concurrent_seconds * 1000:9.1f} ms  ({serial_seconds / concurrent_seconds:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compares the scalar sweep engine with the NumPy occupancy grid on a
+multi-resource, multi-week "who is free for each slot" query.
+
+Usage:
+    python benchmarks/bench_availability_grid.py [resources] [days]
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.availability import AvailabilityRules, free_slots_range
+from backend.availability_grid import OccupancyGrid
+
+IST = timezone(timedelta(hours=5, minutes=30))
+RULES = AvailabilityRules(tz=IST)
+
+
+def make_calendars(resources, start_day, days, per_day=4, seed=7):
+    rng = random.Random(seed)
+    calendars = {}
+    for resource in resources:
+        intervals = []
+        for offset in range(days):
+            base = datetime.combine(start_day + timedelta(days=offset), datetime.min.time(), tzinfo=IST)
+            for _ in range(per_day):
+                start = base + timedelta(minutes=rng.randrange(8 * 60, 18 * 60, 15))
+                intervals.append((start.astimezone(timezone.utc),
+                                  (start + timedelta(minutes=rng.choice([30, 45, 60, 90]))).astimezone(timezone.utc)))
+        calendars[resource] = intervals
+    return calendars
+
+
+def scalar(calendars, start_day, days):
+    end_day = start_day + timedelta(days=days - 1)
+    free_by_slot = {}
+    for resource, intervals in calendars.items():
+        for slots in free_slots_range(start_day, end_day, intervals, RULES).values():
+            for slot in slots:
+                free_by_slot.setdefault(slot, set()).add(resource)
+    return free_by_slot
+
+
+def vectorized(calendars, start_day, days):
+    grid = OccupancyGrid(calendars.keys(), start_day, days, resolution_minutes=5, rules=RULES)
+    grid.paint(calendars)
+    return {(start, end): free for start, end, free in grid.free_resources_by_slot()}
+
+
+def timed(fn, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    resources = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    start_day = date(2025, 10, 1)
+    calendars = make_calendars(["agent-%03d" % i for i in range(resources)], start_day, days)
+
+    scalar_time, scalar_result = timed(scalar, calendars, start_day, days)
+    grid_time, grid_result = timed(vectorized, calendars, start_day, days)
+
+    assert scalar_result == grid_result, "engines disagree"
+    print(f"{resources} resources x {days} days, {len(scalar_result)} slots with a free resource")
+    print(f"  scalar sweep : {scalar_time * 1000:8.1f} ms")
+    print(f"  numpy grid   : {grid_time * 1000:8.1f} ms  ({scalar_time / grid_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Parse latency per tier of the booking parser, next to the old approach
+(dateparser.parse on the whole text with every locale enabled).
+
+The LLM tier is not timed here: it is a network round trip (~1s), which is
+what the other tiers exist to avoid.
+
+Usage:
+    python benchmarks/bench_booking_parser.py [repeat]
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.booking_parser import parse_dateparser, parse_fast
+
+MESSAGES = [
+    "Book a site visit tomorrow at 3pm",
+    "next Monday 10:30",
+    "2025-10-01 14:00 for 30 minutes",
+    "Consultation on Oct 5 at 4 pm, ana@example.com",
+    "the 5th of November 11am",
+]
+
+
+def timed(parse, repeat):
+    parse(MESSAGES[0])  # Warm-up: imports, locale data, regex caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            parse(message)
+    return (time.perf_counter() - started) / (repeat * len(MESSAGES))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    import dateparser
+
+    settings = {"PREFER_DATES_FROM": "future", "PREFER_DAY_OF_MONTH": "first"}
+    results = [
+        ("regex fast path", timed(parse_fast, repeat)),
+        ("dateparser, en only, prebuilt", timed(parse_dateparser, repeat)),
+        ("dateparser.parse, all locales", timed(
+            lambda text: dateparser.parse(text, settings=dict(settings, RELATIVE_BASE=datetime.now())), repeat)),
+    ]
+
+    print(f"{len(MESSAGES)} messages x {repeat}")
+    for name, seconds in results:
+        print(f"{name:32s} {seconds * 1e6:10.1f} us/parse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Bulk import throughput: book_slot in a loop vs book_many, against the
+in-process FakeCalendar with a simulated round-trip latency.
+
+The loop pays one insert round-trip and one SQLite transaction per booking;
+book_many pays one range fetch, one round-trip per batch of 50 inserts and
+a single transaction.
+
+Usage:
+    python benchmarks/bench_bulk_booking.py [bookings] [latency_ms]   (default: 300 50)
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend import google_calendar
+from backend.booking_store import BookingStore
+from backend.bulk_booking import CREATED, BulkBooking
+from backend.fake_calendar import FakeCalendar
+from backend.reservations import ReservationTable
+
+
+def make_bookings(count):
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return [BulkBooking(n + 1, f"client{n}@example.com", start + timedelta(minutes=30 * n),
+                        start + timedelta(minutes=30 * (n + 1)), summary="Open house")
+            for n in range(count)]
+
+
+def isolated(latency, tmp, name):
+    """Patches google_calendar onto a fresh fake calendar, store and reservation table."""
+    calendar = FakeCalendar(latency=latency)
+    stack = ExitStack()
+    for target, value in [
+        ("get_calendar_service", lambda: calendar),
+        ("_booking_store", BookingStore(os.path.join(tmp, f"{name}.db"))),
+        ("_reservations", ReservationTable()),
+    ]:
+        stack.enter_context(mock.patch.object(google_calendar, target, value))
+    google_calendar._busy_cache.invalidate()
+    return calendar, stack
+
+
+def one_by_one(bookings):
+    for booking in bookings:
+        google_calendar.book_slot(booking.summary, booking.start_time, booking.end_time, booking.email,
+                                  booking.description)
+    return len(bookings)
+
+
+def bulk(bookings):
+    return sum(outcome["status"] == CREATED for outcome in google_calendar.book_many(bookings))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    bookings = make_bookings(count)
+    print(f"{count} bookings, {latency * 1000:.0f} ms per Calendar round-trip")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in (("book_slot loop", one_by_one), ("book_many", bulk)):
+            calendar, stack = isolated(latency, tmp, name.replace(" ", "_"))
+            with stack:
+                started = time.perf_counter()
+                created = fn(bookings)
+                elapsed = time.perf_counter() - started
+            assert created == count == len(calendar.all_events()), (name, created)
+            print(f"  {name:15} {elapsed:7.2f} s  {created / elapsed:8.1f} bookings/s  "
+                  f"({calendar.calls['insert']} inserts, {calendar.calls['batch']} batches, "
+                  f"{calendar.calls['list']} lists)")
+    google_calendar._busy_cache.invalidate()
+
+
+if __name__ == "__main__":
+    main()
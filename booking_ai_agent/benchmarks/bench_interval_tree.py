@@ -0,0 +1,105 @@
+"""
+IntervalTree vs a linear scan and vs the old sorted-list + bisect index.
+
+Intervals are 15-120 minute bookings spread over years, plus a handful of
+multi-week blocks (leave, all-day holds). The sorted list has to widen every
+query by the longest interval it holds, so those few long blocks turn its
+bisect into a long scan; the tree prunes by subtree max end instead.
+
+Usage:
+    python benchmarks/bench_interval_tree.py [sizes...]   (default: 100000 1000000)
+"""
+import os
+import random
+import sys
+import time
+from bisect import bisect_left, insort
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.interval_tree import IntervalTree
+
+MINUTE = 60
+QUERIES = 2000
+
+
+def make_intervals(count, rng):
+    span = count * 30 * MINUTE  # ~2 bookings per busy hour
+    intervals = []
+    for n in range(count):
+        start = rng.randrange(span)
+        intervals.append((start, start + rng.choice((15, 30, 45, 60, 120)) * MINUTE, n))
+    for n in range(5):
+        start = rng.randrange(span)
+        intervals.append((start, start + 21 * 24 * 60 * MINUTE, count + n))
+    return intervals, span
+
+
+class SortedIndex:
+    """The previous BusyStore approach: sorted tuples, bisect widened by the longest interval."""
+
+    def __init__(self):
+        self.items = []
+        self.max_length = 0
+
+    def insert(self, start, end, key):
+        insort(self.items, (start, end, key))
+        self.max_length = max(self.max_length, end - start)
+
+    def overlapping(self, start, end):
+        lo = bisect_left(self.items, (start - self.max_length,))
+        hi = bisect_left(self.items, (end,))
+        return [item for item in self.items[lo:hi] if item[1] > start]
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def run(count):
+    rng = random.Random(count)
+    intervals, span = make_intervals(count, rng)
+    queries = [(lo, lo + 60 * MINUTE) for lo in (rng.randrange(span) for _ in range(QUERIES))]
+    print(f"\n{len(intervals):,} intervals, {QUERIES:,} one-hour overlap queries")
+
+    tree = IntervalTree()
+    _, build = timed(lambda: [tree.insert(*interval) for interval in intervals])
+    print(f"  tree build        {build:8.2f} s   ({build / len(intervals) * 1e6:5.1f} µs/insert, "
+          f"height {tree._root.height})")
+
+    index = SortedIndex()
+    _, build = timed(lambda: [index.insert(*interval) for interval in intervals])
+    print(f"  sorted-list build {build:8.2f} s   ({build / len(intervals) * 1e6:5.1f} µs/insert)")
+
+    expected, seconds = timed(lambda: [index.overlapping(*q) for q in queries])
+    print(f"  sorted-list query {seconds / QUERIES * 1e6:8.1f} µs")
+    result, seconds = timed(lambda: [tree.overlapping(*q) for q in queries])
+    print(f"  tree query        {seconds / QUERIES * 1e6:8.1f} µs")
+    assert result == expected
+
+    sample = queries[:20]
+    _, seconds = timed(lambda: [[i for i in intervals if i[0] < hi and i[1] > lo] for lo, hi in sample])
+    print(f"  linear scan       {seconds / len(sample) * 1e6:8.1f} µs")
+
+    _, seconds = timed(lambda: [tree.overlaps(*q) for q in queries])
+    print(f"  tree overlaps()   {seconds / QUERIES * 1e6:8.1f} µs")
+    _, seconds = timed(lambda: [tree.stab(lo) for lo, _ in queries])
+    print(f"  tree stab         {seconds / QUERIES * 1e6:8.1f} µs")
+    _, seconds = timed(lambda: [tree.next_free(lo, 30 * MINUTE) for lo, _ in queries])
+    print(f"  tree next_free    {seconds / QUERIES * 1e6:8.1f} µs")
+
+    victims = rng.sample(intervals, QUERIES)
+    _, seconds = timed(lambda: [tree.remove(*victim) for victim in victims])
+    print(f"  tree remove       {seconds / QUERIES * 1e6:8.1f} µs")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for count in sizes:
+        run(count)
+
+
+if __name__ == "__main__":
+    main()
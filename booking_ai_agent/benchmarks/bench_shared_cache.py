@@ -0,0 +1,75 @@
+"""
+Cold workers with and without the shared (Redis) busy-interval tier, against
+the in-process FakeCalendar and FakeRedis with a simulated round-trip latency.
+
+Each simulated worker starts with an empty local cache and looks up the same
+days, as after a deploy or with several replicas. Then 100 threads ask for
+one cold day at once, which single-flight turns into a single fetch.
+
+Usage:
+    python benchmarks/bench_shared_cache.py [workers] [days] [latency_ms]   (default: 4 14 50)
+"""
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend import google_calendar
+from backend.fake_calendar import FakeCalendar
+from backend.fake_redis import FakeRedis
+from backend.shared_cache import SharedBusyCache
+
+
+def cold_workers(workers, days):
+    for _ in range(workers):
+        google_calendar._busy_cache.invalidate()  # A new process
+        for day in days:
+            google_calendar.get_booked_slots(day)
+
+
+def burst(day, threads=100):
+    google_calendar._busy_cache.invalidate()
+    barrier = threading.Barrier(threads)
+
+    def request():
+        barrier.wait()
+        google_calendar.get_booked_slots(day)
+
+    pool = [threading.Thread(target=request) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 14
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 50) / 1000
+    first = date.today() + timedelta(days=1)
+    days = [first + timedelta(days=n) for n in range(count)]
+    print(f"{workers} cold workers x {count} days, {latency * 1000:.0f} ms per Calendar round-trip")
+
+    for name, shared in (("local cache only", None), ("shared tier", SharedBusyCache(FakeRedis()))):
+        calendar = FakeCalendar(latency=latency)
+        with mock.patch.object(google_calendar, "get_calendar_service", lambda: calendar), \
+                mock.patch.object(google_calendar, "_shared_cache", shared):
+            started = time.perf_counter()
+            cold_workers(workers, days)
+            warm_up = time.perf_counter() - started
+            lists = calendar.calls["list"]
+
+            started = time.perf_counter()
+            burst(first + timedelta(days=count))
+            burst_time = time.perf_counter() - started
+        print(f"  {name:17} warm-up {warm_up:6.2f} s ({lists} lists)   "
+              f"100-request burst {burst_time * 1000:6.1f} ms ({calendar.calls['list'] - lists} lists)")
+    google_calendar._busy_cache.invalidate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cold-start check: import profile of `app` (python -X importtime) and the time
+from process start until /health answers.
+
+Exits non-zero when a deferred heavy module is imported at startup or a
+budget is exceeded, so it can run in CI to catch regressions.
+
+Usage:
+    python benchmarks/bench_startup.py [--top 15] [--import-budget-ms 150] [--health-budget-ms 200]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Must only be imported on first use (or by the warm-up thread), never by `import app`
+DEFERRED_MODULES = [
+    "googleapiclient.discovery",
+    "google_auth_oauthlib",
+    "google.oauth2.service_account",
+    "dateparser",
+    "numpy",
+]
+
+HEALTH_SCRIPT = (
+    "from app import app\n"
+    "response = app.test_client().get('/health')\n"
+    "assert response.status_code == 200, response.status_code\n"
+)
+
+
+def import_profile():
+    """Returns [(module, self_us, cumulative_us)] for `import app`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def time_to_health(runs=5):
+    """Best wall time (ms) from spawning a fresh interpreter to a 200 from /health."""
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", HEALTH_SCRIPT], cwd=ROOT, check=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure application cold-start time.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--import-budget-ms", type=float, default=150)
+    parser.add_argument("--health-budget-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    rows = import_profile()
+    total_ms = next(cumulative for module, _, cumulative in rows if module == "app") / 1000
+    print(f"import app: {total_ms:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print("slowest imports (cumulative):")
+    for module, _, cumulative in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    health_ms = time_to_health()
+    print(f"process start -> /health: {health_ms:.1f} ms (budget {args.health_budget_ms:.0f} ms)")
+
+    failures = []
+    imported = {module for module, _, _ in rows}
+    for module in DEFERRED_MODULES:
+        if module in imported:
+            failures.append(f"{module} is imported at startup")
+    if total_ms > args.import_budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds {args.import_budget_ms:.0f} ms")
+    if health_ms > args.health_budget_ms:
+        failures.append(f"/health after {health_ms:.1f} ms exceeds {args.health_budget_ms:.0f} ms")
+
+    for failure in failures:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+WSGI entry point serving app.py against an in-memory FakeCalendar, for load tests:
+
+    gunicorn --pythonpath benchmarks fake_app:app
+
+FAKE_CALENDAR_LATENCY (seconds, default 0.08) mimics the Google API round
+trip. The busy-interval cache is disabled unless BUSY_CACHE_TTL is set, so
+every availability request waits on the fake API like a cold cache would.
+
+With FAKE_GOOGLE_SERVER=true each worker instead starts a FakeGoogleServer
+and talks to it over HTTP with the real Calendar, Gmail and Groq clients;
+FAKE_GOOGLE_ERROR_RATE (default 0) makes that share of calls fail with
+429/503.
+"""
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+os.environ.setdefault("BUSY_CACHE_TTL", "0")
+os.environ.setdefault("BOOKINGS_DB", os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "bookings.db"))
+
+from backend import google_calendar  # noqa: E402
+from backend.fake_calendar import FakeCalendar  # noqa: E402
+
+latency = float(os.getenv("FAKE_CALENDAR_LATENCY", "0.08"))
+over_http = os.getenv("FAKE_GOOGLE_SERVER", "false").lower() == "true"
+calendar = FakeCalendar(latency=0 if over_http else latency)
+for offset in range(14):
+    day = datetime.combine(date.today() + timedelta(days=offset), datetime.min.time(), tzinfo=timezone.utc)
+    calendar.add_event(day + timedelta(hours=10), day + timedelta(hours=11), summary="Existing meeting")
+    calendar.add_event(day + timedelta(hours=14), day + timedelta(hours=14, minutes=30), summary="Existing call")
+
+if over_http:
+    from google.oauth2.credentials import Credentials  # noqa: E402
+
+    from backend import gmail_service, groq_provider  # noqa: E402
+    from backend.fake_google_server import FakeGoogleServer  # noqa: E402
+    from backend.groq_provider import GroqClient  # noqa: E402
+    from backend.service_manager import GoogleServiceManager  # noqa: E402
+
+    server = FakeGoogleServer(calendar, latency=latency,
+                              error_rate=float(os.getenv("FAKE_GOOGLE_ERROR_RATE", "0"))).start()
+
+    def _manager(api, version):
+        # One googleapiclient service per thread, as in production
+        return GoogleServiceManager(api, version, load_credentials=lambda: Credentials(token="fake-token"),
+                                    build_service=lambda creds: server.build_service(api, version))
+
+    calendar_services, gmail_services = _manager("calendar", "v3"), _manager("gmail", "v1")
+    google_calendar.get_calendar_service = calendar_services.get_service
+    gmail_service.get_gmail_service = gmail_services.get_service
+    groq_provider.GROQ_API_KEY = "fake"
+    groq_provider._client = GroqClient(api_key="fake", api_url=server.chat_url)
+else:
+    google_calendar.get_calendar_service = lambda: calendar
+
+from app import app  # noqa: E402,F401
@@ -0,0 +1,223 @@
+"""
+Load test of the booking API with 50/200/1000 concurrent users, reporting
+throughput and p50/p95/p99 latency per endpoint.
+
+Each simulated user loops over a weighted mix of tasks (--mix): one-day
+slots, a week of availability, and a booking (fetch a day's slots, then
+POST /api/create_booking for one of them). 409s from slots taken by other
+users count as rejected, not errors.
+
+By default the app is started under gunicorn (gunicorn.conf.py) with the
+Google Calendar replaced by FakeCalendar (see fake_app.py);
+FAKE_GOOGLE_SERVER=true routes Calendar/Gmail/Groq through the local HTTP
+FakeGoogleServer instead. Use --server flask-dev to compare against the
+Flask development server, or --url to hit an already running deployment.
+--json appends each run's numbers to a file, to track them across commits.
+
+Usage:
+    python benchmarks/load_test.py [--users 50 200 1000] [--duration 10] [--server gunicorn|flask-dev]
+    python benchmarks/load_test.py --mix available_slots=8 availability=2 create_booking=1 --json runs.jsonl
+    python benchmarks/load_test.py --url http://127.0.0.1:5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port, env):
+    if kind == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--pythonpath", "benchmarks",
+                   "--bind", f"127.0.0.1:{port}", "fake_app:app"]
+    else:
+        command = [sys.executable, "-c",
+                   "import sys; sys.path.insert(0, 'benchmarks'); from fake_app import app; "
+                   f"app.run(port={port}, threaded=True)"]
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_healthy(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url + "/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become healthy within {timeout}s")
+
+
+DEFAULT_MIX = {"available_slots": 8, "availability": 2, "create_booking": 1}
+
+
+class Stats:
+    """Latencies, rejections and errors per endpoint for one concurrency level."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.rejected = Counter()
+        self.errors = defaultdict(list)
+
+    async def request(self, client, endpoint, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.errors[endpoint].append(type(e).__name__)
+            return None
+        if response.status_code >= 500:
+            self.errors[endpoint].append(response.status_code)
+            return None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.rejected[endpoint] += 1
+            return None
+        return response
+
+
+def _random_day(rng):
+    return date.today() + timedelta(days=rng.randrange(7))
+
+
+async def _available_slots(client, base_url, stats, rng):
+    return await stats.request(client, "available_slots", "GET", f"{base_url}/api/available_slots/{_random_day(rng)}")
+
+
+async def _availability(client, base_url, stats, rng):
+    day = _random_day(rng)
+    await stats.request(client, "availability", "GET",
+                        f"{base_url}/api/availability?from={day}&to={day + timedelta(days=6)}")
+
+
+async def _create_booking(client, base_url, stats, rng):
+    day = _random_day(rng)
+    response = await stats.request(client, "available_slots", "GET", f"{base_url}/api/available_slots/{day}")
+    slots = response.json().get("slots") if response is not None else None
+    if not slots:
+        return
+    await stats.request(client, "create_booking", "POST", f"{base_url}/api/create_booking", json={
+        "email": f"load{rng.randrange(10 ** 9)}@example.com", "date": str(day), "time": rng.choice(slots),
+    })
+
+
+TASKS = {"available_slots": _available_slots, "availability": _availability, "create_booking": _create_booking}
+
+
+async def _user(client, base_url, stop_at, stats, mix, seed):
+    rng = random.Random(seed)
+    tasks, weights = [TASKS[name] for name in mix], list(mix.values())
+    while time.perf_counter() < stop_at:
+        await rng.choices(tasks, weights)[0](client, base_url, stats, rng)
+
+
+async def run_level(base_url, users, duration, mix):
+    stats = Stats()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        stop_at = started + duration
+        await asyncio.gather(*(_user(client, base_url, stop_at, stats, mix, n) for n in range(users)))
+        elapsed = time.perf_counter() - started
+    return stats, elapsed
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def _parse_mix(items):
+    mix = {}
+    for item in items:
+        name, _, weight = item.partition("=")
+        if name not in TASKS:
+            raise SystemExit(f"unknown task {name!r}; choose from {', '.join(TASKS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def summarize(stats, elapsed):
+    """{endpoint: {requests, rps, p50_ms, p95_ms, p99_ms, rejected, errors}}"""
+    summary = {}
+    for endpoint in sorted(set(stats.latencies) | set(stats.errors)):
+        latencies = sorted(stats.latencies[endpoint])
+        summary[endpoint] = {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(_percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(_percentile(latencies, 0.99) * 1000, 1),
+            "rejected": stats.rejected[endpoint],
+            "errors": len(stats.errors[endpoint]),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the booking API.")
+    parser.add_argument("--users", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument("--server", choices=["gunicorn", "flask-dev"], default="gunicorn")
+    parser.add_argument("--url", help="Test a running server instead of starting one")
+    parser.add_argument("--mix", nargs="+", metavar="TASK=WEIGHT",
+                        default=[f"{name}={weight}" for name, weight in DEFAULT_MIX.items()])
+    parser.add_argument("--json", metavar="PATH", help="Append results as one JSON line per level")
+    args = parser.parse_args()
+    mix = _parse_mix(args.mix)
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = _free_port()
+        env = dict(os.environ, GUNICORN_ACCESS_LOG="", FLASK_DEBUG="false")
+        server = start_server(args.server, port, env)
+        base_url = f"http://127.0.0.1:{port}"
+    base_url = base_url.rstrip("/")
+
+    try:
+        wait_healthy(base_url)
+        target = args.url and 'external' or args.server
+        print(f"target: {base_url} ({target}), {args.duration:.0f}s per level, mix {args.mix}")
+        print(f"{'users':>6} {'endpoint':<16} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'409/4xx':>8} {'errors':>7}")
+        for users in args.users:
+            stats, elapsed = asyncio.run(run_level(base_url, users, args.duration, mix))
+            summary = summarize(stats, elapsed)
+            for endpoint, row in summary.items():
+                print(f"{users:>6} {endpoint:<16} {row['requests']:>9} {row['rps']:>8.1f} {row['p50_ms']:>8.1f} "
+                      f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['rejected']:>8} {row['errors']:>7}")
+                if stats.errors[endpoint]:
+                    kinds = Counter(stats.errors[endpoint]).most_common(3)
+                    print(" " * 7 + "errors: " + ", ".join(f"{kind} x{count}" for kind, count in kinds))
+            if args.json:
+                with open(args.json, "a") as out:
+                    out.write(json.dumps({"at": datetime.now().isoformat(timespec="seconds"), "target": target,
+                                          "users": users, "duration": args.duration, "mix": mix,
+                                          "endpoints": summary}) + "\n")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=35)
+
+
+if __name__ == "__main__":
+    main()
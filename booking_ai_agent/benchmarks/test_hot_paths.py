@@ -0,0 +1,146 @@
+"""
+pytest-benchmark suite for the hot paths, run offline against FakeGoogleServer.
+
+Calendar, Gmail and Groq calls go through the real clients (googleapiclient,
+requests) over local HTTP, so the numbers include serialization and
+transport but not Google's own latency unless BENCH_LATENCY_MS is set.
+Skipped when pytest-benchmark is not installed (pip install -r
+requirements-dev.txt); CI runs it with --benchmark-disable as a smoke test.
+
+Usage:
+    python -m pytest benchmarks/test_hot_paths.py --benchmark-autosave
+    python -m pytest benchmarks/test_hot_paths.py --benchmark-compare      (against the last saved run)
+    BENCH_LATENCY_MS=80 BENCH_EVENTS_PER_DAY=20 python -m pytest benchmarks/test_hot_paths.py
+"""
+import itertools
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import app as booking_app  # noqa: E402
+from backend import gmail_service, google_calendar, groq_provider  # noqa: E402
+from backend.booking_store import BookingStore  # noqa: E402
+from backend.fake_google_server import FakeGoogleServer  # noqa: E402
+from backend.groq_provider import GroqClient  # noqa: E402
+from backend.metrics import Histogram, Registry, timed  # noqa: E402
+from backend.reservations import ReservationTable  # noqa: E402
+
+LATENCY = float(os.getenv("BENCH_LATENCY_MS", "0")) / 1000
+EVENTS_PER_DAY = int(os.getenv("BENCH_EVENTS_PER_DAY", "8"))
+DAYS = 30
+DAY = date.today() + timedelta(days=1)
+
+
+@pytest.fixture(scope="module")
+def fake_google():
+    server = FakeGoogleServer(latency=LATENCY, seed=0).start()
+    server.populate(days=DAYS + 1, per_day=EVENTS_PER_DAY)
+    calendar = server.build_service("calendar", "v3")
+    gmail = server.build_service("gmail", "v1")
+    groq = GroqClient(api_key="bench", api_url=server.chat_url)
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.multiple(
+        google_calendar,
+        get_calendar_service=lambda: calendar,
+        _booking_store=BookingStore(os.path.join(tmp, "bookings.db")),
+        _reservations=ReservationTable(),
+    ), mock.patch.object(gmail_service, "get_gmail_service", lambda: gmail), mock.patch.multiple(
+        groq_provider, GROQ_API_KEY="bench", _client=groq,
+    ), mock.patch.object(booking_app, "ASYNC_BOOKINGS", False):
+        google_calendar._busy_cache.invalidate()
+        yield server
+        google_calendar._busy_cache.invalidate()
+    groq.close()
+    server.stop()
+
+
+def test_get_available_slots_cold(benchmark, fake_google):
+    """One day's free slots with an empty busy cache (one events.list round-trip)."""
+    slots = benchmark.pedantic(google_calendar.get_available_slots, args=(DAY,),
+                               setup=google_calendar._busy_cache.invalidate, rounds=50)
+    assert slots
+
+
+def test_get_available_slots_warm(benchmark, fake_google):
+    """One day's free slots answered from the busy cache."""
+    google_calendar.get_available_slots(DAY)
+    assert benchmark(google_calendar.get_available_slots, DAY)
+
+
+def test_available_slots_endpoint(benchmark, fake_google):
+    """GET /api/available_slots/<day> through Flask, cache warm."""
+    client = booking_app.app.test_client()
+    response = benchmark(client.get, f"/api/available_slots/{DAY}")
+    assert response.status_code == 200
+
+
+def test_available_slots_not_modified(benchmark, fake_google):
+    """GET /api/available_slots/<day> revalidated with If-None-Match (304, no slot computation)."""
+    client = booking_app.app.test_client()
+    etag = client.get(f"/api/available_slots/{DAY}").headers["ETag"]
+    response = benchmark(client.get, f"/api/available_slots/{DAY}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_api_create_booking(benchmark, fake_google):
+    """POST /api/create_booking, synchronous path: slot lookup, hold, insert, save."""
+    client = booking_app.app.test_client()
+    payloads = iter([
+        {"email": f"client{n}@example.com", "date": str(day), "time": booking_app.format_slot(start, end)}
+        for n, (day, (start, end)) in enumerate(
+            (day, slot) for day in (DAY + timedelta(days=offset) for offset in range(DAYS))
+            for slot in google_calendar.get_available_slots(day))
+    ])
+
+    def next_booking():
+        return (next(payloads),), {}
+
+    def create(payload):
+        return client.post("/api/create_booking", json=payload)
+
+    response = benchmark.pedantic(create, setup=next_booking, rounds=50)
+    assert response.status_code == 200, response.get_json()
+
+
+def test_ask_groq(benchmark, fake_google):
+    """One uncached chat completion."""
+    counter = itertools.count()
+    answer = benchmark(lambda: groq_provider.ask_groq(f"Book me in #{next(counter)}", use_cache=False))
+    assert not answer.startswith(("Error", "HTTP error", "Request error"))
+
+
+def test_ask_groq_cached(benchmark, fake_google):
+    """A repeated prompt answered from the LLM response cache."""
+    groq_provider.ask_groq("What are your opening hours?")
+    assert benchmark(groq_provider.ask_groq, "What are your opening hours?")
+
+
+def test_send_email(benchmark, fake_google):
+    """One confirmation email through Gmail messages.send."""
+    result = benchmark(gmail_service.send_email, "client@example.com", "Booking confirmed", "See you soon.")
+    assert result.startswith("Email sent successfully")
+
+
+def _noop():
+    return None
+
+
+@pytest.mark.benchmark(group="timed")
+def test_untimed_call(benchmark):
+    """Baseline for test_timed_call: the same function without instrumentation."""
+    benchmark(_noop)
+
+
+@pytest.mark.benchmark(group="timed")
+def test_timed_call(benchmark):
+    """Per-call cost of the timed() decorator (compare with test_untimed_call; budget ~5 µs)."""
+    stages = Histogram("stage_seconds", "Stages.", ("stage",), registry=Registry())
+    benchmark(timed("noop", stages)(_noop))
+    assert stages.labels("noop").count > 0
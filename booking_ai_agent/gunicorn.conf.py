@@ -0,0 +1,82 @@
+"""
+Gunicorn settings, picked up automatically when started from this directory:
+
+    gunicorn app:app
+
+Requests spend almost all their time waiting on Google APIs, so each worker
+process runs a pool of threads (gthread): a blocked thread costs a few KB of
+stack, not a whole process. Every setting can be overridden from the
+environment.
+"""
+import os
+
+
+def _cpu_count():
+    # Respect CPU affinity (taskset, some container runtimes) where available
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+worker_class = "gthread"
+# cpu_count() ignores cgroup CPU quotas; set WEB_CONCURRENCY on CPU-limited containers
+workers = int(os.getenv("WEB_CONCURRENCY", 2 * _cpu_count() + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "32"))
+backlog = 2048
+
+# A request may wait on several Google calls with retries; workers past this are restarted
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# On SIGTERM, in-flight requests and booking jobs get this long to finish
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# With more clients than threads, idle keep-alive sockets stall gthread workers
+# (p95 jumped to the keep-alive timeout in benchmarks/load_test.py). The
+# reverse proxy in front keeps client connections alive instead.
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "0"))
+
+# Optional worker recycling to bound memory growth; off by default because a
+# recycled worker drops the connections it had accepted but not yet served
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None  # empty disables it
+errorlog = "-"
+
+
+def on_starting(server):
+    # Slot tokens issued by one worker must verify in the others, and in other replicas
+    if os.getenv("SLOT_TOKEN_SECRET"):
+        return
+    if os.getenv("FLASK_ENV", "").lower() == "production":
+        raise RuntimeError("SLOT_TOKEN_SECRET must be set in production")
+
+    import secrets
+
+    server.log.warning("SLOT_TOKEN_SECRET is not set; generated one shared by this master's workers only")
+    os.environ["SLOT_TOKEN_SECRET"] = secrets.token_hex(32)
+
+
+def post_fork(server, worker):
+    # Threads do not survive fork, so each worker starts its own warm-up; it
+    # runs in the background and the worker serves /health immediately.
+    from backend.warmup import start_warm_up
+
+    start_warm_up()
+
+
+def post_worker_init(worker):
+    # Resume bookings queued before a restart without waiting for the first request
+    from backend.config import ASYNC_BOOKINGS
+
+    if ASYNC_BOOKINGS:
+        from backend.booking_jobs import get_booking_queue
+
+        get_booking_queue()
+
+
+def worker_exit(server, worker):
+    # Let running booking jobs finish; unfinished ones are re-claimed once their lease expires
+    from backend.booking_jobs import stop_booking_queue
+
+    stop_booking_queue(timeout=graceful_timeout)